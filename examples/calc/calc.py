@@ -3,7 +3,7 @@ from __future__ import annotations
 from argparse import ArgumentParser
 from pathlib import Path
 
-from plare.lexer import Lexer
+from plare.lexer import Lexer, SkipUntil
 from plare.parser import Parser
 from plare.token import Token
 
@@ -121,7 +121,7 @@ def main():
     lexer = Lexer(
         {
             "start": [
-                (r"//", "comment"),
+                (r"//", SkipUntil("//")),
                 (r"[ \t\n]+", "start"),
                 (r"-?(0|[1-9][0-9]*)", NUM),
                 (r"\+", PLUS),
@@ -131,10 +131,6 @@ def main():
                 (r"\(", LPAREN),
                 (r"\)", RPAREN),
             ],
-            "comment": [
-                (r"//", "start"),
-                (r".", "comment"),
-            ],
         },
     )
 
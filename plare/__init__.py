@@ -5,7 +5,13 @@ Public API
 * ``Lexer`` (:mod:`plare.lexer`) — regex-driven stateful tokeniser.
 * ``Parser`` (:mod:`plare.parser`) — LALR(1) parser with operator-precedence
   conflict resolution.
+* ``ParseSession`` (:mod:`plare.parser`) — push-style parse of one input,
+  fed tokens as they arrive.
 * ``Token`` (:mod:`plare.token`) — base class for all terminal symbols.
+* ``TableCache`` (:mod:`plare.cache`) — opt-in on-disk and in-memory cache
+  of finished parse tables.
+* ``generate_parser`` (:mod:`plare.codegen`) — direct-code parser module
+  generated from a ``Parser``.
 * ``PlareException``, ``LexingError``, ``ParserError``, ``ParsingError``
   (:mod:`plare.exception`) — exception hierarchy.
 
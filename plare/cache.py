@@ -0,0 +1,205 @@
+"""Persistent cache of finished ``Parser`` tables.
+
+Building a ``Parser`` runs the whole LR(0) construction and LALR(1)
+lookahead computation, which takes seconds for large grammars.  A
+``TableCache`` passed as ``Parser(grammar, cache=...)`` skips that work when
+the same grammar was built before:
+
+* an in-memory LRU layer serves processes that build the same grammar
+  repeatedly, such as test suites;
+* an optional cache directory serves later processes.
+
+Tables are keyed by ``grammar_fingerprint``, a digest of the normalized
+grammar: every production, the precedence and associativity of every token
+class, and the identity (qualified name) of every AST class and argument
+list.  A cached table is only used when it refers to the very classes of
+the grammar being built.
+
+Cache files hold the binary format of ``Parser.to_bytes``, which stores
+classes by qualified name; loading resolves them against the classes of the
+grammar, so classes defined inside a function are cached on disk too.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Mapping, Sequence
+
+import plare
+from plare.token import Token
+from plare.utils import logger
+
+if TYPE_CHECKING:
+    from plare.parser import CompressedTable, Parser, Table
+
+CACHE_FORMAT = 2
+"""Version of the cached data; bump when ``Table`` changes shape."""
+
+type GrammarSpec = Mapping[str, Sequence[Sequence[Any]]]
+type Entry = tuple[frozenset[type], Table[Any] | CompressedTable[Any], dict[str, int]]
+
+
+def describe_class(cls: type) -> str:
+    """Return the qualified name of ``cls``, plus precedence for token classes."""
+    name = f"{cls.__module__}.{cls.__qualname__}"
+    if issubclass(cls, Token):
+        return f"{name}/{cls.precedence}/{cls.associative}"
+    return name
+
+
+def grammar_fingerprint(grammar: GrammarSpec) -> str:
+    """Return a digest identifying the table ``Parser`` builds from ``grammar``.
+
+    Args:
+        grammar: A grammar in the format accepted by ``Parser``.
+
+    Returns:
+        A hex SHA-256 digest of the normalized grammar, the cache format and
+        the Plare version.
+    """
+    normalized: list[object] = [CACHE_FORMAT, plare.__version__]
+    for left, productions in grammar.items():
+        for right, action, args, *prec_token in productions:
+            normalized.append(
+                (
+                    left,
+                    tuple(
+                        describe_class(symbol) if isinstance(symbol, type) else symbol
+                        for symbol in right
+                    ),
+                    None if action is None else describe_class(action),
+                    tuple(args),
+                    tuple(map(describe_class, prec_token)),
+                )
+            )
+    return hashlib.sha256(repr(normalized).encode()).hexdigest()
+
+
+def grammar_classes(grammar: GrammarSpec) -> frozenset[type]:
+    """Return the token and AST classes ``grammar`` refers to."""
+    classes: set[type] = set()
+    for productions in grammar.values():
+        for right, action, _, *prec_token in productions:
+            classes.update(symbol for symbol in right if isinstance(symbol, type))
+            classes.update(prec_token)
+            if action is not None:
+                classes.add(action)
+    return frozenset(classes)
+
+
+class TableCache:
+    """Cache of finished parse tables, in memory and optionally on disk.
+
+    Args:
+        directory: Directory holding one file per grammar fingerprint,
+            created on first store.  ``None`` keeps tables in memory only.
+        maxsize: Number of tables kept in memory; the least recently used
+            table is dropped first.
+
+    Attributes:
+        directory: The cache directory, or ``None``.
+        maxsize: Number of tables kept in memory.
+        entries: In-memory tables by fingerprint, least recently used first.
+    """
+
+    directory: Path | None
+    maxsize: int
+    entries: OrderedDict[str, Entry]
+
+    def __init__(
+        self, directory: str | os.PathLike[str] | None = None, *, maxsize: int = 32
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be at least 1, got {maxsize}")
+        self.directory = Path(directory) if directory is not None else None
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+
+    def path(self, fingerprint: str) -> Path | None:
+        """Return the file that holds the table of ``fingerprint``, if on disk."""
+        if self.directory is None:
+            return None
+        return self.directory / f"{fingerprint}.plrt"
+
+    def load(
+        self, grammar: GrammarSpec
+    ) -> tuple[Table[Any] | CompressedTable[Any], dict[str, int]] | None:
+        """Return the cached ``(table, entry_state)`` for ``grammar``, if any.
+
+        Looks in memory first, then in the cache directory.  A table found
+        on disk is added to the memory layer.
+
+        Args:
+            grammar: A grammar in the format accepted by ``Parser``.
+
+        Returns:
+            The table and entry states of a ``Parser`` built from an
+            identical grammar, or ``None`` on a miss.
+        """
+        fingerprint = grammar_fingerprint(grammar)
+        classes = grammar_classes(grammar)
+        entry = self.entries.get(fingerprint)
+        if entry is not None and entry[0] == classes:
+            self.entries.move_to_end(fingerprint)
+            return entry[1], entry[2]
+
+        path = self.path(fingerprint)
+        if path is None or not path.exists():
+            return None
+        from plare.parser import Parser
+
+        try:
+            parser = Parser[Any].from_bytes(path.read_bytes(), symbols=classes)
+        except Exception as e:
+            logger.info("Ignoring unreadable parser table cache %s: %s", path, e)
+            return None
+        entry = (classes, parser.table, parser.entry_state)
+        self.remember(fingerprint, entry)
+        return entry[1], entry[2]
+
+    def store(self, grammar: GrammarSpec, parser: Parser[Any]) -> None:
+        """Cache the table and entry states of ``parser``, built from ``grammar``.
+
+        The table is always kept in memory.  It is also written to the cache
+        directory unless ``Parser.to_bytes`` cannot serialize it.
+
+        Args:
+            grammar: The grammar ``parser`` was built from.
+            parser: The freshly built parser.
+        """
+        fingerprint = grammar_fingerprint(grammar)
+        entry: Entry = (grammar_classes(grammar), parser.table, parser.entry_state)
+        self.remember(fingerprint, entry)
+
+        path = self.path(fingerprint)
+        if path is None:
+            return
+        try:
+            data = parser.to_bytes()
+        except ValueError as e:
+            logger.info("Parser table kept in memory only: %s", e)
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temporary = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def remember(self, fingerprint: str, entry: Entry) -> None:
+        """Add ``entry`` to the memory layer, dropping the oldest if full."""
+        self.entries[fingerprint] = entry
+        self.entries.move_to_end(fingerprint)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every table from the memory layer; files are kept."""
+        self.entries.clear()
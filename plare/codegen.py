@@ -0,0 +1,330 @@
+"""Direct-code parsers generated from a ``Parser``.
+
+``Parser.parse`` interprets a table: every step looks up the action of the
+current state and lookahead and decodes it.  ``generate_parser`` instead
+turns a constructed ``Parser`` into the source of a Python module whose
+``parse`` function runs the same automaton in direct-threaded style:
+
+* every LR state becomes a function with its token-class checks, shifts and
+  reductions inlined, which returns the next state;
+* the driver loop only calls the function of the current state;
+* reductions call the AST classes directly on slots of the value stack, and
+  pass-through reductions make no call at all.
+
+The only tables left are the goto tuples read after a reduction, indexed by
+the state the reduction exposes, and the shift dicts of states with many
+shifts.  The generated ``parse`` gives the same results and raises the same
+``ParsingError`` as ``Parser.parse`` of the parser it was generated from,
+default reductions included.
+
+The state functions are defined once, at import.  They receive the two
+stacks of the parse and a ``_Parse`` object holding the rest of its state:
+the token stream, the pending lookahead and the last shifted token.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Hashable
+from typing import Any
+
+import plare
+from plare.parser import (
+    ACTION_ACCEPT,
+    ACTION_ERROR,
+    ACTION_NONE,
+    CompiledTable,
+    IDMaker,
+    Parser,
+    TMaker,
+    child_indices,
+    class_reference,
+)
+from plare.token import Token
+
+PRELUDE = """
+class _Parse:
+    \"\"\"State of one call of ``parse`` besides its stacks.\"\"\"
+
+    __slots__ = ("var", "tokens", "token", "kind", "last", "reduced")
+
+    def __init__(self, var, tokens):
+        self.var = var
+        self.tokens = tokens
+        self.token = self.kind = self.last = None
+        self.reduced = []
+
+
+def _error(message, token, expected):
+    return ParsingError(
+        message,
+        token=token,
+        lineno=token.lineno,
+        offset=token.offset,
+        expected=list(expected),
+    )
+
+
+def _unexpected(token, expected, reduced):
+    # Report the first consistent state that did not expect the token, as
+    # ``ParseSession.expected`` does.
+    for tokens in reduced:
+        if type(token) not in tokens:
+            expected = tokens
+            break
+    return _error(f"Unexpected token: {type(token).__name__}", token, expected)
+
+
+def _end_of_input(last, expected):
+    return ParsingError(
+        "Unexpected end of input",
+        token=None,
+        lineno=last.lineno if last else 0,
+        offset=last.offset if last else 0,
+        expected=list(expected),
+    )
+"""
+
+MAX_CHECKS = 3
+"""Most token classes a state tests with ``is`` before using a set or dict."""
+
+
+class ParserWriter:
+    """Writer of the module ``generate_parser`` returns.
+
+    Args:
+        parser: The parser to generate code for.
+
+    Attributes:
+        compiled: The ``CompiledTable`` of the parser, which the code follows.
+        modules: Alias of each module the generated code imports.
+        constants: Module-level assignments, in order of first use.
+        names: Name of each constant, by what it holds.
+        entry_state: Initial state of each entry non-terminal.
+    """
+
+    compiled: CompiledTable[Any]
+    modules: dict[str, str]
+    constants: list[str]
+    names: dict[Hashable, str]
+    entry_state: dict[str, int]
+
+    def __init__(self, parser: Parser[Any]) -> None:
+        self.compiled = parser.compiled()
+        self.modules = {}
+        self.constants = []
+        self.names = {}
+        self.entry_state = parser.entry_state
+
+    def constant(self, key: Hashable, prefix: str, expression: str) -> str:
+        """Return the name of a module constant holding ``expression``."""
+        name = self.names.get(key)
+        if name is None:
+            name = self.names[key] = f"_{prefix}{len(self.names)}"
+            self.constants.append(f"{name} = {expression}")
+        return name
+
+    def cls(self, cls: type) -> str:
+        return self.constant(cls, "c", class_reference(cls, self.modules))
+
+    def tokens(self, tokens: tuple[type[Token], ...]) -> str:
+        """Return a tuple expression of ``tokens``."""
+        names = [self.cls(token) for token in tokens]
+        return f"({names[0]},)" if len(names) == 1 else f"({', '.join(names)})"
+
+    def expected(self, state: int) -> str:
+        expected = tuple(self.compiled.source.expected_tokens(state))
+        return self.constant(("expected", expected), "x", self.tokens(expected))
+
+    def condition(self, tokens: tuple[type[Token], ...]) -> str:
+        """Return a test of the lookahead class ``k`` against ``tokens``."""
+        if len(tokens) <= MAX_CHECKS:
+            return " or ".join(f"k is {self.cls(token)}" for token in tokens)
+        key = ("set", frozenset(tokens))
+        return f"k in {self.constant(key, 'k', f'frozenset({self.tokens(tokens)})')}"
+
+    def goto(self, nonterminal: int) -> str:
+        gotos = tuple(row[nonterminal] for row in self.compiled.gotos)
+        return self.constant(("goto", nonterminal), "g", repr(gotos))
+
+    def reduce(self, rule: int) -> list[str]:
+        """Return the statements of a reduction by ``rule``."""
+        left, n, *_ = self.compiled.rules[rule]
+        maker = self.compiled.reductions[rule].maker
+        if isinstance(maker, TMaker):
+            args = ", ".join(
+                f"symbols[{arg - n}]" for arg in child_indices(maker.args, n)
+            )
+            value: str | None = f"{self.cls(maker.type)}({args})"
+        elif isinstance(maker, IDMaker):
+            (arg,) = child_indices([maker.arg], n)
+            value = None if n == 1 else f"symbols[{arg - n}]"
+        else:
+            raise ValueError(f"Cannot generate code for reduce action maker {maker}")
+        goto = self.goto(left)
+        lines: list[str] = []
+        if n == 0:
+            lines = [
+                f"symbols.append({value})",
+                f"state = {goto}[stack[-1]]",
+                "stack.append(state)",
+            ]
+        else:
+            if n > 1:
+                lines += [
+                    f"value = {value}",
+                    f"del symbols[-{n - 1}:]",
+                    "symbols[-1] = value",
+                    f"del stack[-{n - 1}:]",
+                ]
+            elif value is not None:
+                lines.append(f"symbols[-1] = {value}")
+            lines += [f"state = {goto}[stack[-2]]", "stack[-1] = state"]
+        return [*lines, "return state"]
+
+    def shift(self, target: str) -> list[str]:
+        """Return the statements of a shift to the state ``target``."""
+        return [
+            f"stack.append({target})",
+            "symbols.append(token)",
+            "p.last = token",
+            "p.token = None",
+            "if p.reduced:",
+            "    p.reduced.clear()",
+            f"return {target}",
+        ]
+
+    def state(self, state: int) -> list[str]:
+        """Return the function of ``state``, unindented."""
+        compiled = self.compiled
+        lines = [f"def _state{state}(p, stack, symbols):"]
+        default = compiled.defaults[state]
+        if default:
+            # Consistent state: reduce without reading a lookahead, and
+            # remember what it expected in case the lookahead is an error.
+            body = [f"p.reduced.append({self.expected(state)})"]
+            body += self.reduce(-default - 1)
+            return lines + [f"    {line}" for line in body]
+
+        expected = self.expected(state)
+        body = [
+            "token = p.token",
+            "if token is None:",
+            "    token = p.token = next(p.tokens, None)",
+            "    if token is None:",
+            f"        raise _end_of_input(p.last, {expected})",
+            "    p.kind = type(token)",
+            "k = p.kind",
+        ]
+        groups: dict[int, list[type[Token]]] = {}
+        for token, column in compiled.token_ids.items():
+            code = compiled.actions[state][column]
+            if code != ACTION_ERROR:
+                groups.setdefault(code, []).append(token)
+        shifts = {
+            code: tuple(tokens)
+            for code, tokens in groups.items()
+            if 0 < code < ACTION_NONE
+        }
+        if sum(map(len, shifts.values())) > MAX_CHECKS:
+            targets = ", ".join(
+                f"{self.cls(token)}: {code - 1}"
+                for code, tokens in shifts.items()
+                for token in tokens
+            )
+            table = self.constant(("shift", targets), "s", f"{{{targets}}}")
+            body += [f"target = {table}.get(k)", "if target is not None:"]
+            body += [f"    {line}" for line in self.shift("target")]
+        else:
+            for code, tokens in shifts.items():
+                body.append(f"if {self.condition(tokens)}:")
+                body += [f"    {line}" for line in self.shift(str(code - 1))]
+
+        reduces = sorted(
+            (code for code in groups if code < 0), key=lambda code: -len(groups[code])
+        )
+        for code in reduces:
+            body.append(f"if {self.condition(tuple(groups[code]))}:")
+            body += [f"    {line}" for line in self.reduce(-code - 1)]
+        if ACTION_ACCEPT in groups:
+            symbol = compiled.accepts[state]
+            message = f"Unexpected symbol parsed: {symbol}"
+            body += [
+                f"if {self.condition(tuple(groups[ACTION_ACCEPT]))}:",
+                f"    if p.var != {symbol!r}:",
+                f"        raise _error({message!r}, token, {expected})",
+                "    return -1",
+            ]
+        if ACTION_NONE in groups:
+            message = f"No action for state {state} and symbol None"
+            body += [
+                f"if {self.condition(tuple(groups[ACTION_NONE]))}:",
+                f"    raise _error({message!r}, token, {expected})",
+            ]
+        body.append(f"raise _unexpected(token, {expected}, p.reduced)")
+        return lines + [f"    {line}" for line in body]
+
+    def write(self) -> str:
+        """Return the source of the module."""
+        # The classes the functions refer to are collected as they are written.
+        functions: list[str] = []
+        for state in range(len(self.compiled.actions)):
+            functions += ["", "", *self.state(state)]
+
+        lines = [
+            f'"""Parser generated by Plare {plare.__version__}; do not edit."""',
+            "",
+            "from itertools import chain",
+            "",
+            "from plare.exception import ParsingError",
+            "from plare.parser import EOS",
+            "",
+        ]
+        lines += [f"import {name} as {alias}" for name, alias in self.modules.items()]
+        lines += ["", *self.constants, ""]
+        lines += [f"ENTRY_STATES = {self.entry_state!r}", "", ""]
+        lines += PRELUDE.strip("\n").split("\n")
+        states = ", ".join(
+            f"_state{state}" for state in range(len(self.compiled.actions))
+        )
+        lines += [
+            *functions,
+            "",
+            "",
+            f"_STATES = ({states},)",
+            "",
+            "",
+            "def parse(var, lexbuf):",
+            '    """Parse ``lexbuf`` as ``var``, like ``Parser.parse``."""',
+            '    tokens = chain(iter(lexbuf), [EOS("", lineno=0, offset=0)])',
+            "    p = _Parse(var, tokens)",
+            "    state = ENTRY_STATES[var]",
+            "    stack = [state]",
+            "    symbols = []",
+            "    states = _STATES",
+            "    while state >= 0:",
+            "        state = states[state](p, stack, symbols)",
+            "    return symbols[-1]",
+            "",
+        ]
+        return "\n".join(lines)
+
+
+def generate_parser(parser: Parser[Any]) -> str:
+    """Return the source of a direct-code parser module for ``parser``.
+
+    The module imports the token and AST classes of the grammar and defines
+    ``parse(var, lexbuf)``, which behaves like ``parser.parse``, and the
+    ``ENTRY_STATES`` it starts from.
+
+    Args:
+        parser: A parser built from a grammar, or loaded or compressed.
+
+    Returns:
+        The source of the module, to be written to a ``.py`` file.
+
+    Raises:
+        ValueError: If a reduction uses a maker other than the ones built
+            from a grammar, or a class cannot be imported by its qualified
+            name (e.g. it is defined inside a function).
+    """
+    return ParserWriter(parser).write()
@@ -0,0 +1,697 @@
+"""Table-driven DFA engine for ``Lexer`` states.
+
+``Lexer(..., engine="dfa")`` compiles the patterns of each lexer state into a
+single deterministic automaton and scans with a table-walking loop instead of
+calling into ``re`` once per pattern.
+
+Supported regex subset
+----------------------
+Literals and escaped punctuation, ``.``, character classes (ranges, negation,
+``\\d``/``\\w``/``\\s`` and their negations), the escapes ``\\n \\t \\r \\f \\v \\a
+\\xhh \\uhhhh \\Uhhhhhhhh``, groups (``(…)``, ``(?:…)``, ``(?P<name>…)``),
+alternation, and the greedy quantifiers ``* + ? {m} {m,} {,n} {m,n}``.
+Anything else (anchors, lookarounds, backreferences, inline flags, lazy or
+possessive quantifiers) raises ``UnsupportedPattern`` and the lexer falls back
+to the ``re`` engine for that state.
+
+Construction
+------------
+Patterns are parsed into a small syntax tree, combined into one Thompson NFA
+whose accepting states are tagged with the rule index, and determinised by
+subset construction.  Characters are grouped into equivalence classes by
+their membership in every character set of the state, so the transition
+table is ``trans[dfa_state][char_class]``.  All ASCII classes are computed at
+construction time; a non-ASCII character is classified on first sight and
+the transitions of a new class are filled in as the scanner needs them.
+
+Matching semantics
+------------------
+The automaton finds the *longest* extent of each pattern (POSIX semantics),
+whereas Python's backtracking engine stops at the first alternative that
+leads to a match: ``if|ifdef`` matches only ``if`` of ``ifdef``.  Patterns
+where the two can differ are rejected with ``UnsupportedPattern``, so their
+state keeps the ``re`` engine.  A pattern is accepted when the next character
+decides every choice it makes: the branches of an alternation start with
+disjoint characters (an empty branch only comes last), and so do a repeated
+item and whatever may follow it.  Backtracking then takes the same path as
+the longest match.  Character sets with ``\\d``/``\\w``/``\\s`` or negation
+are compared on a sample of characters: ASCII, a few non-ASCII letters,
+digits and spaces, and the bounds of their ranges.
+
+Between patterns, the default is first-match-wins like the ``re`` engine: the
+lowest-index pattern that matches at all is chosen.  With
+``longest_match=True`` the longest match across all patterns wins, ties going
+to the lowest index (maximal munch).
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+from collections import deque
+from collections.abc import Callable, Iterable, Sequence
+from typing import NoReturn
+
+NO_RULE = sys.maxsize
+"""Rule index used for DFA states that accept (or can reach) no rule."""
+
+DEAD = -1
+"""Transition target meaning no pattern can match any further."""
+
+UNKNOWN = -2
+"""Transition target not yet computed (classes discovered after construction)."""
+
+MAX_REPEAT = 1000
+"""Largest repetition bound expanded into the NFA before giving up."""
+
+CATEGORIES: dict[str, Callable[[str], bool]] = {
+    "d": str.isdecimal,
+    "w": lambda ch: ch.isalnum() or ch == "_",
+    "s": str.isspace,
+}
+"""Predicates matching the Unicode meaning of ``\\d``, ``\\w`` and ``\\s`` in ``re``."""
+
+SIMPLE_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "f": "\f", "v": "\v", "a": "\a"}
+
+HEX_ESCAPES = {"x": 2, "u": 4, "U": 8}
+
+BRACES = re.compile(r"\{(\d*)(,?)(\d*)\}")
+
+PROBES = (
+    [chr(code) for code in range(128)]
+    + list("\x85\xa0\xb2\xb5\xe9\u0391\u0416\u0660\u0e51\u2028\u3000\u4e2d")
+    + ["\U0001d7ce", "\uffff"]
+)
+"""Characters tried when deciding whether two character sets overlap."""
+
+
+class UnsupportedPattern(Exception):
+    """Internal signal: a pattern uses a construct the DFA compiler does not handle."""
+
+
+class CharSet:
+    """A set of characters: code point ranges plus ``\\d``/``\\w``/``\\s`` categories.
+
+    Args:
+        ranges: Inclusive ``(low, high)`` code point ranges.
+        categories: Category letters; lowercase for ``\\d``/``\\w``/``\\s``,
+            uppercase for their complements.
+        negated: Whether the set is complemented (``[^…]``, ``.``).
+    """
+
+    __slots__ = ("ranges", "categories", "negated")
+
+    ranges: tuple[tuple[int, int], ...]
+    categories: frozenset[str]
+    negated: bool
+
+    def __init__(
+        self,
+        ranges: Iterable[tuple[int, int]] = (),
+        categories: Iterable[str] = (),
+        negated: bool = False,
+    ) -> None:
+        self.ranges = tuple(sorted(ranges))
+        self.categories = frozenset(categories)
+        self.negated = negated
+
+    def __contains__(self, ch: str) -> bool:
+        code = ord(ch)
+        found = any(low <= code <= high for low, high in self.ranges) or any(
+            CATEGORIES[c.lower()](ch) != c.isupper() for c in self.categories
+        )
+        return found != self.negated
+
+    def __hash__(self) -> int:
+        return hash((self.ranges, self.categories, self.negated))
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, CharSet)
+            and self.ranges == other.ranges
+            and self.categories == other.categories
+            and self.negated == other.negated
+        )
+
+
+type Node = (
+    tuple[str, CharSet] | tuple[str, list[Node]] | tuple[str, Node, int, int | None]
+)
+"""Pattern syntax tree: ``("set", cs)``, ``("cat", xs)``, ``("alt", xs)`` or
+``("rep", x, min, max)``."""
+
+
+class PatternParser:
+    """Recursive-descent parser for the supported regex subset.
+
+    Args:
+        pattern: A pattern that already compiles with ``re``.
+    """
+
+    def __init__(self, pattern: str) -> None:
+        self.pattern = pattern
+        self.pos = 0
+
+    def parse(self) -> Node:
+        """Parse the whole pattern; raise ``UnsupportedPattern`` when out of subset."""
+        node = self.alternation()
+        if self.pos != len(self.pattern):
+            self.unsupported("unbalanced parenthesis")
+        return node
+
+    def unsupported(self, what: str) -> NoReturn:
+        raise UnsupportedPattern(f"{what} at {self.pos} in {self.pattern!r}")
+
+    def peek(self) -> str | None:
+        return self.pattern[self.pos] if self.pos < len(self.pattern) else None
+
+    def alternation(self) -> Node:
+        branches = [self.concatenation()]
+        while self.peek() == "|":
+            self.pos += 1
+            branches.append(self.concatenation())
+        return branches[0] if len(branches) == 1 else ("alt", branches)
+
+    def concatenation(self) -> Node:
+        items: list[Node] = []
+        while (ch := self.peek()) is not None and ch not in "|)":
+            items.append(self.repetition())
+        return items[0] if len(items) == 1 else ("cat", items)
+
+    def quantifier(self) -> tuple[int, int | None] | None:
+        ch = self.peek()
+        if ch == "*":
+            bounds = (0, None)
+        elif ch == "+":
+            bounds = (1, None)
+        elif ch == "?":
+            bounds = (0, 1)
+        elif ch == "{" and (braces := BRACES.match(self.pattern, self.pos)):
+            low, comma, high = braces.groups()
+            if not low and not comma:
+                return None
+            self.pos = braces.end() - 1
+            bounds = (
+                int(low or 0),
+                (int(high) if high else None) if comma else int(low),
+            )
+        else:
+            return None
+        self.pos += 1
+        return bounds
+
+    def repetition(self) -> Node:
+        node = self.atom()
+        bounds = self.quantifier()
+        if bounds is None:
+            return node
+        low, high = bounds
+        if self.peek() in ("?", "+"):
+            self.unsupported("lazy or possessive quantifier")
+        if max(low, high or 0) > MAX_REPEAT:
+            self.unsupported("repetition bound too large")
+        return ("rep", node, low, high)
+
+    def atom(self) -> Node:
+        ch = self.peek()
+        if ch == "(":
+            if self.pattern.startswith("(?:", self.pos):
+                self.pos += 3
+            elif self.pattern.startswith("(?P<", self.pos):
+                self.pos = self.pattern.index(">", self.pos) + 1
+            elif self.pattern.startswith("(?", self.pos):
+                self.unsupported("extension group")
+            else:
+                self.pos += 1
+            node = self.alternation()
+            if self.peek() != ")":
+                self.unsupported("unbalanced parenthesis")
+            self.pos += 1
+            return node
+        if ch == "[":
+            return ("set", self.char_class())
+        if ch == ".":
+            self.pos += 1
+            return ("set", CharSet([(10, 10)], negated=True))
+        if ch == "\\":
+            escaped = self.escape(in_class=False)
+            if isinstance(escaped, int):
+                return ("set", CharSet([(escaped, escaped)]))
+            return ("set", CharSet(categories=escaped))
+        if ch in ("^", "$"):
+            self.unsupported("anchor")
+        if ch in ("*", "+", "?") or (ch == "{" and self.quantifier() is not None):
+            self.unsupported("nothing to repeat")
+        if ch is None:
+            self.unsupported("empty atom")
+        self.pos += 1
+        return ("set", CharSet([(ord(ch), ord(ch))]))
+
+    def escape(self, in_class: bool) -> int | str:
+        """Parse an escape; return a code point or a category letter."""
+        self.pos += 1
+        ch = self.peek()
+        if ch is None:
+            self.unsupported("trailing backslash")
+        self.pos += 1
+        if ch in "dwsDWS":
+            return ch
+        if ch in SIMPLE_ESCAPES:
+            return ord(SIMPLE_ESCAPES[ch])
+        if ch == "b" and in_class:
+            return 8
+        if ch in HEX_ESCAPES:
+            digits = self.pattern[self.pos : self.pos + HEX_ESCAPES[ch]]
+            self.pos += len(digits)
+            return int(digits, 16)
+        if ch.isascii() and ch.isalnum():
+            self.unsupported(f"escape \\{ch}")
+        return ord(ch)
+
+    def char_class(self) -> CharSet:
+        self.pos += 1
+        negated = self.peek() == "^"
+        if negated:
+            self.pos += 1
+        ranges: list[tuple[int, int]] = []
+        categories: list[str] = []
+        first = True
+        while True:
+            ch = self.peek()
+            if ch is None:
+                self.unsupported("unterminated character class")
+            if ch == "]" and not first:
+                self.pos += 1
+                return CharSet(ranges, categories, negated)
+            first = False
+            low = self.class_item()
+            if isinstance(low, str):
+                categories.append(low)
+                continue
+            if (
+                self.peek() == "-"
+                and self.pos + 1 < len(self.pattern)
+                and self.pattern[self.pos + 1] != "]"
+            ):
+                self.pos += 1
+                high = self.class_item()
+                if isinstance(high, str):
+                    self.unsupported("category as range bound")
+                ranges.append((low, high))
+            else:
+                ranges.append((low, low))
+
+    def class_item(self) -> int | str:
+        if self.peek() == "\\":
+            return self.escape(in_class=True)
+        ch = self.pattern[self.pos]
+        self.pos += 1
+        return ord(ch)
+
+
+def overlaps(a: CharSet, b: CharSet) -> bool:
+    """Return whether some character may be in both ``a`` and ``b``.
+
+    Plain ranges are compared exactly.  Sets with categories or negation
+    are tested on ``PROBES`` and on the range bounds of both sets and their
+    neighbours; ``True`` errs on the side of reporting an overlap.
+    """
+    if not (a.categories or a.negated or b.categories or b.negated):
+        return any(
+            low <= other_high and other_low <= high
+            for low, high in a.ranges
+            for other_low, other_high in b.ranges
+        )
+    bounds = {
+        code + delta
+        for low, high in (*a.ranges, *b.ranges)
+        for code in (low, high)
+        for delta in (-1, 0, 1)
+        if 0 <= code + delta <= sys.maxunicode
+    }
+    probes = [*PROBES, *map(chr, bounds)]
+    return any(ch in a and ch in b for ch in probes)
+
+
+def first_chars(node: Node) -> tuple[list[CharSet], bool]:
+    """Return the sets of the characters ``node`` can start with, and whether
+    it matches the empty string."""
+    match node:
+        case ("set", CharSet() as charset):
+            return [charset], False
+        case ("cat", list() as items):
+            first: list[CharSet] = []
+            for item in items:
+                item_first, nullable = first_chars(item)
+                first += item_first
+                if not nullable:
+                    return first, False
+            return first, True
+        case ("alt", list() as branches):
+            first = []
+            any_nullable = False
+            for branch in branches:
+                branch_first, nullable = first_chars(branch)
+                first += branch_first
+                any_nullable = any_nullable or nullable
+            return first, any_nullable
+        case ("rep", inner, int() as low, _):
+            first, nullable = first_chars(inner)
+            return first, nullable or low == 0
+        case _:
+            raise UnsupportedPattern(f"unknown node {node!r}")
+
+
+def check_first_is_longest(node: Node, follow: list[CharSet]) -> None:
+    """Reject ``node`` unless backtracking finds the same extent as the DFA.
+
+    ``follow`` holds the characters that may come right after ``node`` in
+    its pattern.  Every choice must be decided by the next character: the
+    alternatives at a choice point start with disjoint characters, an empty
+    alternative (following on with ``follow``) is tried last, and so the
+    first path that leads to a match is also the longest one.
+
+    Raises:
+        UnsupportedPattern: When the first and the longest match may differ.
+    """
+
+    def disjoint(xs: list[CharSet], ys: list[CharSet]) -> bool:
+        return not any(overlaps(x, y) for x in xs for y in ys)
+
+    match node:
+        case ("cat", list() as items):
+            for item in reversed(items):
+                check_first_is_longest(item, follow)
+                item_first, nullable = first_chars(item)
+                follow = item_first + follow if nullable else item_first
+        case ("alt", list() as branches):
+            seen: list[CharSet] = []
+            for i, branch in enumerate(branches):
+                branch_first, nullable = first_chars(branch)
+                if nullable:
+                    if i != len(branches) - 1:
+                        raise UnsupportedPattern("empty alternative before others")
+                    branch_first = branch_first + follow
+                if not disjoint(branch_first, seen):
+                    raise UnsupportedPattern(
+                        "alternatives that start alike may match a shorter prefix"
+                    )
+                seen += branch_first
+                check_first_is_longest(branch, follow)
+        case ("rep", inner, int() as low, high):
+            inner_first, nullable = first_chars(inner)
+            if high is None or high > low:
+                if nullable:
+                    raise UnsupportedPattern("optional repetition of an empty match")
+                if not disjoint(inner_first, follow):
+                    raise UnsupportedPattern("repetition followed by what it repeats")
+            if high is None or high > 1:
+                follow = inner_first + follow
+            check_first_is_longest(inner, follow)
+        case _:
+            pass
+
+
+class NFA:
+    """Thompson NFA for all patterns of one lexer state.
+
+    Attributes:
+        eps: ε-successors of every state.
+        edges: ``(charset_id, target)`` successors of every state.
+        charsets: Distinct character sets referenced by ``edges``.
+        accepts: Accepting state → index of the pattern it accepts.
+        start: The start state (ε-linked to every pattern's start).
+    """
+
+    def __init__(self, nodes: Sequence[Node]) -> None:
+        self.eps: list[list[int]] = []
+        self.edges: list[list[tuple[int, int]]] = []
+        self.charsets: list[CharSet] = []
+        self.charset_ids: dict[CharSet, int] = {}
+        self.accepts: dict[int, int] = {}
+        self.start = self.new_state()
+        for rule, node in enumerate(nodes):
+            start, end = self.build(node)
+            self.eps[self.start].append(start)
+            self.accepts[end] = rule
+
+    def new_state(self) -> int:
+        self.eps.append([])
+        self.edges.append([])
+        return len(self.eps) - 1
+
+    def build(self, node: Node) -> tuple[int, int]:
+        """Build a fragment for ``node``; return its ``(start, end)`` states."""
+        match node:
+            case ("set", CharSet() as charset):
+                start, end = self.new_state(), self.new_state()
+                charset_id = self.charset_ids.setdefault(charset, len(self.charsets))
+                if charset_id == len(self.charsets):
+                    self.charsets.append(charset)
+                self.edges[start].append((charset_id, end))
+                return start, end
+            case ("cat", list() as items):
+                start = end = self.new_state()
+                for item in items:
+                    item_start, item_end = self.build(item)
+                    self.eps[end].append(item_start)
+                    end = item_end
+                return start, end
+            case ("alt", list() as branches):
+                start, end = self.new_state(), self.new_state()
+                for branch in branches:
+                    branch_start, branch_end = self.build(branch)
+                    self.eps[start].append(branch_start)
+                    self.eps[branch_end].append(end)
+                return start, end
+            case ("rep", inner, int() as low, high):
+                start = end = self.new_state()
+                for _ in range(low):
+                    inner_start, inner_end = self.build(inner)
+                    self.eps[end].append(inner_start)
+                    end = inner_end
+                if high is None:
+                    loop = self.new_state()
+                    inner_start, inner_end = self.build(inner)
+                    self.eps[end].append(loop)
+                    self.eps[loop].append(inner_start)
+                    self.eps[inner_end].append(loop)
+                    return start, loop
+                for _ in range(high - low):
+                    inner_start, inner_end = self.build(inner)
+                    skip = self.new_state()
+                    self.eps[end].extend((inner_start, skip))
+                    self.eps[inner_end].append(skip)
+                    end = skip
+                return start, end
+            case _:
+                raise UnsupportedPattern(f"unknown node {node!r}")
+
+    def closure(self, states: Iterable[int]) -> frozenset[int]:
+        """ε-closure of ``states``."""
+        result = set(states)
+        stack = list(result)
+        while stack:
+            for target in self.eps[stack.pop()]:
+                if target not in result:
+                    result.add(target)
+                    stack.append(target)
+        return frozenset(result)
+
+    def reachable_rules(self) -> list[int]:
+        """Lowest pattern index reachable from every state (``NO_RULE`` if none)."""
+        reverse: list[list[int]] = [[] for _ in self.eps]
+        for state, targets in enumerate(self.eps):
+            for target in targets:
+                reverse[target].append(state)
+        for state, edges in enumerate(self.edges):
+            for _, target in edges:
+                reverse[target].append(state)
+        reach = [NO_RULE] * len(self.eps)
+        for end, rule in sorted(self.accepts.items(), key=lambda item: item[1]):
+            if reach[end] != NO_RULE:
+                continue
+            reach[end] = rule
+            worklist = deque([end])
+            while worklist:
+                for source in reverse[worklist.popleft()]:
+                    if reach[source] == NO_RULE:
+                        reach[source] = rule
+                        worklist.append(source)
+        return reach
+
+
+class DFA:
+    """Deterministic automaton over all patterns of one lexer state.
+
+    Args:
+        patterns: The state's patterns in priority order.
+        longest_match: Choose the longest match across patterns instead of the
+            first pattern that matches.
+        max_states: Upper bound on DFA states built at construction time;
+            exceeding it raises ``UnsupportedPattern``.
+
+    Raises:
+        UnsupportedPattern: When a pattern is outside the supported subset,
+            or Python's ``re`` may match a shorter extent of it.
+    """
+
+    def __init__(
+        self,
+        patterns: Sequence[str],
+        longest_match: bool = False,
+        max_states: int = 10_000,
+    ) -> None:
+        nodes = [PatternParser(p).parse() for p in patterns]
+        for pattern, node in zip(patterns, nodes):
+            try:
+                check_first_is_longest(node, [])
+            except UnsupportedPattern as e:
+                raise UnsupportedPattern(f"{e} in {pattern!r}") from None
+        self.nfa = NFA(nodes)
+        self.nfa_reach = self.nfa.reachable_rules()
+        self.longest_match = longest_match
+        self.states: list[frozenset[int]] = []
+        self.state_index: dict[frozenset[int], int] = {}
+        self.trans: list[list[int]] = []
+        self.accept: list[int] = []
+        self.reach: list[int] = []
+        self.classes: dict[str, int] = {}
+        self.signatures: list[tuple[bool, ...]] = []
+        self.signature_ids: dict[tuple[bool, ...], int] = {}
+
+        self.scan: Callable[[str, int], tuple[int, int] | None] = (
+            self.scan_longest if longest_match else self.scan_first
+        )
+
+        for code in range(128):
+            self.classify(chr(code))
+        self.intern(self.nfa.closure([self.nfa.start]))
+        state = 0
+        while state < len(self.states):
+            if state == max_states:
+                raise UnsupportedPattern(f"more than {max_states} DFA states")
+            for char_class in range(len(self.signatures)):
+                self.step(state, char_class)
+            state += 1
+
+    def classify(self, ch: str) -> int:
+        """Return the equivalence class of ``ch``, creating it on first sight."""
+        signature = tuple(ch in charset for charset in self.nfa.charsets)
+        char_class = self.signature_ids.get(signature)
+        if char_class is None:
+            char_class = len(self.signatures)
+            self.signatures.append(signature)
+            self.signature_ids[signature] = char_class
+            for row in self.trans:
+                row.append(UNKNOWN)
+        self.classes[ch] = char_class
+        return char_class
+
+    def intern(self, states: frozenset[int]) -> int:
+        """Return the DFA state for NFA state set ``states``, adding it if new."""
+        index = self.state_index.get(states)
+        if index is not None:
+            return index
+        index = len(self.states)
+        self.states.append(states)
+        self.state_index[states] = index
+        self.trans.append([UNKNOWN] * len(self.signatures))
+        accepts = self.nfa.accepts
+        self.accept.append(
+            min((accepts[s] for s in states if s in accepts), default=NO_RULE)
+        )
+        self.reach.append(min(self.nfa_reach[s] for s in states))
+        return index
+
+    def step(self, state: int, char_class: int) -> int:
+        """Compute, store and return the transition of ``state`` on ``char_class``.
+
+        Successor sets from which no pattern can be accepted any more collapse
+        into ``DEAD`` so the scanner stops as early as possible.
+        """
+        signature = self.signatures[char_class]
+        edges = self.nfa.edges
+        targets = [
+            target
+            for source in self.states[state]
+            for charset_id, target in edges[source]
+            if signature[charset_id]
+        ]
+        target = DEAD
+        if targets:
+            closure = self.nfa.closure(targets)
+            if min(self.nfa_reach[s] for s in closure) != NO_RULE:
+                target = self.intern(closure)
+        self.trans[state][char_class] = target
+        return target
+
+    def scan_first(self, src: str, pos: int) -> tuple[int, int] | None:
+        """First-match-wins scan at ``pos``; return ``(pattern_index, end)`` or ``None``.
+
+        The lowest-index pattern that matches wins, with its longest extent.
+        The walk stops early once no pattern of equal or higher priority than
+        the current best is reachable.
+        """
+        classes = self.classes
+        trans = self.trans
+        accept = self.accept
+        reach = self.reach
+        state = 0
+        best_rule = accept[0]
+        best_end = pos
+        i = pos
+        length = len(src)
+        while i < length:
+            ch = src[i]
+            char_class = classes.get(ch)
+            if char_class is None:
+                char_class = self.classify(ch)
+            target = trans[state][char_class]
+            if target == UNKNOWN:
+                target = self.step(state, char_class)
+            if target == DEAD:
+                break
+            state = target
+            i += 1
+            rule = accept[state]
+            if rule <= best_rule:
+                best_rule, best_end = rule, i
+            elif reach[state] > best_rule:
+                break
+        if best_rule == NO_RULE:
+            return None
+        return best_rule, best_end
+
+    def scan_longest(self, src: str, pos: int) -> tuple[int, int] | None:
+        """Maximal-munch scan at ``pos``; return ``(pattern_index, end)`` or ``None``.
+
+        The longest match over all patterns wins; among patterns matching the
+        same longest text, the lowest index wins.
+        """
+        classes = self.classes
+        trans = self.trans
+        accept = self.accept
+        state = 0
+        best_rule = accept[0]
+        best_end = pos
+        i = pos
+        length = len(src)
+        while i < length:
+            ch = src[i]
+            char_class = classes.get(ch)
+            if char_class is None:
+                char_class = self.classify(ch)
+            target = trans[state][char_class]
+            if target == UNKNOWN:
+                target = self.step(state, char_class)
+            if target == DEAD:
+                break
+            state = target
+            i += 1
+            rule = accept[state]
+            if rule != NO_RULE:
+                best_rule, best_end = rule, i
+        if best_rule == NO_RULE:
+            return None
+        return best_rule, best_end
@@ -7,27 +7,29 @@ they do not need to distinguish between construction errors and runtime errors.
 
 from __future__ import annotations
 
-from plare.token import Token
+from plare.token import LineIndex, Positioned, Token
 
 
 class PlareException(Exception):
     """Base class for all Plare errors."""
 
 
-class LexingError(PlareException):
+class LexingError(Positioned, PlareException):
     """Raised by ``Lexer.lex`` when no pattern matches the remaining input.
 
     Attributes:
         message: Human-readable description including the offending character.
         lineno: 1-based line number of the failure position.
         offset: 0-based column offset of the failure position.
+
+    As with ``Token``, ``lineno`` may be given as a ``LineIndex`` with an
+    absolute ``offset``; the position is then resolved on first access.
     """
 
-    def __init__(self, message: str, lineno: int, offset: int) -> None:
+    def __init__(self, message: str, lineno: int | LineIndex, offset: int) -> None:
         super().__init__(message)
         self.message = message
-        self.lineno = lineno
-        self.offset = offset
+        self.set_position(lineno, offset)
 
     def __str__(self) -> str:
         return f"Line {self.lineno}, col {self.offset}: {self.message}"
@@ -41,7 +43,7 @@ class ParserError(PlareException):
     """
 
 
-class ParsingError(PlareException):
+class ParsingError(Positioned, PlareException):
     """Raised by ``Parser.parse`` when the token stream does not match the grammar.
 
     Attributes:
@@ -49,20 +51,22 @@ class ParsingError(PlareException):
         lineno: 1-based line number of the failure position.
         offset: 0-based column offset of the failure position.
         expected: Terminal token classes that would have been valid at this point.
+
+    ``lineno`` may be given as a ``LineIndex`` with an absolute ``offset``, as
+    for ``LexingError``.
     """
 
     def __init__(
         self,
         message: str,
         token: Token | None,
-        lineno: int,
+        lineno: int | LineIndex,
         offset: int,
         expected: list[type[Token]],
     ) -> None:
         super().__init__(message)
         self.token = token
-        self.lineno = lineno
-        self.offset = offset
+        self.set_position(lineno, offset)
         self.expected = expected
 
     def __str__(self) -> str:
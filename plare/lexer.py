@@ -9,6 +9,15 @@ Handler types
 * ``str`` — transition to a new state without emitting a token.
 * ``type[Token]`` subclass — construct one token from the matched text and emit
   it, then stay in the current state.
+* ``Keywords`` — a keyword table: the matched text is looked up in a dict of
+  keyword → ``Token`` class, falling back to a default class (typically the
+  identifier).  One identifier pattern then recognises any number of keywords
+  with a single regex match and one dict lookup.
+* ``SkipUntil`` / ``SkipNested`` — skip a whole region (a comment, say) that
+  starts with the matched text: the lexer jumps straight past the closing
+  delimiter with ``find``/``search`` (counting nested openers for
+  ``SkipNested``), updates the position in bulk and optionally switches state.
+  A region left open at end of input extends to the end.
 * ``Callable[[str, T, int, int], Token | str | list[Token]]`` — a function
   receiving ``(matched_text, user_state, lineno, offset)`` that can emit a
   single token, a list of tokens, or return a string to transition states.
@@ -16,18 +25,265 @@ Handler types
 The optional ``state_factory`` argument is called once per ``lex()`` call to
 produce a mutable *user state* object that is threaded through all callable
 handlers.  If omitted, the user state is ``None``.
+
+Combined scanning
+-----------------
+With ``combine=True`` the patterns of each state are compiled into a single
+alternation ``(?P<_0>p0)|(?P<_1>p1)|…``.  Python's regex alternation is
+ordered, so the first alternative that matches wins exactly as in sequential
+mode, but each token costs one regex call instead of one per pattern tried.
+The matching rule is recovered from ``match.lastgroup``.  States whose
+patterns cannot be combined safely (numbered or named backreferences, global
+inline flags, clashing group names) fall back to sequential matching.
+
+Lazy positions
+--------------
+With ``lazy_positions=True`` the scanning loop does no line/column
+bookkeeping at all.  Tokens built from ``type[Token]`` handlers receive the
+shared ``LineIndex`` of the source as ``lineno`` and their absolute character
+offset as ``offset``; ``Token.lineno``/``Token.offset`` (and those of
+``LexingError``) are resolved on demand by bisecting that index.  Callable
+handlers still receive resolved integer positions.
+
+Engines
+-------
+``engine="re"`` (the default) matches with Python's ``re`` module.
+``engine="dfa"`` compiles each state into a table-driven DFA (see
+:mod:`plare.dfa`); states whose patterns use constructs outside the DFA's
+regex subset fall back to ``re``.  ``longest_match=True`` switches from
+first-match-wins to maximal munch: the longest match over all patterns of the
+state wins, ties going to the earlier pattern.  It is exact with the DFA
+engine and emulated by trying every pattern with the ``re`` engine.
+
+File lexing
+-----------
+``lex_file`` memory-maps a UTF-8 file and lexes it as a stream (see below)
+of ``CHUNK_SIZE``-byte windows decoded one at a time, so the file is never
+read into a single ``str``.  The patterns match decoded text, so tokens,
+positions and errors are exactly those of ``lex`` on the whole text.
+
+Streaming
+---------
+``lex`` also accepts an ``io.TextIOBase`` or any iterable of string chunks.
+The input is then scanned through a bounded buffer.  The lexer matches as
+soon as any text is buffered and reads more only while no pattern matches or
+the match reaches the end of the buffer, so a token split across chunks is
+never committed early and a token is never held back waiting for input that
+follows it.  A match is decided by the text up to one character past its end:
+a pattern that needs more than that to win over a shorter, later match
+(``\\.\\.\\.`` listed before ``\\.``, with ``..`` at the end of a chunk) must
+have its text delivered in one chunk, as line-based sources do.  Consumed text
+is discarded except for the last ``lookahead`` characters, which lookbehind
+assertions may still inspect; memory therefore stays proportional to
+``lookahead`` plus the longest token.  Positions are always tracked eagerly in
+this mode.
+
+Columnar output
+---------------
+``lex_columnar`` returns a ``TokenArray`` instead of a generator: token class
+ids and start/end offsets are stored in flat ``array`` columns, and ``Token``
+objects are only built when the array is indexed or iterated (for example by
+``Parser.parse``).
 """
 
 from __future__ import annotations
 
+import asyncio
+import codecs
+import io
+import logging
+import mmap
+import os
 import re
-from typing import Callable, Generator
+from abc import ABC, abstractmethod
+from typing import (
+    AsyncGenerator,
+    AsyncIterable,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    Literal,
+    Mapping,
+    Sequence,
+    cast,
+)
 
+from plare.dfa import DFA, UnsupportedPattern
 from plare.exception import LexingError
-from plare.token import Token
+from plare.token import LineIndex, Token, TokenArray
 from plare.utils import logger
 
 
+class Keywords:
+    """Handler that picks the token class of a match from a keyword table.
+
+    Use it as the handler of an identifier pattern instead of listing one
+    pattern per keyword ahead of it::
+
+        (r"[a-zA-Z_]\\w*", Keywords({"if": IF, "then": THEN}, ID))
+
+    Args:
+        table: Mapping from keyword text to the token class to emit.
+        default: Token class emitted for text that is not a keyword.
+    """
+
+    def __init__(self, table: Mapping[str, type[Token]], default: type[Token]) -> None:
+        self.table = dict(table)
+        self.default = default
+
+    def lookup(self, matched: str) -> type[Token]:
+        """Return the token class for the matched text."""
+        return self.table.get(matched, self.default)
+
+
+class Skip(ABC):
+    """Base class of handlers that skip a delimited region in one step.
+
+    Subclasses implement ``scan``.
+
+    Args:
+        next: State to switch to after the region, or ``None`` to stay in the
+            current state.
+    """
+
+    def __init__(self, next: str | None = None) -> None:
+        self.next = next
+
+    @abstractmethod
+    def scan(self, src: str, pos: int, depth: int = 1) -> tuple[int, int]:
+        """Skip from ``pos``, just past the opening match, to the end of the region.
+
+        Args:
+            src: The text being lexed.
+            pos: Where to start searching.
+            depth: Number of regions still open at ``pos``.
+
+        Returns:
+            ``(end, 0)`` where ``end`` is the index just past the closing
+            delimiter, or ``(resume, depth)`` when ``src`` ends before the
+            region does; scanning more text can then resume from ``resume``
+            with the returned ``depth``.
+        """
+
+
+class SkipUntil(Skip):
+    """Handler that skips everything up to and including ``delimiter``.
+
+    ::
+
+        (r"/\\*", SkipUntil("*/"))
+
+    Args:
+        delimiter: Literal text that closes the region.
+        next: State to switch to after the region.
+    """
+
+    def __init__(self, delimiter: str, next: str | None = None) -> None:
+        super().__init__(next)
+        self.delimiter = delimiter
+
+    def scan(self, src: str, pos: int, depth: int = 1) -> tuple[int, int]:
+        found = src.find(self.delimiter, pos)
+        if found < 0:
+            return max(pos, len(src) - len(self.delimiter) + 1), depth
+        return found + len(self.delimiter), 0
+
+
+class SkipNested(Skip):
+    """Handler that skips a region with balanced ``open``/``close`` delimiters.
+
+    The matched text counts as the first ``open``; every further ``open``
+    must be matched by its own ``close``::
+
+        (r"\\(\\*", SkipNested("(*", "*)"))
+
+    Args:
+        open: Literal text that opens a (nested) region.
+        close: Literal text that closes a region.
+        next: State to switch to after the outermost region.
+    """
+
+    def __init__(self, open: str, close: str, next: str | None = None) -> None:
+        super().__init__(next)
+        self.open = open
+        self.close = close
+        self.delimiters = re.compile(f"{re.escape(open)}|{re.escape(close)}")
+
+    def scan(self, src: str, pos: int, depth: int = 1) -> tuple[int, int]:
+        for match in self.delimiters.finditer(src, pos):
+            depth += 1 if match.group() == self.open else -1
+            if depth == 0:
+                return match.end(), 0
+            pos = match.end()
+        return max(pos, len(src) - max(len(self.open), len(self.close)) + 1), depth
+
+
+type Handler[T] = (
+    Callable[[str, T, int, int], Token | str | list[Token]]
+    | type[Token]
+    | Keywords
+    | Skip
+    | str
+)
+
+_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+"""Constructs whose meaning changes when a pattern is embedded in a larger regex."""
+
+CHUNK_SIZE = 1 << 16
+"""Number of characters read at a time from an ``io.TextIOBase`` source, and of
+bytes decoded at a time by ``lex_file``."""
+
+LOOKAHEAD = 1 << 16
+"""Default number of characters buffered past the current position when streaming."""
+
+YIELD_EVERY = 1 << 10
+"""Default number of tokens processed between two yields to the asyncio event loop."""
+
+
+def combine_patterns(
+    regexes: list[re.Pattern[str]],
+) -> tuple[re.Pattern[str], dict[str, int]] | None:
+    """Compile ``regexes`` into one ordered alternation with a named group per rule.
+
+    Args:
+        regexes: The compiled patterns of one lexer state, in priority order.
+
+    Returns:
+        A pair ``(combined, groups)`` where ``groups`` maps each wrapper group
+        name to the index of its rule in ``regexes``, or ``None`` when there
+        are no patterns or they cannot be combined without changing their
+        meaning.  (An empty alternation would match the empty string.)
+    """
+    if not regexes:
+        return None
+    if any(_BACKREFERENCE.search(regex.pattern) for regex in regexes):
+        return None
+    groups = {f"_{i}": i for i in range(len(regexes))}
+    alternatives = "|".join(
+        f"(?P<{name}>{regex.pattern})" for name, regex in zip(groups, regexes)
+    )
+    try:
+        combined = re.compile(alternatives)
+    except re.error:
+        return None
+    return combined, groups
+
+
+def decode_windows(src: bytes | mmap.mmap) -> Generator[str]:
+    """Decode UTF-8 ``src`` in windows of ``CHUNK_SIZE`` bytes.
+
+    A character split between two windows is completed by the next one.
+
+    Raises:
+        UnicodeDecodeError: When ``src`` is not valid UTF-8.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    for start in range(0, len(src), CHUNK_SIZE):
+        yield decoder.decode(src[start : start + CHUNK_SIZE])
+    decoder.decode(b"", final=True)
+
+
 class Lexer[T]:
     """Stateful lexer that tokenises a string according to named pattern states.
 
@@ -38,6 +294,15 @@ class Lexer[T]:
         state_factory: Zero-argument callable that produces the initial user
             state object passed to callable handlers.  Defaults to
             ``lambda: None``.
+        combine: Compile each state into a single alternation and dispatch on
+            ``match.lastgroup`` instead of trying the patterns one by one.
+            Matching semantics (first match wins) are unchanged.
+        lazy_positions: Give tokens a shared ``LineIndex`` and an absolute
+            offset instead of tracking ``lineno``/``offset`` per token.
+        engine: ``"re"`` to match with Python's ``re`` module, ``"dfa"`` to
+            compile each state into a table-driven DFA where possible.
+        longest_match: Pick the longest match across all patterns of a state
+            (maximal munch) instead of the first pattern that matches.
 
     Example::
 
@@ -53,39 +318,152 @@ class Lexer[T]:
 
     def __init__(
         self,
-        patterns: dict[
-            str,
-            list[
-                tuple[
-                    str,
-                    Callable[[str, T, int, int], Token | str | list[Token]]
-                    | type[Token]
-                    | str,
-                ]
-            ],
-        ],
+        patterns: dict[str, list[tuple[str, Handler[T]]]],
         state_factory: Callable[[], T] = lambda: None,
+        *,
+        combine: bool = False,
+        lazy_positions: bool = False,
+        engine: Literal["re", "dfa"] = "re",
+        longest_match: bool = False,
     ) -> None:
         self.patterns = {
             token: [(re.compile(r), pattern) for r, pattern in patterns[token]]
             for token in patterns
         }
         self.state_factory = state_factory
+        self.lazy_positions = lazy_positions
+        self.longest_match = longest_match
+        self.dfas: dict[str, DFA] = {}
+        if engine == "dfa":
+            for var, rules in patterns.items():
+                try:
+                    self.dfas[var] = DFA([r for r, _ in rules], longest_match)
+                except UnsupportedPattern as e:
+                    logger.info("State %s falls back to the re engine: %s", var, e)
+        self.combined: dict[str, tuple[re.Pattern[str], dict[str, int]]] = {}
+        if combine and not longest_match:
+            for var, rules in self.patterns.items():
+                combined = combine_patterns([regex for regex, _ in rules])
+                if combined is None:
+                    logger.info(
+                        "Patterns of state %s cannot be combined; "
+                        "falling back to sequential matching",
+                        var,
+                    )
+                    continue
+                self.combined[var] = combined
         logger.info("Lexer created")
 
-    def lex(self, var: str, src: str) -> Generator[Token]:
+    def match(
+        self, var: str, src: str, pos: int = 0
+    ) -> tuple[re.Pattern[str], Handler[T], int] | None:
+        """Match ``src`` at index ``pos`` against the patterns of state ``var``.
+
+        Returns:
+            ``(regex, handler, end)`` for the first pattern that matches (the
+            longest one with ``longest_match``), where ``end`` is the index
+            just past the matched text, or ``None`` when no pattern matches.
+        """
+        patterns = self.patterns[var]
+        dfa = self.dfas.get(var)
+        if dfa is not None:
+            found = dfa.scan(src, pos)
+            if found is None:
+                return None
+            rule, end = found
+            regex, pattern = patterns[rule]
+            return regex, pattern, end
+
+        if self.longest_match:
+            best: tuple[re.Pattern[str], Handler[T], int] | None = None
+            for regex, pattern in patterns:
+                match = regex.match(src, pos)
+                if match is not None and (best is None or match.end() > best[2]):
+                    best = regex, pattern, match.end()
+            return best
+
+        combined = self.combined.get(var)
+        if combined is not None:
+            regex, groups = combined
+            match = regex.match(src, pos)
+            if match is None:
+                return None
+            # Every alternative is a named group, so one of them matched.
+            name = match.lastgroup
+            assert name is not None
+            regex, pattern = patterns[groups[name]]
+            return regex, pattern, match.end()
+
+        for regex, pattern in patterns:
+            match = regex.match(src, pos)
+            if match is not None:
+                return regex, pattern, match.end()
+        return None
+
+    def dispatch(
+        self,
+        var: str,
+        pattern: Handler[T],
+        matched: str,
+        state: T,
+        lineno: int | LineIndex,
+        offset: int,
+    ) -> tuple[str, type[Token] | Sequence[Token]]:
+        """Run the handler ``pattern`` of a match of ``matched`` in state ``var``.
+
+        With a ``LineIndex`` as ``lineno``, ``offset`` is the absolute offset
+        of the match; callable handlers are then given its resolved position.
+
+        Returns:
+            ``(var, emit)`` where ``var`` is the next state and ``emit`` is
+            either the token class to build from ``matched``, left to the
+            caller so it can store the token in its own form, or the tokens
+            to emit (possibly none).
+        """
+        match pattern:
+            case str():
+                return pattern, ()
+            case Skip():
+                return pattern.next or var, ()
+            case Keywords():
+                return var, pattern.lookup(matched)
+            case type():
+                return var, pattern
+            case _:
+                if isinstance(lineno, LineIndex):
+                    lineno, offset = lineno.position(offset)
+                token = pattern(matched, state, lineno, offset)
+                match token:
+                    case Token():
+                        return var, (token,)
+                    case list():
+                        return var, token
+                    case _:
+                        return token, ()
+
+    def lex(
+        self, var: str, src: str | io.TextIOBase | Iterable[str]
+    ) -> Generator[Token]:
         """Tokenise ``src`` starting in state ``var``.
 
         Scans ``src`` left-to-right.  At each position, the patterns for the
         current state are tried in order; the first match is consumed and its
         handler is invoked.  Unmatched input raises ``LexingError``.
 
+        Patterns are matched in place with ``regex.match(src, pos)`` rather
+        than against a copy of the remaining input, so lexing is linear in the
+        length of ``src``.  As a consequence ``^`` only matches at the very
+        start of the input (or after a newline with ``(?m)``), and lookbehind
+        assertions can see the text preceding the current position.
+
         ``lineno`` and ``offset`` are tracked across newlines: ``lineno`` is
-        1-based, ``offset`` resets to 0 at the start of each new line.
+        1-based, ``offset`` resets to 0 at the start of each new line.  In
+        lazy-position mode they are resolved from a ``LineIndex`` on demand.
 
         Args:
             var: Name of the initial lexer state (must be a key in ``patterns``).
-            src: Source string to tokenise.
+            src: Source string to tokenise, or a text stream or iterable of
+                string chunks to tokenise incrementally (see ``lex_stream``).
 
         Yields:
             ``Token`` instances in source order.
@@ -93,49 +471,346 @@ class Lexer[T]:
         Raises:
             LexingError: When no pattern matches the next character.
         """
+        if not isinstance(src, str):
+            yield from self.lex_stream(var, src)
+            return
+
         state = self.state_factory()
+        debug = logger.isEnabledFor(logging.DEBUG)
+        lines = LineIndex(src) if self.lazy_positions else None
         lineno = 1
-        offset = 0
+        line_start = 0
+        pos = 0
+        length = len(src)
         ended = False
 
         while not ended:
-            if len(src) == 0:
+            if pos == length:
                 ended = True
 
-            patterns = self.patterns[var]
+            found = self.match(var, src, pos)
+            if found is None:
+                if pos == length:
+                    continue
+                message = f"Unexpected character: {src[pos]}"
+                if lines is not None:
+                    raise LexingError(message, lines, pos)
+                raise LexingError(message, lineno, pos - line_start)
+
+            regex, pattern, end = found
+            if isinstance(pattern, Skip):
+                end, depth = pattern.scan(src, end)
+                if depth:
+                    end = length
+            start, pos = pos, end
+            matched = src[start:end]
+            if debug:
+                logger.debug("Pattern matched: %s (from %s), %r", regex, var, matched)
 
-            for regex, pattern in patterns:
-                match = regex.match(src)
-                if match is None:
+            at_lineno: int | LineIndex
+            if lines is None:
+                at_lineno, at_offset = lineno, start - line_start
+                newlines = src.count("\n", start, end)
+                if newlines:
+                    lineno += newlines
+                    line_start = src.rfind("\n", start, end) + 1
+            else:
+                at_lineno, at_offset = lines, start
+
+            var, emit = self.dispatch(
+                var, pattern, matched, state, at_lineno, at_offset
+            )
+            if isinstance(emit, type):
+                yield emit(matched, lineno=at_lineno, offset=at_offset)
+            else:
+                yield from emit
+
+    def lex_columnar(self, var: str, src: str) -> TokenArray:
+        """Tokenise ``src`` into a columnar ``TokenArray``.
+
+        Scans exactly like ``lex`` but records each token as a class id and
+        a pair of offsets instead of constructing it.  ``Token`` instances
+        are built only when the array is indexed or iterated.  Callable
+        handlers still run during scanning and the tokens they return are
+        stored as-is.
+
+        Args:
+            var: Name of the initial lexer state (must be a key in ``patterns``).
+            src: Source string to tokenise.
+
+        Returns:
+            A ``TokenArray`` holding every token of ``src`` in source order.
+
+        Raises:
+            LexingError: When no pattern matches the next character.
+        """
+        state = self.state_factory()
+        tokens = TokenArray(src)
+        lines = tokens.lines
+        pos = 0
+        length = len(src)
+        ended = False
+
+        while not ended:
+            if pos == length:
+                ended = True
+
+            found = self.match(var, src, pos)
+            if found is None:
+                if pos == length:
                     continue
-                matched = match.group(0)
-                logger.debug(
-                    "Pattern matched: %s (from %s), %s", regex, var, repr(matched)
-                )
-                src = src[len(matched) :]
-                match pattern:
-                    case str():
-                        var = pattern
-                    case type():
-                        yield pattern(matched, lineno=lineno, offset=offset)
-                    case _:
-                        token = pattern(matched, state, lineno, offset)
-                        match token:
-                            case Token():
-                                yield token
-                            case list():
-                                yield from token
-                            case _:
-                                var = token
-                matched_lines = matched.split("\n")
-                n_matched_new_lines = len(matched_lines) - 1
-                lineno += n_matched_new_lines
-                if n_matched_new_lines > 0:
-                    offset = 0
-                last_matched_line = matched_lines[-1]
-                offset += len(last_matched_line)
-                break
+                raise LexingError(f"Unexpected character: {src[pos]}", lines, pos)
+
+            _, pattern, end = found
+            if isinstance(pattern, Skip):
+                end, depth = pattern.scan(src, end)
+                if depth:
+                    end = length
+            start, pos = pos, end
+
+            matched = src[start:end]
+            var, emit = self.dispatch(var, pattern, matched, state, lines, start)
+            if isinstance(emit, type):
+                tokens.append(emit, start, end)
             else:
-                if len(src) == 0:
+                for token in emit:
+                    tokens.append_token(token, start, end)
+        return tokens
+
+    def lex_stream(
+        self,
+        var: str,
+        chunks: io.TextIOBase | Iterable[str],
+        *,
+        lookahead: int = LOOKAHEAD,
+    ) -> Generator[Token]:
+        """Tokenise a chunked text source through a bounded buffer.
+
+        Tokens, positions and errors are the same as ``lex`` on the
+        concatenated input, provided each match is decided by the text up to
+        one character past its end (see the module documentation).  Each
+        token is yielded as soon as the text following it has been read.
+
+        Args:
+            var: Name of the initial lexer state (must be a key in ``patterns``).
+            chunks: A text stream, read a line (of at most ``CHUNK_SIZE``
+                characters) at a time so that a pipe or terminal is not
+                waited on for more, or any iterable of string chunks.
+            lookahead: Number of characters of consumed input kept in the
+                buffer for lookbehind assertions.
+
+        Yields:
+            ``Token`` instances in source order.
+
+        Raises:
+            LexingError: When no pattern matches the next character.
+            ValueError: If ``lookahead`` is less than 1.
+        """
+        if lookahead < 1:
+            raise ValueError("lookahead must be at least 1")
+        if isinstance(chunks, io.TextIOBase):
+            stream = chunks
+            chunks = iter(lambda: stream.readline(CHUNK_SIZE), "")
+        # With a source the scanner never yields a chunk request.
+        tokens = self.scan_chunks(var, iter(chunks), [], lookahead)
+        yield from cast("Generator[Token]", tokens)
+
+    async def alex(
+        self,
+        var: str,
+        chunks: AsyncIterable[str | bytes],
+        *,
+        lookahead: int = LOOKAHEAD,
+        yield_every: int = YIELD_EVERY,
+    ) -> AsyncGenerator[Token]:
+        """Tokenise an asynchronous chunked source, such as a ``StreamReader``.
+
+        Chunks are awaited as the buffer needs them and lexed as in
+        ``lex_stream``, so tokens, positions and errors are the same.  Bytes
+        chunks are decoded as UTF-8, also when a character is split between
+        chunks; positions count characters.
+
+        Lexing does not wait on the source while the buffered text still
+        holds complete tokens, so the lexer also gives control back to the
+        event loop after every ``yield_every`` tokens; a large payload then
+        cannot starve the other tasks.
+
+        Args:
+            var: Name of the initial lexer state (must be a key in ``patterns``).
+            chunks: An asynchronous iterable of string or UTF-8 bytes chunks.
+            lookahead: Number of characters of consumed input kept in the
+                buffer for lookbehind assertions.
+            yield_every: Number of tokens lexed between two yields to the
+                event loop.
+
+        Yields:
+            ``Token`` instances in source order.
+
+        Raises:
+            LexingError: When no pattern matches the next character.
+            UnicodeDecodeError: When a bytes chunk is not valid UTF-8.
+            ValueError: If ``lookahead`` or ``yield_every`` is less than 1.
+        """
+        if lookahead < 1:
+            raise ValueError("lookahead must be at least 1")
+        if yield_every < 1:
+            raise ValueError("yield_every must be at least 1")
+        source = aiter(chunks)
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        pending: list[str | None] = []
+        countdown = yield_every
+        for token in self.scan_chunks(var, None, pending, lookahead):
+            if token is None:
+                chunk = await anext(source, None)
+                if chunk is None:
+                    decoder.decode(b"", final=True)
+                elif isinstance(chunk, bytes):
+                    chunk = decoder.decode(chunk)
+                pending.append(chunk)
+                continue
+            yield token
+            countdown -= 1
+            if not countdown:
+                countdown = yield_every
+                await asyncio.sleep(0)
+
+    def scan_chunks(
+        self,
+        var: str,
+        source: Iterator[str] | None,
+        pending: list[str | None],
+        lookahead: int,
+    ) -> Generator[Token | None]:
+        """Tokenise chunks through a bounded buffer; the core of ``lex_stream``.
+
+        The buffer is refilled from ``source``.  Without a source the scanner
+        yields ``None`` whenever it needs the next chunk instead; the caller
+        then appends that chunk to ``pending``, or ``None`` at the end of the
+        input.  This lets ``alex`` await its chunks.
+
+        Args:
+            var: Name of the initial lexer state (must be a key in ``patterns``).
+            source: An iterator of string chunks, or ``None`` to be handed the
+                chunks through ``pending``.
+            pending: The list the caller puts a requested chunk in.
+            lookahead: Number of characters of consumed input kept in the
+                buffer for lookbehind assertions.
+
+        Yields:
+            ``Token`` instances in source order, and ``None`` for each chunk
+            request when there is no ``source``.
+
+        Raises:
+            LexingError: When no pattern matches the next character.
+        """
+        state = self.state_factory()
+        debug = logger.isEnabledFor(logging.DEBUG)
+        buffer = ""
+        base = 0
+        pos = 0
+        exhausted = False
+        lineno = 1
+        line_start = 0
+        ended = False
+
+        while not ended:
+            while True:
+                if exhausted or pos < len(buffer):
+                    found = self.match(var, buffer, pos)
+                    if exhausted or found is not None and found[2] < len(buffer):
+                        break
+                if source is None:
+                    yield None
+                    chunk = pending.pop()
+                else:
+                    chunk = next(source, None)
+                if chunk is None:
+                    exhausted = True
+                    continue
+                if pos > lookahead:
+                    base += pos - lookahead
+                    buffer = buffer[pos - lookahead :]
+                    pos = lookahead
+                buffer += chunk
+
+            if pos == len(buffer):
+                ended = True
+
+            if found is None:
+                if ended:
                     continue
-                raise LexingError(f"Unexpected character: {src[0]}", lineno, offset)
+                message = f"Unexpected character: {buffer[pos]}"
+                raise LexingError(message, lineno, base + pos - line_start)
+
+            regex, pattern, end = found
+            if isinstance(pattern, Skip):
+                end, depth = pattern.scan(buffer, end)
+                while depth:
+                    if end - pos > lookahead:
+                        # Count the lines of the region scanned so far and
+                        # drop it, keeping ``lookahead`` characters before
+                        # ``end``, so a long region does not grow the buffer.
+                        cut = end - lookahead
+                        newlines = buffer.count("\n", pos, cut)
+                        if newlines:
+                            lineno += newlines
+                            line_start = base + buffer.rfind("\n", pos, cut) + 1
+                        base += cut
+                        buffer = buffer[cut:]
+                        pos, end = 0, lookahead
+                    if source is None:
+                        yield None
+                        chunk = pending.pop()
+                    else:
+                        chunk = next(source, None)
+                    if chunk is None:
+                        exhausted = True
+                        end = len(buffer)
+                        break
+                    buffer += chunk
+                    end, depth = pattern.scan(buffer, end, depth)
+            start, pos = pos, end
+            matched = buffer[start:end]
+            if debug:
+                logger.debug("Pattern matched: %s (from %s), %r", regex, var, matched)
+
+            at_lineno, at_offset = lineno, base + start - line_start
+            newlines = matched.count("\n")
+            if newlines:
+                lineno += newlines
+                line_start = base + start + matched.rfind("\n") + 1
+
+            var, emit = self.dispatch(
+                var, pattern, matched, state, at_lineno, at_offset
+            )
+            if isinstance(emit, type):
+                yield emit(matched, lineno=at_lineno, offset=at_offset)
+            else:
+                yield from emit
+
+    def lex_file(self, var: str, path: str | os.PathLike[str]) -> Generator[Token]:
+        """Tokenise the UTF-8 file at ``path`` starting in state ``var``.
+
+        The file is memory-mapped and lexed with ``lex_stream`` one decoded
+        window of ``CHUNK_SIZE`` bytes at a time, so memory use is bounded by
+        the stream buffer and the tokens kept alive by the caller rather than
+        by the size of the file.  Tokens, positions and errors are the same
+        as ``lex(var, text)`` on the decoded text.
+
+        Args:
+            var: Name of the initial lexer state (must be a key in ``patterns``).
+            path: Path of the file to tokenise.
+
+        Yields:
+            ``Token`` instances in source order.
+
+        Raises:
+            LexingError: When no pattern matches the next character.
+            UnicodeDecodeError: When the file is not valid UTF-8.
+        """
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                yield from self.lex_stream(var, [])
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as src:
+                yield from self.lex_stream(var, decode_windows(src))
@@ -6,22 +6,45 @@ spontaneous-generation and propagation algorithm (Aho-Sethi-Ullman §9.6).
 
 Construction pipeline (``Parser.__init__``):
     1. Augment the grammar with ``StartVariable(X) → X`` entry rules.
-    2. Compute FIRST sets for every non-terminal.
+    2. Compute FIRST sets for every non-terminal and intern the grammar
+       (``Grammar``): symbols, productions and items become dense ints.
     3. Build the LR(0) canonical collection (states + transitions) via
-       ``closure`` / ``goto`` BFS.
-    4. Compute LALR(1) per-item lookahead sets (ASU §9.6).
+       ``closure`` / ``goto`` BFS over item ids; states are keyed by their
+       kernel items.
+    4. Compute LALR(1) per-item lookahead sets, either by spontaneous
+       generation and propagation (ASU §9.6, the default) or from the
+       DeRemer–Pennello relations (``lookaheads="deremer-pennello"``).
     5. Populate the action/goto table; resolve shift/reduce and reduce/reduce
-       conflicts using token precedence and associativity.
+       conflicts using token precedence and associativity.  States whose only
+       action is one reduction keep it as a default reduction instead, which
+       the driver applies without reading a lookahead token.
 """
 
 from __future__ import annotations
 
-from collections import deque
-from collections.abc import Mapping, Sequence
-from itertools import chain
-from typing import Iterable, Protocol, TypeGuard
-
+import asyncio
+import importlib
+import logging
+import struct
+import sys
+from array import array
+from collections import Counter, deque
+from collections.abc import (
+    AsyncIterable,
+    Callable,
+    Generator,
+    Hashable,
+    Mapping,
+    Sequence,
+)
+from operator import itemgetter
+from types import ModuleType
+from typing import Any, Iterable, Literal, Protocol, Self, TypeGuard, cast
+
+import plare
+from plare.cache import TableCache
 from plare.exception import ParserError, ParsingError
+from plare.lexer import YIELD_EVERY
 from plare.token import Token
 from plare.utils import logger
 
@@ -84,6 +107,65 @@ class IDMaker[T](Maker[T]):
         return f"${self.arg}"
 
 
+def child_indices(args: Sequence[int], n: int) -> list[int]:
+    """Return the argument indices ``args`` of a production of ``n`` symbols
+    as non-negative indices.
+
+    Negative indices count from the end of the right-hand side, as they do
+    when indexing the children with ``xs[i]``.
+
+    Raises:
+        ValueError: If an index is not in ``-n <= i < n``.
+    """
+    for i in args:
+        if not -n <= i < n:
+            raise ValueError(f"Argument index {i} out of range for {n} symbols")
+    return [i % n for i in args]
+
+
+def compile_maker[T](
+    maker: Maker[T], n: int
+) -> tuple[Callable[..., T | Token] | None, slice, int]:
+    """Return how ``Parser.parse`` applies ``maker`` to the top ``n`` values.
+
+    The result is ``(call, pick, index)``.  When ``call`` is ``None`` the
+    reduction passes the value at ``index`` (counted from the top of the
+    value stack, so negative) through without any call; a unit production
+    then leaves the value stack as it is.  Otherwise the new value is
+    ``call(*values[pick])``: a ``TMaker`` whose argument indices are evenly
+    spaced calls its AST class on a strided slice, other indices are
+    selected with ``operator.itemgetter``, and any other maker is called
+    on every popped value.
+
+    Args:
+        maker: The maker of a reduction.
+        n: The number of values the reduction pops.
+
+    Returns:
+        The callable or ``None``, the slice of its arguments, and the index
+        of the passed-through value.
+
+    Raises:
+        ValueError: If an argument index of ``maker`` is out of range.
+    """
+    if isinstance(maker, IDMaker):
+        return None, slice(0, 0), child_indices([maker.arg], n)[0] - n
+    if not isinstance(maker, TMaker):
+        return maker, slice(-n, None) if n else slice(0, 0), 0
+    cls, args = maker.type, child_indices(maker.args, n)
+    if not args:
+        return cls, slice(0, 0), 0
+    step = args[1] - args[0] if len(args) > 1 else 1
+    if step > 0 and args == list(range(args[0], args[-1] + 1, step)):
+        return cls, slice(args[0] - n, args[-1] - n + 1 or None, step), 0
+    getter = itemgetter(*args)
+
+    def call(*xs: T | Token) -> T:
+        return cls(*getter(xs))
+
+    return call, slice(-n, None), 0
+
+
 class StartVariable(str):
     """Augmented-grammar start symbol wrapper.
 
@@ -137,14 +219,26 @@ class Item[T]:
             resolution; ``0`` means no precedence.
         definition_index: Grammar-wide ordinal of this production (0 = first
             defined).
+        hash: Hash of ``(left, right, loc)``, computed once on construction.
     """
 
+    __slots__ = (
+        "left",
+        "right",
+        "loc",
+        "maker",
+        "precedence",
+        "definition_index",
+        "hash",
+    )
+
     left: str | StartVariable
     right: list[Symbol]
     loc: int
     maker: Maker[T]
     precedence: int
     definition_index: int
+    hash: int
 
     def __init__(
         self,
@@ -169,6 +263,7 @@ class Item[T]:
                 if token.precedence != 0:
                     self.precedence = token.precedence
                     break
+        self.hash = hash((left, tuple(right), loc))
 
     @property
     def next(self) -> Symbol | None:
@@ -206,11 +301,12 @@ class Item[T]:
         return f"{self.left} {arrow} {before_dot} . {after_dot}"
 
     def __hash__(self) -> int:
-        return hash((self.left, tuple(self.right), self.loc))
+        return self.hash
 
     def __eq__(self, value: object) -> bool:
         return (
             isinstance(value, Item)
+            and self.hash == value.hash
             and self.left == value.left
             and self.right == value.right
             and self.loc == value.loc
@@ -220,32 +316,39 @@ class Item[T]:
 class State[T]:
     """An LR(0) automaton state: a set of LR(0) items with a unique integer id.
 
+    Table construction works on the interned item ids of ``Grammar``; a
+    ``State`` is the readable form of one of its states, used for debug
+    output.
+
     Attributes:
         id: Index used to look up rows in the ``Table``.
         items: The closed set of LR(0) items that define this state.
-        lookaheads: LALR(1) lookahead sets keyed by item.  For each complete
-            item ``[A → α •]`` in this state, ``lookaheads[item]`` is the set
-            of tokens on which the reduction fires.  Populated during Phase 5
-            of ``Parser.__init__``.
+        hash: Hash of ``items``, computed once on construction.
     """
 
+    __slots__ = ("id", "items", "hash")
+
     id: int
     items: set[Item[T]]
-    lookaheads: dict[Item[T], set[type[Token]]]
+    hash: int
 
     def __init__(self, id: int, items: set[Item[T]]) -> None:
         self.id = id
         self.items = items
-        self.lookaheads = {}
+        self.hash = hash(frozenset(items))
 
     def __hash__(self) -> int:
-        return hash(frozenset(self.items))
+        return self.hash
 
     def is_instance(self, obj: object) -> TypeGuard[State[T]]:
         return isinstance(obj, State)
 
     def __eq__(self, other: object) -> bool:
-        return self.is_instance(other) and self.items == other.items
+        return (
+            self.is_instance(other)
+            and self.hash == other.hash
+            and self.items == other.items
+        )
 
     def __str__(self) -> str:
         return "\n".join(map(str, self.items))
@@ -358,12 +461,16 @@ class Table[T]:
 
     Attributes:
         table: Row-per-state list of ``{symbol: action}`` dicts.
+        defaults: Default reduction of each consistent state, whose only
+            action is that reduction; its row is kept for ``expected_tokens``.
     """
 
     table: list[dict[Symbol, Action[T] | None]]
+    defaults: dict[int, Reduce[T]]
 
     def __init__(self, states: int) -> None:
         self.table = [{} for _ in range(states)]
+        self.defaults = {}
 
     def __setitem__(self, key: tuple[int, Symbol], action: Action[T]) -> None:
         state, symbol = key
@@ -408,7 +515,12 @@ class Table[T]:
 
     def __getitem__(self, key: tuple[int, Symbol]) -> Action[T] | None:
         state, symbol = key
-        return self.table[state][symbol]
+        try:
+            return self.table[state][symbol]
+        except KeyError:
+            if isinstance(symbol, type) and state in self.defaults:
+                return self.defaults[state]
+            raise
 
     def expected_tokens(self, state: int) -> list[type[Token]]:
         """Return terminal classes that have an action in *state*."""
@@ -418,6 +530,25 @@ class Table[T]:
         """Overwrite a table entry with the winning action from a resolved conflict."""
         self.table[state][symbol] = winner
 
+    def use_default_reductions(self) -> None:
+        """Move the reduction of every consistent state into ``defaults``.
+
+        A state is consistent when all its actions are the same reduction;
+        the parse driver then reduces without reading a lookahead token.
+        The row stays as it is, so that an error found after the reduction
+        can still report the tokens the state expected.
+        """
+        for state, row in enumerate(self.table):
+            actions = list(row.values())
+            if not actions or not isinstance(actions[0], Reduce):
+                continue
+            key = action_key(actions[0])
+            if all(
+                isinstance(symbol, type) and action_key(action) == key
+                for symbol, action in row.items()
+            ):
+                self.defaults[state] = actions[0]
+
 
 class Rule[T]:
     """All RHS alternatives for a single non-terminal.
@@ -430,6 +561,10 @@ class Rule[T]:
         left: The non-terminal name (LHS).
         rights: List of ``(rhs_symbols, maker, prec_override)`` triples.
         definition_indices: Grammar-wide ordinal for each production alternative.
+
+    Raises:
+        ValueError: If an argument index is out of range for its production;
+            negative indices count from the end and are stored non-negative.
     """
 
     left: str
@@ -443,14 +578,13 @@ class Rule[T]:
         start_index: int,
     ) -> None:
         self.left = left
-        self.rights = [
-            (
-                right,
-                TMaker(action, args) if action is not None else IDMaker(*args),
-                prec_override,
+        self.rights = []
+        for right, action, args, prec_override in rights:
+            args = child_indices(args, len(right))
+            maker: Maker[T] = (
+                TMaker(action, args) if action is not None else IDMaker[T](*args)
             )
-            for right, action, args, prec_override in rights
-        ]
+            self.rights.append((right, maker, prec_override))
         self.definition_indices = list(range(start_index, start_index + len(rights)))
 
     def __hash__(self) -> int:
@@ -478,44 +612,23 @@ def compute_first_sets[T](rules: dict[str, Rule[T]]) -> dict[str, set[type[Token
 
     Iterates over all productions until no FIRST set changes.  Handles
     ε-productions and nullable non-terminals by continuing past them in the
-    symbol sequence.
+    symbol sequence.  The iteration runs on the bitsets of ``Grammar``; the
+    results are converted back to sets of token classes.
 
     Args:
         rules: Complete grammar mapping non-terminal name → ``Rule``.
 
     Returns:
-        Mapping from non-terminal name to its FIRST set.
+        Mapping from non-terminal name to its FIRST set, which contains
+        ``EPSILON`` when the non-terminal is nullable.
     """
-    first: dict[str, set[type[Token]]] = {name: set() for name in rules}
-    changed = True
-    while changed:
-        changed = False
-        for name, rule in rules.items():
-            for right, _, _ in rule.rights:
-                if not right:
-                    if EPSILON not in first[name]:
-                        first[name].add(EPSILON)
-                        changed = True
-                    continue
-                for sym in right:
-                    if isinstance(sym, type):
-                        if sym is EPSILON:
-                            continue
-                        if sym not in first[name]:
-                            first[name].add(sym)
-                            changed = True
-                        break
-                    else:
-                        added = first[sym] - {EPSILON} - first[name]
-                        if added:
-                            first[name].update(added)
-                            changed = True
-                        if EPSILON not in first[sym]:
-                            break
-                else:
-                    if EPSILON not in first[name]:
-                        first[name].add(EPSILON)
-                        changed = True
+    grammar = Grammar(rules)
+    first: dict[str, set[type[Token]]] = {}
+    for name in rules:
+        symbol = grammar.symbol_ids[name]
+        first[name] = grammar.tokens(grammar.first[symbol])
+        if grammar.nullable[symbol]:
+            first[name].add(EPSILON)
     return first
 
 
@@ -532,176 +645,364 @@ def symbol_sort_key(s: Symbol) -> tuple[int, str]:
     return (1, s)
 
 
-def closure[T](items: set[Item[T]], all_items: dict[str, set[Item[T]]]) -> set[Item[T]]:
-    """Compute the LR(0) closure of an item set.
+class Grammar[T]:
+    """A grammar whose symbols, productions and items are interned to dense ints.
 
-    This is the standard LR(0) closure operation (Aho-Sethi-Ullman §4.6):
-    for every item ``[A → α • B β]`` in the set, add the initial items
-    ``[B → • γ]`` for every production of B.  Repeat until no new items
-    are added.
+    Table construction hashes items and item sets constantly, so it runs on
+    ints rather than on ``Item`` objects.  Symbols are numbered in
+    ``symbol_sort_key`` order, so sorting symbol ids gives the same stable
+    order as sorting the symbols themselves.  The items of production ``p``
+    are numbered consecutively from ``item_base[p]``: item
+    ``item_base[p] + d`` is ``p`` with the dot at ``d``, so advancing the dot
+    of an item adds one to its id.
 
-    Invariant: ``all_items`` must contain the complete initial item set for
-    every non-terminal reachable from the grammar's start symbols.  Missing
-    non-terminals will silently produce an incomplete closure.
+    Sets of terminals are bitsets: Python ints whose bit ``i`` stands for
+    ``terminals[i]``.  Terminals sort first, so the bit of a grammar
+    terminal is its symbol id; ``EOS`` and ``DUMMY_LOOKAHEAD`` follow them.
+    ``tokens`` converts a bitset back to a set of token classes.
 
     Args:
-        items: The kernel item set to close.
-        all_items: Mapping from non-terminal name → its initial items ``{[A → • rhs]}``.
+        rules: Complete grammar mapping non-terminal name → ``Rule``.
 
-    Returns:
-        The closed item set (a new ``set`` that is a superset of ``items``).
+    Attributes:
+        symbols: The symbol of each symbol id.
+        symbol_ids: Mapping from symbol to symbol id.
+        terminal: Whether each symbol id is a terminal.
+        start_variable: Whether each symbol id is a ``StartVariable``.
+        terminals: The token class of each terminal bit.
+        eos: Bitset of ``EOS``.
+        dummy_lookahead: Bitset of ``DUMMY_LOOKAHEAD``.
+        first: FIRST set of each symbol id as a bitset, without ε; a
+            terminal's FIRST set is the terminal itself.
+        nullable: Whether each symbol id derives ε.
+        productions: Initial item ``[A → • rhs]`` of each production id.
+        lefts: LHS symbol id of each production id.
+        rights: RHS symbol ids of each production id.
+        item_base: Item id of the initial item of each production id.
+        initial_items: Initial item ids of the productions of each symbol id
+            (empty for terminals).
+        nonterminal_closures: Closure of ``initial_items`` of each symbol id:
+            the initial items of every non-terminal it starts with, itself
+            included (empty for terminals).
+        item_production: Production id of each item id.
+        item_dot: Dot position of each item id.
+        item_next: Symbol id after the dot of each item id, or ``-1`` when the
+            item is complete.
+        item_kernel: Whether each item id is a kernel item: its dot is not at
+            the start, or its LHS is a ``StartVariable``.
     """
-    items = set(items)
-    worklist: deque[Item[T]] = deque(items)
-    while worklist:
-        item = worklist.popleft()
-        next = item.next
-        if next is None or isinstance(next, type):
-            continue
-        to_update = all_items[next] - items
-        if to_update:
-            worklist.extend(to_update)
-            items.update(to_update)
-    return items
 
+    symbols: list[Symbol]
+    symbol_ids: dict[Symbol, int]
+    terminal: list[bool]
+    start_variable: list[bool]
+    terminals: list[type[Token]]
+    eos: int
+    dummy_lookahead: int
+    first: list[int]
+    nullable: list[bool]
+    productions: list[Item[T]]
+    lefts: list[int]
+    rights: list[tuple[int, ...]]
+    item_base: list[int]
+    initial_items: list[list[int]]
+    nonterminal_closures: list[frozenset[int]]
+    item_production: list[int]
+    item_dot: list[int]
+    item_next: list[int]
+    item_kernel: list[bool]
+
+    def __init__(self, rules: dict[str, Rule[T]]) -> None:
+        seen: dict[Symbol, None] = dict.fromkeys(rules)
+        for rule in rules.values():
+            for right, _, _ in rule.rights:
+                seen.update(dict.fromkeys(right))
+        self.symbols = sorted(seen, key=symbol_sort_key)
+        self.symbol_ids = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.terminal = [isinstance(symbol, type) for symbol in self.symbols]
+        self.start_variable = [
+            isinstance(symbol, StartVariable) for symbol in self.symbols
+        ]
+        self.terminals = [symbol for symbol in self.symbols if isinstance(symbol, type)]
+        for sentinel in (EOS, DUMMY_LOOKAHEAD):
+            if sentinel not in self.terminals:
+                self.terminals.append(sentinel)
+        self.eos = 1 << self.terminals.index(EOS)
+        self.dummy_lookahead = 1 << self.terminals.index(DUMMY_LOOKAHEAD)
+
+        self.productions = []
+        self.lefts = []
+        self.rights = []
+        self.item_base = []
+        self.initial_items = [[] for _ in self.symbols]
+        self.item_production = []
+        self.item_dot = []
+        self.item_next = []
+        self.item_kernel = []
+        for rule in rules.values():
+            left = self.symbol_ids[rule.left]
+            for (right, maker, prec_override), idx in zip(
+                rule.rights, rule.definition_indices
+            ):
+                production = len(self.productions)
+                base = len(self.item_production)
+                ids = tuple(self.symbol_ids[symbol] for symbol in right)
+                self.productions.append(
+                    Item(rule.left, right, maker, idx, prec_override=prec_override)
+                )
+                self.lefts.append(left)
+                self.rights.append(ids)
+                self.item_base.append(base)
+                self.initial_items[left].append(base)
+                for dot in range(len(ids) + 1):
+                    self.item_production.append(production)
+                    self.item_dot.append(dot)
+                    self.item_next.append(ids[dot] if dot < len(ids) else -1)
+                    self.item_kernel.append(dot > 0 or self.start_variable[left])
+
+        # FIRST sets by worklist fixed-point iteration: a production is
+        # revisited only when the FIRST set or nullability of a symbol in its
+        # right-hand side grows.  An ``EPSILON`` written in a right-hand side
+        # derives ε.
+        epsilon = self.symbol_ids.get(EPSILON)
+        self.first = [
+            1 << symbol if terminal else 0
+            for symbol, terminal in enumerate(self.terminal)
+        ]
+        self.nullable = [False] * len(self.symbols)
+        first = self.first
+        nullable = self.nullable
+        users: list[list[int]] = [[] for _ in self.symbols]
+        for production, right in enumerate(self.rights):
+            for symbol in set(right):
+                users[symbol].append(production)
+        worklist = list(reversed(range(len(self.rights))))
+        queued = [True] * len(self.rights)
+        while worklist:
+            production = worklist.pop()
+            queued[production] = False
+            left = self.lefts[production]
+            bits = 0
+            derives_epsilon = True
+            for symbol in self.rights[production]:
+                if symbol == epsilon:
+                    continue
+                bits |= first[symbol]
+                if not nullable[symbol]:
+                    derives_epsilon = False
+                    break
+            grown = first[left] | bits != first[left]
+            if derives_epsilon and not nullable[left]:
+                nullable[left] = True
+                grown = True
+            if grown:
+                first[left] |= bits
+                for user in users[left]:
+                    if not queued[user]:
+                        queued[user] = True
+                        worklist.append(user)
+
+        # ``B`` starts with ``C`` iff some production ``B → C γ`` exists; the
+        # closure of ``[A → α • B β]`` adds the initial items of every
+        # non-terminal ``B`` reaches through this relation.
+        nonterminals = [i for i, terminal in enumerate(self.terminal) if not terminal]
+        starts_with: dict[int, list[int]] = {symbol: [] for symbol in nonterminals}
+        for left, right in zip(self.lefts, self.rights):
+            if right and not self.terminal[right[0]]:
+                starts_with[left].append(right[0])
+        closures = digraph(
+            nonterminals,
+            starts_with,
+            {symbol: set(self.initial_items[symbol]) for symbol in nonterminals},
+        )
+        self.nonterminal_closures = [
+            frozenset(closures.get(symbol, ())) for symbol in range(len(self.symbols))
+        ]
+
+    def tokens(self, bits: int) -> set[type[Token]]:
+        """Return the set of token classes of the bitset ``bits``."""
+        tokens: set[type[Token]] = set()
+        while bits:
+            low = bits & -bits
+            tokens.add(self.terminals[low.bit_length() - 1])
+            bits ^= low
+        return tokens
+
+    def item(self, item: int) -> Item[T]:
+        """Return the ``Item`` of the item id ``item``."""
+        production = self.productions[self.item_production[item]]
+        return Item(
+            production.left,
+            production.right,
+            production.maker,
+            production.definition_index,
+            self.item_dot[item],
+            production.precedence,
+        )
 
-def goto[T](
-    items: set[Item[T]],
-    symbol: Symbol,
-    all_items: dict[str, set[Item[T]]],
-) -> set[Item[T]]:
-    """Compute the LR(0) goto set: the successor state on ``symbol``.
 
-    Advances the dot past ``symbol`` in every item that has ``symbol``
-    immediately after its dot, then takes the closure of the resulting kernel.
-    This defines the transition function of the LR(0) automaton and is used
-    during the canonical-collection BFS in ``Parser.__init__``.
+def closure[T](items: Iterable[int], grammar: Grammar[T]) -> frozenset[int]:
+    """Compute the LR(0) closure of an item set.
+
+    This is the standard LR(0) closure operation (Aho-Sethi-Ullman §4.6):
+    for every item ``[A → α • B β]`` in the set, add the initial items
+    ``[B → • γ]`` for every production of B, repeating until no new items
+    are added.  The repetition is precomputed per non-terminal in
+    ``Grammar.nonterminal_closures``, so this is one union per distinct
+    non-terminal after a dot.
 
     Args:
-        items: The current state's closed item set.
-        symbol: The grammar symbol (terminal class or non-terminal string) to
-            transition on.
-        all_items: Forwarded to ``closure``.
+        items: Ids of the kernel items to close.
+        grammar: The interned grammar the item ids belong to.
 
     Returns:
-        The closed item set for the successor state, or an empty set if no
-        item in ``items`` has ``symbol`` after its dot.
+        The ids of the closed item set (a superset of ``items``).
     """
-    return closure(
-        set(next for item in items if (next := item.move(symbol)) is not None),
-        all_items,
-    )
+    item_next = grammar.item_next
+    nonterminal_closures = grammar.nonterminal_closures
+    result = set(items)
+    expanded: set[int] = set()
+    for item in items:
+        symbol = item_next[item]
+        if symbol >= 0 and symbol not in expanded:
+            expanded.add(symbol)
+            result |= nonterminal_closures[symbol]
+    return frozenset(result)
+
+
+def goto[T](items: Iterable[int], grammar: Grammar[T]) -> dict[int, list[int]]:
+    """Compute the kernels of the LR(0) successor states of an item set.
+
+    Advances the dot past the next symbol of every item and groups the moved
+    items by that symbol.  The closure of the kernel for ``X`` is the
+    successor state on ``X``, the transition function of the LR(0)
+    automaton used during the canonical-collection BFS in
+    ``Parser.__init__``.  One pass serves every symbol, instead of one scan
+    of ``items`` per symbol.
 
+    Args:
+        items: Ids of the current state's closed item set.
+        grammar: The interned grammar the item ids belong to.
 
-def intern_state[T](
-    itemset: set[Item[T]],
-    state_index: dict[frozenset[Item[T]], int],
-    state_list: list[State[T]],
-) -> tuple[State[T], bool]:
-    """Register *itemset* as an LR(0) state if not yet seen; return (state, is_new).
-
-    Looks up the closed item set in *state_index* for O(1) deduplication.
-    If the itemset is new, assigns the next available id, appends a new
-    ``State`` to *state_list*, and records the mapping in *state_index*.
+    Returns:
+        Mapping from symbol id to the kernel item ids of the successor state
+        on that symbol; symbols no item has after its dot are absent.
+    """
+    item_next = grammar.item_next
+    kernels: dict[int, list[int]] = {}
+    for item in items:
+        symbol = item_next[item]
+        if symbol >= 0:
+            kernels.setdefault(symbol, []).append(item + 1)
+    return kernels
+
+
+def intern_state(
+    kernel: frozenset[int],
+    state_index: dict[frozenset[int], int],
+    state_list: list[frozenset[int]],
+) -> tuple[int, bool]:
+    """Register *kernel* as an LR(0) state if not yet seen; return (id, is_new).
+
+    A state is identified by its kernel items alone: the closure only adds
+    non-kernel items and is determined by the kernel, so the closed set is
+    neither stored in *state_index* nor computed for transitions that reach
+    a known state.  Looks up the kernel in *state_index* for O(1)
+    deduplication.  If the kernel is new, assigns the next available id,
+    appends it to *state_list*, and records the mapping in *state_index*.
 
     Args:
-        itemset: The closed item set that defines a candidate state.
-        state_index: Mapping from ``frozenset[Item]`` to already-assigned state id.
-        state_list: Ordered list of states; index equals state id.
+        kernel: The kernel item ids of a candidate state.
+        state_index: Mapping from kernel to already-assigned state id.
+        state_list: Ordered list of kernels; index equals state id.
 
     Returns:
-        A tuple ``(state, is_new)`` where ``is_new`` is ``True`` when the
-        itemset was not previously registered.
+        A tuple ``(state_id, is_new)`` where ``is_new`` is ``True`` when the
+        kernel was not previously registered.
     """
-    key = frozenset(itemset)
-    if key in state_index:
-        return state_list[state_index[key]], False
+    sid = state_index.get(kernel)
+    if sid is not None:
+        return sid, False
     sid = len(state_list)
-    state = State(sid, itemset)
-    state_index[key] = sid
-    state_list.append(state)
-    return state, True
+    state_index[kernel] = sid
+    state_list.append(kernel)
+    return sid, True
 
 
 def first_of_sequence[T](
-    syms: list[Symbol],
-    lookahead: type[Token],
-    first_sets: dict[str, set[type[Token]]],
-) -> set[type[Token]]:
-    """Return the set of tokens that can begin the sequence ``syms lookahead``.
+    syms: Sequence[int],
+    lookahead: int,
+    grammar: Grammar[T],
+) -> int:
+    """Return the bitset of tokens that can begin the sequence ``syms lookahead``.
 
     Computes FIRST(syms) and, if every symbol in ``syms`` is nullable (or
     ``syms`` is empty), includes ``lookahead``.  Used by ``closure_lr1`` to
     derive the lookahead set for newly added LR(1) items.
 
     Args:
-        syms: Suffix of a production RHS (β in ``[A → α • B β, a]``).
-        lookahead: The inherited lookahead ``a`` to include when ``syms``
-            derives ε.
-        first_sets: Precomputed FIRST sets from ``compute_first_sets``.
+        syms: Symbol ids of a production RHS suffix (β in
+            ``[A → α • B β, a]``).
+        lookahead: Bitset of the inherited lookaheads ``a`` to include when
+            ``syms`` derives ε.
+        grammar: The interned grammar the symbol ids belong to.
 
     Returns:
-        The set of token classes that can begin ``syms`` followed by
+        The bitset of token classes that can begin ``syms`` followed by
         ``lookahead``.
     """
-    result: set[type[Token]] = set()
+    result = 0
     for sym in syms:
-        if isinstance(sym, type):
-            result.add(sym)
-            return result
-        sym_first = first_sets[sym]
-        result.update(sym_first - {EPSILON})
-        if EPSILON not in sym_first:
+        result |= grammar.first[sym]
+        if not grammar.nullable[sym]:
             return result
-    result.add(lookahead)
-    return result
+    return result | lookahead
 
 
-def closure_lr1[T](
-    lr1_kernel: set[tuple[Item[T], type[Token]]],
-    all_items: dict[str, set[Item[T]]],
-    first_sets: dict[str, set[type[Token]]],
-) -> set[tuple[Item[T], type[Token]]]:
+def closure_lr1[T](lr1_kernel: dict[int, int], grammar: Grammar[T]) -> dict[int, int]:
     """Compute the LR(1) closure of a set of LR(1) items.
 
-    Each LR(1) item is a pair ``(item, lookahead)``.  For every item
-    ``[A → α • B β, a]`` in the set, adds ``[B → • γ, b]`` for every
-    production ``B → γ`` and every ``b ∈ first_of_sequence(β, a, first_sets)``.
-    Repeats until no new items are added (ASU §9.5).
+    LR(1) items sharing an LR(0) item are merged: the set maps each item to
+    the bitset of its lookaheads.  For every item ``[A → α • B β, a]`` in the
+    set, adds ``[B → • γ, b]`` for every production ``B → γ`` and every
+    ``b ∈ first_of_sequence(β, a, grammar)``.  Repeats until no lookahead
+    set grows (ASU §9.5).
 
     Args:
-        lr1_kernel: Seed LR(1) items as ``(Item, lookahead-token-class)`` pairs.
-        all_items: Mapping from non-terminal name to its initial LR(0) items.
-        first_sets: Precomputed FIRST sets from ``compute_first_sets``.
+        lr1_kernel: Seed LR(1) items as a mapping from item id to lookahead
+            bitset.
+        grammar: The interned grammar the item ids belong to.
 
     Returns:
         The closed set of LR(1) items (superset of ``lr1_kernel``).
     """
-    result: set[tuple[Item[T], type[Token]]] = set(lr1_kernel)
-    worklist: deque[tuple[Item[T], type[Token]]] = deque(lr1_kernel)
+    item_next = grammar.item_next
+    terminal = grammar.terminal
+    result = dict(lr1_kernel)
+    worklist = list(lr1_kernel)
     while worklist:
-        item, lookahead = worklist.popleft()
-        next_sym = item.next
-        if next_sym is None or isinstance(next_sym, type):
+        item = worklist.pop()
+        next_sym = item_next[item]
+        if next_sym < 0 or terminal[next_sym]:
             continue
-        beta = item.right[item.loc + 1 :]
-        for b in first_of_sequence(beta, lookahead, first_sets):
-            for init_item in all_items[next_sym]:
-                pair: tuple[Item[T], type[Token]] = (init_item, b)
-                if pair not in result:
-                    result.add(pair)
-                    worklist.append(pair)
+        production = grammar.item_production[item]
+        beta = grammar.rights[production][grammar.item_dot[item] + 1 :]
+        lookaheads = first_of_sequence(beta, result[item], grammar)
+        for init_item in grammar.initial_items[next_sym]:
+            old = result.get(init_item, 0)
+            if old | lookaheads != old:
+                result[init_item] = old | lookaheads
+                worklist.append(init_item)
     return result
 
 
 def compute_lalr1_lookaheads[T](
-    state_list: list[State[T]],
-    entry_rules: list[tuple[StartVariable, Rule[T]]],
+    grammar: Grammar[T],
+    state_list: list[frozenset[int]],
+    entry_items: list[int],
     entry_state_ids: list[int],
-    goto_map: dict[tuple[int, Symbol], int],
-    all_items: dict[str, set[Item[T]]],
-    first_sets: dict[str, set[type[Token]]],
-) -> dict[tuple[int, Item[T]], set[type[Token]]]:
+    goto_map: dict[tuple[int, int], int],
+) -> dict[tuple[int, int], int]:
     """Compute LALR(1) lookahead sets for all kernel items in the LR(0) automaton.
 
     Implements the spontaneous-generation and propagation algorithm from
@@ -712,93 +1013,852 @@ def compute_lalr1_lookaheads[T](
 
     1. Initialise empty lookahead sets and propagation lists for every kernel item.
     2. Seed ``EOS`` into the lookahead sets of the entry-state kernel items.
-    3. For each kernel item k, run ``closure_lr1({(k, DUMMY_LOOKAHEAD)}, ...)``.
-       Items in the result whose lookahead is a real token contribute that token
-       spontaneously to the target kernel item; items whose lookahead is still
-       ``DUMMY_LOOKAHEAD`` record a propagation link from k to the target.
+    3. For each kernel item k, run ``closure_lr1({k: DUMMY_LOOKAHEAD}, ...)``.
+       Real tokens in the lookaheads of a resulting item are generated
+       spontaneously for the target kernel item; ``DUMMY_LOOKAHEAD`` among
+       them records a propagation link from k to the target.
     4. Propagate lookaheads along the links to a fixed point.
 
     Args:
-        state_list: All LR(0) states (index equals state id).
-        entry_rules: Augmented start rules paired with their ``StartVariable``.
-        entry_state_ids: State id for the initial state of ``entry_rules[i]``.
-        goto_map: Mapping ``(state_id, symbol)`` → target state id.
-        all_items: Mapping non-terminal name → its initial LR(0) items.
-        first_sets: Precomputed FIRST sets from ``compute_first_sets``.
+        grammar: The interned grammar the item and symbol ids belong to.
+        state_list: Kernel item ids of all LR(0) states (index equals state
+            id).
+        entry_items: Item id of the augmented start item of each entry point.
+        entry_state_ids: State id for the initial state of ``entry_items[i]``.
+        goto_map: Mapping ``(state_id, symbol_id)`` → target state id.
 
     Returns:
-        Mapping ``(state_id, kernel_item)`` → set of LALR(1) lookahead token
+        Mapping ``(state_id, item_id)`` → bitset of LALR(1) lookahead token
         classes.
     """
-    lookahead_table: dict[tuple[int, Item[T]], set[type[Token]]] = {}
-    propagates: dict[tuple[int, Item[T]], list[tuple[int, Item[T]]]] = {}
-
-    for state in state_list:
-        for item in state.items:
-            if (
-                item.loc > 0
-                or isinstance(item.left, StartVariable)
-                or item.next is None
-            ):
-                key: tuple[int, Item[T]] = (state.id, item)
-                lookahead_table[key] = set()
+    item_next = grammar.item_next
+    item_kernel = grammar.item_kernel
+    dummy = grammar.dummy_lookahead
+    lookahead_table: dict[tuple[int, int], int] = {}
+    propagates: dict[tuple[int, int], list[tuple[int, int]]] = {}
+
+    for sid, kernel in enumerate(state_list):
+        for item in closure(kernel, grammar):
+            if item_kernel[item] or item_next[item] < 0:
+                key = (sid, item)
+                lookahead_table[key] = 0
                 propagates[key] = []
 
-    for i, (_, rule) in enumerate(entry_rules):
-        sid = entry_state_ids[i]
-        for item in rule.items:
-            entry_key: tuple[int, Item[T]] = (sid, item)
-            if entry_key in lookahead_table:
-                lookahead_table[entry_key].add(EOS)
-
-    for state in state_list:
-        for item in state.items:
-            if not (item.loc > 0 or isinstance(item.left, StartVariable)):
-                continue
-            src_key: tuple[int, Item[T]] = (state.id, item)
-            j = closure_lr1({(item, DUMMY_LOOKAHEAD)}, all_items, first_sets)
-            for lr1_item, b in j:
-                sym = lr1_item.next
-                if sym is None:
-                    closure_key: tuple[int, Item[T]] = (state.id, lr1_item)
-                    if closure_key not in lookahead_table:
-                        lookahead_table[closure_key] = set()
-                    if closure_key not in propagates:
-                        propagates[closure_key] = []
-                    if b is DUMMY_LOOKAHEAD:
-                        propagates[src_key].append(closure_key)
-                    else:
-                        lookahead_table[closure_key].add(b)
-                    continue
-                target_id = goto_map.get((state.id, sym))
-                if target_id is None:
-                    continue
-                moved = lr1_item.move(sym)
-                if moved is None:
-                    continue
-                target_key: tuple[int, Item[T]] = (target_id, moved)
+    for sid, item in zip(entry_state_ids, entry_items):
+        entry_key = (sid, item)
+        if entry_key in lookahead_table:
+            lookahead_table[entry_key] |= grammar.eos
+
+    for sid, kernel in enumerate(state_list):
+        for item in kernel:
+            src_key = (sid, item)
+            j = closure_lr1({item: dummy}, grammar)
+            for lr1_item, bits in j.items():
+                sym = item_next[lr1_item]
+                if sym < 0:
+                    target_key = (sid, lr1_item)
+                else:
+                    target_id = goto_map.get((sid, sym))
+                    if target_id is None:
+                        continue
+                    target_key = (target_id, lr1_item + 1)
                 if target_key not in lookahead_table:
-                    lookahead_table[target_key] = set()
+                    lookahead_table[target_key] = 0
                 if target_key not in propagates:
                     propagates[target_key] = []
-                if b is DUMMY_LOOKAHEAD:
+                if bits & dummy:
                     propagates[src_key].append(target_key)
-                else:
-                    lookahead_table[target_key].add(b)
+                lookahead_table[target_key] |= bits & ~dummy
 
     changed = True
     while changed:
         changed = False
         for src_key, dst_keys in propagates.items():
+            bits = lookahead_table[src_key]
             for dst_key in dst_keys:
-                new = lookahead_table[src_key] - lookahead_table[dst_key]
-                if new:
-                    lookahead_table[dst_key].update(new)
+                old = lookahead_table[dst_key]
+                if old | bits != old:
+                    lookahead_table[dst_key] = old | bits
                     changed = True
 
     return lookahead_table
 
 
+class SupportsUnion(Protocol):
+    """Protocol for set-like values joined with ``|``, such as sets and bitsets."""
+
+    def __or__(self, other: Self, /) -> Self: ...
+
+
+def digraph[N, S: SupportsUnion](
+    nodes: Iterable[N],
+    relation: Mapping[N, list[N]],
+    initial: Mapping[N, S],
+) -> dict[N, S]:
+    """Compute ``F(x) = initial(x) ∪ ⋃{F(y) | x R y}`` for every node ``x``.
+
+    This is the ``Digraph`` algorithm of DeRemer and Pennello (1982): a
+    depth-first traversal that collapses each strongly connected component of
+    ``relation`` into a single shared set, so every edge is visited once.  The
+    traversal is iterative, so deep relations cannot exhaust the call stack.
+
+    Args:
+        nodes: All nodes of the relation.
+        relation: Mapping from a node to the nodes it is related to.
+        initial: The set each node starts with.  Sets are never mutated, so
+            bitsets (``int``) work as well as ``set``.
+
+    Returns:
+        Mapping from each node to its closed set.
+    """
+    infinity = sys.maxsize
+    depth: dict[N, int] = {}
+    result: dict[N, S] = {}
+    stack: list[N] = []
+
+    for root in nodes:
+        if root in depth:
+            continue
+        stack.append(root)
+        depth[root] = len(stack)
+        result[root] = initial[root]
+        frames = [(root, iter(relation.get(root, [])), len(stack))]
+        while frames:
+            x, successors, pushed = frames[-1]
+            y = next(successors, None)
+            if y is not None:
+                if y not in depth:
+                    stack.append(y)
+                    depth[y] = len(stack)
+                    result[y] = initial[y]
+                    frames.append((y, iter(relation.get(y, [])), len(stack)))
+                    continue
+                depth[x] = min(depth[x], depth[y])
+                result[x] = result[x] | result[y]
+                continue
+            frames.pop()
+            if depth[x] == pushed:
+                while True:
+                    top = stack.pop()
+                    depth[top] = infinity
+                    result[top] = result[x]
+                    if top == x:
+                        break
+            if frames:
+                parent = frames[-1][0]
+                depth[parent] = min(depth[parent], depth[x])
+                result[parent] = result[parent] | result[x]
+    return result
+
+
+def compute_deremer_pennello_lookaheads[T](
+    grammar: Grammar[T],
+    state_list: list[frozenset[int]],
+    goto_map: dict[tuple[int, int], int],
+) -> dict[tuple[int, int], int]:
+    """Compute LALR(1) lookahead sets of complete items with DeRemer–Pennello.
+
+    Works on the non-terminal transitions ``(p, A)`` of the LR(0) automaton
+    (DeRemer and Pennello, 1982):
+
+    * ``DR(p, A)``: terminals shifted from ``goto(p, A)``, plus ``EOS`` when
+      ``goto(p, A)`` completes an augmented start rule.
+    * ``(p, A) reads (r, C)`` iff ``p --A--> r --C-->`` and ``C`` is nullable.
+    * ``(p, A) includes (p', B)`` iff ``B → β A γ``, ``γ`` is nullable and
+      ``p' --β--> p``.
+    * ``(q, A → ω) lookback (p, A)`` iff ``p --ω--> q``.
+
+    ``Read`` is the closure of ``DR`` under *reads*, ``Follow`` the closure
+    of ``Read`` under *includes* (both via ``digraph``), and the lookahead
+    set of ``A → ω •`` in ``q`` is the union of ``Follow(p, A)`` over its
+    *lookback* transitions.  Only complete items receive lookaheads; they
+    are identical to those of ``compute_lalr1_lookaheads``.
+
+    Args:
+        grammar: The interned grammar the item and symbol ids belong to.
+        state_list: Kernel item ids of all LR(0) states (index equals state
+            id).
+        goto_map: Mapping ``(state_id, symbol_id)`` → target state id.
+
+    Returns:
+        Mapping ``(state_id, item_id)`` → bitset of LALR(1) lookahead token
+        classes, for complete items.
+    """
+    terminal = grammar.terminal
+    nullable = grammar.nullable
+    item_next = grammar.item_next
+    transitions = [(sid, sym) for (sid, sym) in goto_map if not terminal[sym]]
+
+    # The symbols shifted from a state are its outgoing transitions, so
+    # ``DR`` and *reads* need no closures; ``EOS`` follows a complete
+    # augmented start item, which is always a kernel item.
+    outgoing: list[list[int]] = [[] for _ in state_list]
+    for sid, sym in goto_map:
+        outgoing[sid].append(sym)
+
+    direct_reads: dict[tuple[int, int], int] = {}
+    reads: dict[tuple[int, int], list[tuple[int, int]]] = {}
+    for sid, sym in transitions:
+        target = goto_map[sid, sym]
+        terminals = 0
+        nullable_reads: list[tuple[int, int]] = []
+        for next in outgoing[target]:
+            if terminal[next]:
+                terminals |= grammar.first[next]
+            elif nullable[next]:
+                nullable_reads.append((target, next))
+        for item in state_list[target]:
+            left = grammar.lefts[grammar.item_production[item]]
+            if item_next[item] < 0 and grammar.start_variable[left]:
+                terminals |= grammar.eos
+        direct_reads[sid, sym] = terminals
+        reads[sid, sym] = nullable_reads
+
+    includes: dict[tuple[int, int], list[tuple[int, int]]] = {
+        transition: [] for transition in transitions
+    }
+    lookback: dict[tuple[int, int], list[tuple[int, int]]] = {}
+    for sid, sym in transitions:
+        # Every initial item of ``sym`` is in the closure of ``sid``.
+        for item in grammar.initial_items[sym]:
+            right = grammar.rights[grammar.item_production[item]]
+            current = sid
+            for i, rhs_sym in enumerate(right):
+                if not terminal[rhs_sym] and all(
+                    nullable[rest] for rest in right[i + 1 :]
+                ):
+                    includes[current, rhs_sym].append((sid, sym))
+                current = goto_map[current, rhs_sym]
+            lookback.setdefault((current, item + len(right)), []).append((sid, sym))
+
+    read_sets = digraph(transitions, reads, direct_reads)
+    follow_sets = digraph(transitions, includes, read_sets)
+
+    lookahead_table: dict[tuple[int, int], int] = {}
+    for key, sources in lookback.items():
+        bits = 0
+        for transition in sources:
+            bits |= follow_sets[transition]
+        lookahead_table[key] = bits
+    return lookahead_table
+
+
+TABLE_MAGIC = b"PLRT"
+"""Leading bytes of the binary format of ``Parser.to_bytes``."""
+
+TABLE_FORMAT = 3
+"""Version of the serialized table formats of ``Parser.to_bytes`` and
+``Parser.to_module``."""
+
+TABLE_HEADER = struct.Struct("<4sH2x8I")
+
+
+def qualified_name(cls: type) -> str:
+    """Return the ``module:qualname`` name ``Parser.to_bytes`` stores for ``cls``."""
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def resolve_class(name: str, symbols: Mapping[str, type]) -> type:
+    """Return the class named ``name`` by ``qualified_name``.
+
+    Args:
+        name: A ``module:qualname`` name.
+        symbols: Classes to use before importing, by ``qualified_name``.
+
+    Returns:
+        The class from ``symbols``, or else imported from its module.
+
+    Raises:
+        ValueError: If the class can be neither found nor imported.
+    """
+    if name in symbols:
+        return symbols[name]
+    module_name, _, qualname = name.partition(":")
+    try:
+        found: object = importlib.import_module(module_name)
+        for part in qualname.split("."):
+            found = getattr(found, part)
+    except (ImportError, AttributeError):
+        found = None
+    if not isinstance(found, type):
+        raise ValueError(f"Cannot resolve class {name}; pass it in symbols")
+    return found
+
+
+def class_reference(cls: type, modules: dict[str, str]) -> str:
+    """Return an expression for ``cls`` in generated code.
+
+    Args:
+        cls: The class to refer to.
+        modules: Alias of each imported module, by module name; the module
+            of ``cls`` is added under a new ``_mN`` alias if missing.
+
+    Returns:
+        ``alias.qualname``, for a module that imports each module of
+        ``modules`` as its alias.
+
+    Raises:
+        ValueError: If ``cls`` cannot be imported by its qualified name.
+    """
+    name = qualified_name(cls)
+    try:
+        importable = resolve_class(name, {}) is cls
+    except ValueError:
+        importable = False
+    if not importable:
+        raise ValueError(f"Class {name} cannot be imported by name")
+    module = modules.setdefault(cls.__module__, f"_m{len(modules)}")
+    return f"{module}.{cls.__qualname__}"
+
+
+class FlatTable:
+    """A parse table as flat integer sequences, the payload of serialization.
+
+    Cells are stored row by row as a key and an action.  A key is
+    ``class_id << 1`` for a token class and ``name_id << 1 | 1`` for a
+    non-terminal.  An action is ``target << 2 | kind``: kind 0 shifts and 1
+    goes to state ``target``, kind 2 accepts the non-terminal ``target``
+    and kind 3 applies reduction ``target``; ``-1`` is no action.  Each
+    distinct reduction is six integers: left name id, number of popped
+    symbols, AST class id (``-1`` passes a child through), number of maker
+    arguments, precedence and definition index.
+
+    Attributes:
+        classes: Token and AST classes, by id.
+        names: Non-terminal names, by id.
+        reduces: Six integers per distinct reduction.
+        args: Maker arguments of every reduction, in order.
+        row_sizes: Number of cells of each state.
+        keys: Key of each cell.
+        actions: Action of each cell.
+        entries: Name id and initial state of each entry point.
+        defaults: State and reduction index of each default reduction.
+    """
+
+    classes: list[type]
+    names: list[str]
+    reduces: Sequence[int]
+    args: Sequence[int]
+    row_sizes: Sequence[int]
+    keys: Sequence[int]
+    actions: Sequence[int]
+    entries: Sequence[int]
+    defaults: Sequence[int]
+
+    def __init__(
+        self,
+        classes: list[type],
+        names: list[str],
+        reduces: Sequence[int],
+        args: Sequence[int],
+        row_sizes: Sequence[int],
+        keys: Sequence[int],
+        actions: Sequence[int],
+        entries: Sequence[int],
+        defaults: Sequence[int],
+    ) -> None:
+        self.classes = classes
+        self.names = names
+        self.reduces = reduces
+        self.args = args
+        self.row_sizes = row_sizes
+        self.keys = keys
+        self.actions = actions
+        self.entries = entries
+        self.defaults = defaults
+
+    @classmethod
+    def encode(cls, parser: Parser[Any]) -> FlatTable:
+        """Flatten the table and entry states of ``parser``.
+
+        Raises:
+            ValueError: If a reduction uses a maker other than the ones
+                built from a grammar, or two distinct classes share a
+                qualified name.
+        """
+        classes: dict[type, int] = {}
+        class_names: dict[str, type] = {}
+        names: dict[str, int] = {}
+        reduce_ids: dict[tuple[object, ...], int] = {}
+        reduces = array("i")
+        args = array("i")
+
+        def class_id(symbol: type) -> int:
+            if symbol not in classes:
+                name = qualified_name(symbol)
+                if class_names.setdefault(name, symbol) is not symbol:
+                    raise ValueError(f"Distinct classes share the name {name}")
+                classes[symbol] = len(classes)
+            return classes[symbol]
+
+        def name_id(name: str) -> int:
+            return names.setdefault(name, len(names))
+
+        def reduce_id(action: Reduce[Any]) -> int:
+            maker = action.maker
+            if isinstance(maker, TMaker):
+                target, maker_args = class_id(maker.type), tuple(maker.args)
+            elif isinstance(maker, IDMaker):
+                target, maker_args = -1, (maker.arg,)
+            else:
+                raise ValueError(f"Cannot serialize reduce action maker {maker}")
+            key = (action.left, action.n, target, maker_args)
+            key += (action.precedence, action.definition_index)
+            if key not in reduce_ids:
+                reduce_ids[key] = len(reduce_ids)
+                reduces.extend((name_id(action.left), action.n, target))
+                reduces.extend((len(maker_args), action.precedence))
+                reduces.append(action.definition_index)
+                args.extend(maker_args)
+            return reduce_ids[key]
+
+        row_sizes = array("i")
+        keys = array("i")
+        actions = array("i")
+        for row in parser.table.table:
+            row_sizes.append(len(row))
+            for symbol, action in row.items():
+                if isinstance(symbol, type):
+                    keys.append(class_id(symbol) << 1)
+                else:
+                    keys.append(name_id(symbol) << 1 | 1)
+                match action:
+                    case Shift(next=n):
+                        actions.append(n << 2)
+                    case Goto(next=n):
+                        actions.append(n << 2 | 1)
+                    case Accept(symbol=accepted):
+                        actions.append(name_id(accepted) << 2 | 2)
+                    case Reduce():
+                        actions.append(reduce_id(action) << 2 | 3)
+                    case None:
+                        actions.append(-1)
+        entries = array("i")
+        for name, state in parser.entry_state.items():
+            entries.extend((name_id(name), state))
+        defaults = array("i")
+        for state, action in parser.table.defaults.items():
+            defaults.extend((state, reduce_id(action)))
+        return cls(
+            list(classes),
+            list(names),
+            reduces,
+            args,
+            row_sizes,
+            keys,
+            actions,
+            entries,
+            defaults,
+        )
+
+    def decode(self) -> tuple[Table[Any], dict[str, int]]:
+        """Rebuild the table and entry states, sharing equal actions."""
+        classes, names, args = self.classes, self.names, self.args
+        reduces: list[Reduce[Any]] = []
+        start = 0
+        for i in range(0, len(self.reduces), 6):
+            left, n, target, n_maker_args, precedence, definition_index = self.reduces[
+                i : i + 6
+            ]
+            maker_args = list(args[start : start + n_maker_args])
+            start += n_maker_args
+            maker: Maker[Any] = (
+                IDMaker(*maker_args)
+                if target < 0
+                else TMaker(classes[target], maker_args)
+            )
+            reduces.append(Reduce(names[left], n, maker, precedence, definition_index))
+
+        decoded: dict[int, Action[Any] | None] = {-1: None}
+        table: Table[Any] = Table(len(self.row_sizes))
+        keys, actions = self.keys, self.actions
+        cell = 0
+        for row, size in zip(table.table, self.row_sizes):
+            for key, code in zip(keys[cell : cell + size], actions[cell : cell + size]):
+                action = decoded.get(code)
+                if action is None and code != -1:
+                    target, kind = code >> 2, code & 3
+                    if kind == 0:
+                        action = Shift(target)
+                    elif kind == 1:
+                        action = Goto(target)
+                    elif kind == 2:
+                        action = Accept(names[target])
+                    else:
+                        action = reduces[target]
+                    decoded[code] = action
+                row[classes[key >> 1] if key & 1 == 0 else names[key >> 1]] = action
+            cell += size
+        for i in range(0, len(self.defaults), 2):
+            table.defaults[self.defaults[i]] = reduces[self.defaults[i + 1]]
+
+        entries = self.entries
+        entry_state = {
+            names[entries[i]]: entries[i + 1] for i in range(0, len(entries), 2)
+        }
+        return table, entry_state
+
+
+class CompressedTable[T]:
+    """Read-only LR table packed into shared integer arrays (comb vector).
+
+    The layout follows bison's ``yypact``/``yytable``/``yycheck``.  Symbols
+    are numbered, token classes first, and every distinct action is stored
+    once in ``values``.  The explicit cells of state ``s`` live at
+    ``base[s] + symbol_id`` of ``entry`` (an index into ``values``) and are
+    valid only where ``check`` holds the same symbol id, so rows with
+    disjoint columns interleave in the same arrays.  Equal rows share a
+    displacement; a state without explicit cells has base ``-1``.
+
+    With default reductions, the most frequent reduction of each state is
+    removed from its row and stored in ``default`` instead, and applies to
+    every token without an explicit cell.  An erroneous token is then only
+    reported after the default reductions, in a later state, as with bison.
+    Without them, lookups behave exactly like the dict-based ``Table``.
+
+    The default reductions of consistent states (``Table.defaults``) are
+    always kept, and apply to every token.
+
+    Args:
+        table: The table to compress.
+        default_reductions: Whether to move each state's most frequent
+            reduction into ``default``.
+
+    Attributes:
+        symbols: Token classes, then non-terminals, by symbol id.
+        symbol_ids: Id of each symbol.
+        n_tokens: Number of token classes; ids below it are tokens.
+        values: Distinct actions; cells refer to them by index.
+        base: Displacement of each state's row, or ``-1``.
+        default: Index in ``values`` of each state's default reduction, or
+            ``-1``.
+        defaults: Default reductions of consistent states, as in ``Table``.
+        check: Symbol id owning each slot, or ``-1`` for a free slot.
+        entry: Index in ``values`` of each slot's action.
+        expected: Distinct tuples of the tokens each state has an action
+            for, in the order of the original row.
+        expected_index: Index in ``expected`` of each state.
+    """
+
+    symbols: list[Symbol]
+    symbol_ids: dict[Symbol, int]
+    n_tokens: int
+    values: list[Action[T] | None]
+    base: array[int]
+    default: array[int]
+    defaults: dict[int, Reduce[T]]
+    check: array[int]
+    entry: array[int]
+    expected: list[tuple[type[Token], ...]]
+    expected_index: array[int]
+
+    def __init__(
+        self, table: Table[T] | CompressedTable[T], *, default_reductions: bool = True
+    ) -> None:
+        rows = table.table
+        tokens = {symbol for row in rows for symbol in row if isinstance(symbol, type)}
+        names = {symbol for row in rows for symbol in row if isinstance(symbol, str)}
+        self.symbols = sorted(tokens, key=symbol_sort_key)
+        self.n_tokens = len(self.symbols)
+        self.symbols += sorted(names, key=symbol_sort_key)
+        self.symbol_ids = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+        self.values = []
+        value_ids: dict[Hashable, int] = {}
+
+        def value_id(action: Action[T] | None) -> int:
+            key = action_key(action)
+            if key not in value_ids:
+                value_ids[key] = len(self.values)
+                self.values.append(action)
+            return value_ids[key]
+
+        self.defaults = dict(table.defaults)
+        self.expected = []
+        expected_ids: dict[tuple[type[Token], ...], int] = {}
+        self.expected_index = array("i")
+        self.default = array("i")
+        packed: list[tuple[tuple[int, int], ...]] = []
+        for state, row in enumerate(rows):
+            cells = [
+                (self.symbol_ids[symbol], value_id(action))
+                for symbol, action in row.items()
+            ]
+            expected = tuple(symbol for symbol in row if isinstance(symbol, type))
+            self.expected_index.append(
+                expected_ids.setdefault(expected, len(expected_ids))
+            )
+            if len(expected_ids) > len(self.expected):
+                self.expected.append(expected)
+
+            default = -1
+            if state in self.defaults:
+                default = value_id(self.defaults[state])
+                cells = [cell for cell in cells if cell[0] >= self.n_tokens]
+            elif default_reductions:
+                counts = Counter(
+                    value
+                    for symbol, value in cells
+                    if symbol < self.n_tokens and isinstance(self.values[value], Reduce)
+                )
+                if counts:
+                    default = counts.most_common(1)[0][0]
+                    cells = [cell for cell in cells if cell[1] != default]
+            self.default.append(default)
+            packed.append(tuple(sorted(cells)))
+
+        self.base = array("i")
+        self.check = array("i")
+        self.entry = array("i")
+        bases: dict[tuple[tuple[int, int], ...], int] = {(): -1}
+        # First fit, widest rows first.  Candidate displacements put the
+        # row's first column on a free slot, found by scanning ``check``;
+        # ``occupied`` has one bit per slot, so the row fits when its column
+        # mask shifted there misses every occupied bit.  Slots only fill up,
+        # so rows with the same columns resume after the previous one.
+        used: set[int] = set()
+        occupied = 0
+        resume: dict[tuple[int, ...], int] = {}
+        for row in sorted(set(packed), key=len, reverse=True):
+            if not row:
+                continue
+            columns = tuple(symbol for symbol, _ in row)
+            first, last = columns[0], columns[-1]
+            mask = 0
+            for symbol in columns:
+                mask |= 1 << symbol
+            slot = resume.get(columns, first)
+            while True:
+                try:
+                    slot = self.check.index(-1, slot)
+                except ValueError:
+                    slot = max(slot, len(self.check))
+                displacement = slot - first
+                if (
+                    displacement not in used
+                    and (
+                        displacement + last >= len(self.check)
+                        or self.check[displacement + last] < 0
+                    )
+                    and not occupied & mask << displacement
+                ):
+                    break
+                slot += 1
+            occupied |= mask << displacement
+            resume[columns] = slot + 1
+            end = displacement + row[-1][0] + 1
+            if end > len(self.check):
+                self.check.extend([-1] * (end - len(self.check)))
+                self.entry.extend([-1] * (end - len(self.entry)))
+            for symbol, value in row:
+                self.check[displacement + symbol] = symbol
+                self.entry[displacement + symbol] = value
+            used.add(displacement)
+            bases[row] = displacement
+        self.base.extend(bases[row] for row in packed)
+
+    @property
+    def table(self) -> list[dict[Symbol, Action[T] | None]]:
+        """The rows of the table as ``{symbol: action}`` dicts, as in ``Table``.
+
+        Rows are decompressed on each access; a default reduction appears
+        under the tokens the original row had an action for.
+        """
+        rows: list[dict[Symbol, Action[T] | None]] = []
+        for state in range(len(self.base)):
+            row: dict[Symbol, Action[T] | None] = {}
+            for symbol in self.expected[self.expected_index[state]]:
+                row[symbol] = self[state, symbol]
+            for symbol in self.symbols[self.n_tokens :]:
+                try:
+                    row[symbol] = self[state, symbol]
+                except KeyError:
+                    pass
+            rows.append(row)
+        return rows
+
+    def __getitem__(self, key: tuple[int, Symbol]) -> Action[T] | None:
+        state, symbol = key
+        symbol_id = self.symbol_ids[symbol]
+        base = self.base[state]
+        slot = base + symbol_id
+        if base >= 0 and slot < len(self.check) and self.check[slot] == symbol_id:
+            return self.values[self.entry[slot]]
+        if symbol_id < self.n_tokens and self.default[state] >= 0:
+            return self.values[self.default[state]]
+        raise KeyError(key)
+
+    def expected_tokens(self, state: int) -> list[type[Token]]:
+        """Return terminal classes that have an action in *state*."""
+        return list(self.expected[self.expected_index[state]])
+
+
+def action_key(action: Action[Any] | None) -> Hashable:
+    """Return a key under which equal table actions compare equal."""
+    match action:
+        case Shift(next=n):
+            return (Shift, n)
+        case Goto(next=n):
+            return (Goto, n)
+        case Accept(symbol=symbol):
+            return (Accept, symbol)
+        case Reduce():
+            return (
+                Reduce,
+                action.left,
+                action.n,
+                id(action.maker),
+                action.precedence,
+                action.definition_index,
+            )
+        case None:
+            return None
+
+
+ACTION_ERROR = 0
+"""Compiled action for a token the state has no cell for."""
+
+ACTION_NONE = 2**31 - 2
+"""Compiled action for a cell that holds no action."""
+
+ACTION_ACCEPT = 2**31 - 1
+"""Compiled action that accepts the state's entry non-terminal."""
+
+
+class CompiledTable[T]:
+    """LR table with integer-encoded actions, run by ``Parser.parse``.
+
+    Token classes and non-terminals are numbered densely.  Each state has a
+    tuple of action codes indexed by token id: ``s + 1`` shifts to state
+    ``s``, ``-(r + 1)`` applies rule ``r``, and ``ACTION_ERROR``,
+    ``ACTION_NONE`` and ``ACTION_ACCEPT`` are sentinels.  Token classes
+    unknown to the grammar get the id ``unknown``, whose column is always
+    ``ACTION_ERROR``.  Equal rows are shared between states.
+
+    Every lookup gives the action ``table[state, token]`` gives, including
+    the default reductions of a ``CompressedTable``.
+
+    Args:
+        table: The table to compile.
+
+    Attributes:
+        source: The compiled table, which reports expected tokens.
+        token_ids: Id of each token class.
+        unknown: Id of token classes not in ``token_ids``.
+        nonterminal_ids: Id of each non-terminal.
+        actions: Action codes of each state, by token id.
+        gotos: Successor state of each state, by non-terminal id, or ``-1``.
+        defaults: Action code of each state's default reduction, or ``0``.
+        rules: Non-terminal id, number of popped symbols and the
+            ``compile_maker`` result of each reduction.
+        reductions: The ``Reduce`` action of each rule.
+        accepts: Non-terminal accepted by each accepting state.
+    """
+
+    source: Table[T] | CompressedTable[T]
+    token_ids: dict[type[Token], int]
+    unknown: int
+    nonterminal_ids: dict[str, int]
+    actions: list[tuple[int, ...]]
+    gotos: list[tuple[int, ...]]
+    defaults: list[int]
+    rules: list[tuple[int, int, Callable[..., T | Token] | None, slice, int]]
+    reductions: list[Reduce[T]]
+    accepts: dict[int, str]
+
+    def __init__(self, table: Table[T] | CompressedTable[T]) -> None:
+        self.source = table
+        rows = table.table
+        tokens = {symbol for row in rows for symbol in row if isinstance(symbol, type)}
+        names = {symbol for row in rows for symbol in row if isinstance(symbol, str)}
+        names.update(reduce.left for reduce in table.defaults.values())
+        self.token_ids = {
+            token: i for i, token in enumerate(sorted(tokens, key=symbol_sort_key))
+        }
+        self.unknown = len(self.token_ids)
+        self.nonterminal_ids = {
+            name: i for i, name in enumerate(sorted(names, key=symbol_sort_key))
+        }
+
+        self.rules = []
+        self.reductions = []
+        rule_ids: dict[Hashable, int] = {}
+
+        def rule_code(action: Reduce[T]) -> int:
+            key = action_key(action)
+            if key not in rule_ids:
+                rule_ids[key] = len(self.rules)
+                left = self.nonterminal_ids[action.left]
+                call = compile_maker(action.maker, action.n)
+                self.rules.append((left, action.n, *call))
+                self.reductions.append(action)
+            return -(rule_ids[key] + 1)
+
+        shared: dict[tuple[int, ...], tuple[int, ...]] = {}
+        self.actions = []
+        self.gotos = []
+        self.accepts = {}
+        for state, row in enumerate(rows):
+            codes = [ACTION_ERROR] * (self.unknown + 1)
+            gotos = [-1] * len(self.nonterminal_ids)
+            for symbol, action in row.items():
+                if isinstance(symbol, str):
+                    if isinstance(action, Goto):
+                        gotos[self.nonterminal_ids[symbol]] = action.next
+                    continue
+                token = self.token_ids[symbol]
+                match action:
+                    case Shift(next=n):
+                        codes[token] = n + 1
+                    case Reduce():
+                        codes[token] = rule_code(action)
+                    case Accept(symbol=accepted):
+                        codes[token] = ACTION_ACCEPT
+                        self.accepts[state] = accepted
+                    case _:
+                        codes[token] = ACTION_NONE
+            if (
+                isinstance(table, CompressedTable)
+                and state not in table.defaults
+                and table.default[state] >= 0
+            ):
+                # A reduction moved out of the row by ``CompressedTable``.
+                default = table.values[table.default[state]]
+                assert isinstance(default, Reduce)
+                code = rule_code(default)
+                codes[: self.unknown] = [c or code for c in codes[: self.unknown]]
+            self.actions.append(shared.setdefault(tuple(codes), tuple(codes)))
+            self.gotos.append(shared.setdefault(tuple(gotos), tuple(gotos)))
+        self.defaults = [0] * len(rows)
+        for state, reduce in table.defaults.items():
+            self.defaults[state] = rule_code(reduce)
+
+
+def table_footprint(table: Table[Any] | CompressedTable[Any]) -> int:
+    """Return the bytes held by ``table``, as measured by ``sys.getsizeof``.
+
+    Counts the containers and action objects of the table, each once.
+    Classes, strings and makers are shared with the grammar and are not
+    counted.
+    """
+    seen: set[int] = set()
+    total = 0
+    stack: list[object] = [table]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, (type, str, int, TMaker, IDMaker)):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(cast("dict[object, object]", obj).values())
+        elif isinstance(obj, (list, tuple)):
+            stack.extend(cast("Sequence[object]", obj))
+        elif hasattr(obj, "__dict__"):
+            stack.append(vars(obj))
+    return total
+
+
 class Parser[T]:
     """LALR(1) parser that builds a parse table from a grammar and drives LR parsing.
 
@@ -822,14 +1882,26 @@ class Parser[T]:
         through a single child unchanged.
       * ``arg_indices``: which RHS children to forward to ``action_type.__init__``.
 
+    ``lookaheads`` selects how LALR(1) lookahead sets are computed:
+    ``"propagation"`` (ASU §9.6) or ``"deremer-pennello"``, which is much
+    faster on large grammars.  Both produce the same table.
+
+    ``cache`` is an optional ``TableCache`` (see :mod:`plare.cache`): a table
+    cached for an identical grammar is reused instead of being built, and a
+    freshly built table is added to the cache.
+
     Attributes:
-        table: The completed LR action/goto table.
+        table: The completed LR action/goto table, or its ``CompressedTable``
+            for a parser returned by ``compress``.
         entry_state: Mapping from non-terminal name → initial state id for that
             entry point (one entry point per top-level key in the grammar).
+        compiled_table: The ``CompiledTable`` last built by ``compiled``, or
+            ``None``.
     """
 
-    table: Table[T]
+    table: Table[T] | CompressedTable[T]
     entry_state: dict[str, int]
+    compiled_table: CompiledTable[T] | None = None
 
     def __init__(
         self,
@@ -842,7 +1914,17 @@ class Parser[T]:
                 ]
             ],
         ],
+        *,
+        lookaheads: Literal["propagation", "deremer-pennello"] = "propagation",
+        cache: TableCache | None = None,
     ) -> None:
+        if cache is not None:
+            cached = cache.load(grammar)
+            if cached is not None:
+                self.table, self.entry_state = cached
+                logger.info("Parser loaded from cache")
+                return
+
         # ── Phase 1: Augment grammar ─────────────────────────────────────────
         # For each entry non-terminal X, add an augmented rule
         #   StartVariable(X) → X
@@ -882,85 +1964,87 @@ class Parser[T]:
             global_idx += len(norm_rights)
 
         # ── Phase 2: Compute FIRST sets ──────────────────────────────────────
-        # FIRST(A) is needed to propagate ε through nullable non-terminals
-        # during LALR(1) lookahead propagation in Phase 4.
-        first_sets = compute_first_sets(rules)
-
-        all_items = {left: rule.items for left, rule in rules.items()}
-        all_tokens = set[type[Token]]()
-        for rule in rules.values():
-            for right, _, _ in rule.rights:
-                all_tokens.update(t for t in right if isinstance(t, type))
+        # Intern the grammar: the remaining phases work on dense symbol,
+        # production and item ids, whose hashes cost nothing, instead of
+        # ``Item`` objects, and on terminal sets as int bitsets.  Interning
+        # computes FIRST(A), needed to propagate ε through nullable
+        # non-terminals during LALR(1) lookahead propagation in Phase 4.
+        interned = Grammar(rules)
 
         # ── Phase 3: Build LR(0) canonical collection ────────────────────────
-        # BFS over the LR(0) automaton.  ``state_index`` maps a frozenset of
-        # items to the assigned state id, giving O(1) deduplication instead of
-        # a linear scan.  ``worklist`` is a deque so processing order is
+        # BFS over the LR(0) automaton.  ``state_index`` maps the frozenset
+        # of a state's kernel item ids to the assigned state id, giving O(1)
+        # deduplication instead of a linear scan; a state's closure is only
+        # expanded when the state itself is, to find its successors.
+        # ``worklist`` is a deque so processing order is
         # deterministic (FIFO) and independent of Python's hash randomization.
-        # Symbols leaving each state are sorted by ``symbol_sort_key`` so state
-        # id assignment is stable across runs for the same grammar.
-        state_index: dict[frozenset[Item[T]], int] = {}
-        state_list: list[State[T]] = []
-        edges: list[tuple[State[T], Symbol, State[T]]] = []
+        # Symbol ids follow ``symbol_sort_key``, so visiting successors in id
+        # order keeps state id assignment stable across runs for the same
+        # grammar.
+        state_index: dict[frozenset[int], int] = {}
+        state_list: list[frozenset[int]] = []
+        goto_map: dict[tuple[int, int], int] = {}
 
         self.entry_state = {}
-        bfs: deque[State[T]] = deque()
-        for i, (left, rule) in enumerate(entry_rules):
+        entry_items: list[int] = []
+        bfs: deque[int] = deque()
+        for i, (left, _) in enumerate(entry_rules):
             self.entry_state[left.orig] = i
+            entry_item = interned.initial_items[interned.symbol_ids[left]][0]
+            entry_items.append(entry_item)
             init_state, _ = intern_state(
-                closure(rule.items, all_items), state_index, state_list
+                frozenset([entry_item]), state_index, state_list
             )
             bfs.append(init_state)
 
         while bfs:
-            state = bfs.popleft()
+            sid = bfs.popleft()
             logger.debug("Worklist: %d items", len(bfs))
-            logger.debug("State %d:\n%s", state.id, state)
-            nexts = sorted(
-                {sym for item in state.items if (sym := item.next) is not None},
-                key=symbol_sort_key,
-            )
-            logger.debug("Nexts: %s", nexts)
-            for symbol in nexts:
+            items = closure(state_list[sid], interned)
+            kernels = goto(items, interned)
+            if logger.isEnabledFor(logging.DEBUG):
+                state = State(sid, {interned.item(item) for item in items})
+                logger.debug("State %d:\n%s", sid, state)
+                nexts = [interned.symbols[symbol] for symbol in sorted(kernels)]
+                logger.debug("Nexts: %s", nexts)
+            for symbol in sorted(kernels):
                 target_state, is_new = intern_state(
-                    goto(state.items, symbol, all_items), state_index, state_list
+                    frozenset(kernels[symbol]), state_index, state_list
                 )
-                edges.append((state, symbol, target_state))
+                goto_map[sid, symbol] = target_state
                 if is_new:
                     bfs.append(target_state)
 
         # ── Phase 4: Compute LALR(1) per-item lookaheads ────────────────────
-        # Build a flat goto_map from the edges collected in Phase 3 and call
-        # compute_lalr1_lookaheads (ASU §9.6).  entry_state_ids[i] equals i
-        # because entry states are the first interned during Phase 3 BFS.
-        goto_map: dict[tuple[int, Symbol], int] = {
-            (src.id, sym): tgt.id for src, sym, tgt in edges
-        }
-        entry_state_ids = [self.entry_state[left.orig] for left, _ in entry_rules]
-        lookahead_table = compute_lalr1_lookaheads(
-            state_list, entry_rules, entry_state_ids, goto_map, all_items, first_sets
-        )
-        for state in state_list:
-            state.lookaheads = {
-                item: lookahead_table[(state.id, item)]
-                for item in state.items
-                if (state.id, item) in lookahead_table
-            }
+        # Call compute_lalr1_lookaheads (ASU §9.6) or, when requested,
+        # compute_deremer_pennello_lookaheads on the goto_map built in
+        # Phase 3.  entry_state_ids[i] equals i because entry states are the
+        # first interned during Phase 3 BFS.
+        if lookaheads == "deremer-pennello":
+            lookahead_table = compute_deremer_pennello_lookaheads(
+                interned, state_list, goto_map
+            )
+        else:
+            entry_state_ids = [self.entry_state[left.orig] for left, _ in entry_rules]
+            lookahead_table = compute_lalr1_lookaheads(
+                interned, state_list, entry_items, entry_state_ids, goto_map
+            )
 
         # ── Phase 5: Populate action/goto table ──────────────────────────────
         # Shift and Goto actions come directly from the automaton edges.
         self.table = Table(len(state_list))
-        for prev, symbol, next in edges:
+        for (prev, symbol_id), next in goto_map.items():
+            symbol = interned.symbols[symbol_id]
             if isinstance(symbol, type):
-                self.table[prev.id, symbol] = Shift(next.id)
+                self.table[prev, symbol] = Shift(next)
 
             else:
-                self.table[prev.id, symbol] = Goto(next.id)
+                self.table[prev, symbol] = Goto(next)
 
         # Reduce and Accept actions come from complete items (dot at end).
-        # LALR(1): state.lookaheads[item] holds the per-item lookahead set
-        # computed in Phase 4.  A reduce for A → α fires only on the tokens
-        # in that set.
+        # LALR(1): lookahead_table[state, item] holds the per-item lookahead
+        # bitset computed in Phase 4.  A reduce for A → α fires only on the
+        # tokens in that set.
         # Conflicts are resolved by precedence and associativity:
         #   Shift/Reduce: prefer shift unless the production has higher
         #     precedence than the lookahead token, or equal precedence with
@@ -968,75 +2052,322 @@ class Parser[T]:
         #   Reduce/Reduce: prefer the higher-precedence production; when
         #     precedences are equal, the earlier-defined production wins
         #     (yacc/bison convention).
-        for state in state_list:
-            for item in state.items:
-                if item.next is None:
-                    if item.left in start_variables:
-                        self.table[state.id, EOS] = Accept(
-                            item.left.orig
-                            if isinstance(item.left, StartVariable)
-                            else item.left
+        for sid, kernel in enumerate(state_list):
+            for item in closure(kernel, interned):
+                if interned.item_next[item] >= 0:
+                    continue
+                production = interned.productions[interned.item_production[item]]
+                if production.left in start_variables:
+                    self.table[sid, EOS] = Accept(
+                        production.left.orig
+                        if isinstance(production.left, StartVariable)
+                        else production.left
+                    )
+                else:
+                    bits = lookahead_table.get((sid, item), 0)
+                    for symbol in interned.tokens(bits):
+                        reduce_action = Reduce(
+                            production.left,
+                            len(production.right),
+                            production.maker,
+                            production.precedence,
+                            production.definition_index,
                         )
-                    else:
-                        for symbol in state.lookaheads.get(item, set()):
-                            reduce_action = Reduce(
-                                item.left,
-                                len(item.right),
-                                item.maker,
-                                item.precedence,
-                                item.definition_index,
+                        try:
+                            self.table[sid, symbol] = reduce_action
+                        except ShiftReduceConflict:
+                            logger.info(
+                                "Shift-Reduce conflict in state %d: %s vs %s",
+                                sid,
+                                symbol,
+                                production.left,
                             )
-                            try:
-                                self.table[state.id, symbol] = reduce_action
-                            except ShiftReduceConflict:
-                                logger.info(
-                                    "Shift-Reduce conflict in state %d: %s vs %s",
-                                    state.id,
-                                    symbol,
-                                    item.left,
-                                )
-                                if item.precedence > symbol.precedence or (
-                                    item.precedence == symbol.precedence
-                                    and symbol.associative == "left"
-                                ):
-                                    self.table.resolve_conflict(
-                                        state.id, symbol, reduce_action
-                                    )
-                            except ReduceReduceConflict as e:
-                                logger.info(
-                                    "Reduce-Reduce conflict in state %d: %s vs %s",
-                                    state.id,
-                                    e.left,
-                                    item.left,
-                                )
-                                if item.precedence > e.precedence:
+                            if production.precedence > symbol.precedence or (
+                                production.precedence == symbol.precedence
+                                and symbol.associative == "left"
+                            ):
+                                self.table.resolve_conflict(sid, symbol, reduce_action)
+                        except ReduceReduceConflict as e:
+                            logger.info(
+                                "Reduce-Reduce conflict in state %d: %s vs %s",
+                                sid,
+                                e.left,
+                                production.left,
+                            )
+                            if production.precedence > e.precedence:
+                                self.table.resolve_conflict(sid, symbol, reduce_action)
+                            elif production.precedence == e.precedence:
+                                if production.definition_index < e.definition_index:
                                     self.table.resolve_conflict(
-                                        state.id, symbol, reduce_action
+                                        sid, symbol, reduce_action
                                     )
-                                elif item.precedence == e.precedence:
-                                    if item.definition_index < e.definition_index:
-                                        self.table.resolve_conflict(
-                                            state.id, symbol, reduce_action
-                                        )
+        self.table.use_default_reductions()
         logger.info("Parser created")
+        if cache is not None:
+            cache.store(grammar, self)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the parse table into a compact, versioned binary format.
+
+        The format is a fixed header followed by the integer arrays of a
+        ``FlatTable`` and the UTF-8 names of its classes (by
+        ``qualified_name``) and non-terminals.  Classes are stored by name,
+        never pickled.
+
+        Returns:
+            Data that ``Parser.from_bytes`` turns back into an equivalent
+            parser.
+
+        Raises:
+            ValueError: If a reduction uses a maker other than the ones
+                built from a grammar, or two distinct classes share a
+                qualified name.
+        """
+        flat = FlatTable.encode(self)
+        encoded = [qualified_name(cls).encode() for cls in flat.classes]
+        encoded += [name.encode() for name in flat.names]
+        sections = [array("I", map(len, encoded))]
+        sections += [
+            array("i", section)
+            for section in (
+                flat.reduces,
+                flat.args,
+                flat.row_sizes,
+                flat.keys,
+                flat.actions,
+                flat.entries,
+                flat.defaults,
+            )
+        ]
+        if sys.byteorder == "big":
+            for section in sections:
+                section.byteswap()
+        header = TABLE_HEADER.pack(
+            TABLE_MAGIC,
+            TABLE_FORMAT,
+            len(flat.classes),
+            len(flat.names),
+            len(flat.reduces) // 6,
+            len(flat.args),
+            len(flat.row_sizes),
+            len(flat.keys),
+            len(flat.entries) // 2,
+            len(flat.defaults) // 2,
+        )
+        return b"".join([header, *map(bytes, sections), *encoded])
+
+    @classmethod
+    def from_bytes(cls, data: bytes, *, symbols: Iterable[type] = ()) -> Self:
+        """Rebuild a parser from the output of ``to_bytes``, without construction.
+
+        Decoding is a single pass over flat arrays.  Token and AST classes
+        are resolved by qualified name: from ``symbols`` when given there,
+        otherwise by importing their module.
+
+        Args:
+            data: The output of ``Parser.to_bytes``.
+            symbols: Classes to use instead of importing them, such as
+                classes defined inside a function.
+
+        Returns:
+            A parser with the serialized table and entry states.
+
+        Raises:
+            ValueError: If ``data`` is not a parser table of a supported
+                format version, or a class cannot be resolved.
+        """
+        view = memoryview(data)
+        if len(view) < TABLE_HEADER.size:
+            raise ValueError("Not a Plare parser table")
+        magic, version, *counts = TABLE_HEADER.unpack_from(view)
+        if magic != TABLE_MAGIC:
+            raise ValueError("Not a Plare parser table")
+        if version != TABLE_FORMAT:
+            raise ValueError(f"Unsupported parser table format {version}")
+        n_classes, n_names, n_reduces, n_args, n_rows, n_cells, *n_pairs = counts
+        n_entries, n_defaults = n_pairs
+
+        offset = TABLE_HEADER.size
+
+        def take(typecode: str, count: int) -> array[int]:
+            nonlocal offset
+            section: array[int] = array(typecode)
+            end = offset + count * section.itemsize
+            if end > len(view):
+                raise ValueError("Truncated parser table")
+            section.frombytes(view[offset:end])
+            if sys.byteorder == "big":
+                section.byteswap()
+            offset = end
+            return section
+
+        lengths = take("I", n_classes + n_names)
+        reduces = take("i", 6 * n_reduces)
+        args = take("i", n_args)
+        row_sizes = take("i", n_rows)
+        keys = take("i", n_cells)
+        actions = take("i", n_cells)
+        entries = take("i", 2 * n_entries)
+        defaults = take("i", 2 * n_defaults)
+        names: list[str] = []
+        for length in lengths:
+            names.append(str(view[offset : offset + length], "utf-8"))
+            offset += length
+
+        known = {qualified_name(symbol): symbol for symbol in symbols}
+        classes = [resolve_class(name, known) for name in names[:n_classes]]
+        flat = FlatTable(
+            classes,
+            names[n_classes:],
+            reduces,
+            args,
+            row_sizes,
+            keys,
+            actions,
+            entries,
+            defaults,
+        )
+        parser = cls.__new__(cls)
+        parser.table, parser.entry_state = flat.decode()
+        return parser
+
+    def to_module(self) -> str:
+        """Return the source of a Python module holding the parse table.
+
+        Like the ``parsetab`` module of yacc, the module contains only the
+        tuples of integers and strings of a ``FlatTable`` and references to
+        the token and AST classes, which it imports.  Once byte-compiled it
+        loads with no construction work; ``Parser.from_module`` turns it
+        back into a parser.
+
+        Returns:
+            The source of the module, to be written to a ``.py`` file.
+
+        Raises:
+            ValueError: If a reduction uses a maker other than the ones
+                built from a grammar, or a class cannot be imported by its
+                qualified name (e.g. it is defined inside a function).
+        """
+        flat = FlatTable.encode(self)
+        modules: dict[str, str] = {}
+        references = [class_reference(cls, modules) for cls in flat.classes]
+
+        lines = [
+            f'"""Parse table generated by Plare {plare.__version__}; do not edit."""',
+            "",
+        ]
+        lines += [f"import {name} as {alias}" for name, alias in modules.items()]
+        lines += [
+            "",
+            f"TABLE_FORMAT = {TABLE_FORMAT}",
+            f"CLASSES = ({', '.join(references)},)",
+            f"NAMES = {tuple(flat.names)!r}",
+            f"REDUCES = {tuple(flat.reduces)!r}",
+            f"ARGS = {tuple(flat.args)!r}",
+            f"ROW_SIZES = {tuple(flat.row_sizes)!r}",
+            f"KEYS = {tuple(flat.keys)!r}",
+            f"ACTIONS = {tuple(flat.actions)!r}",
+            f"ENTRIES = {tuple(flat.entries)!r}",
+            f"DEFAULTS = {tuple(flat.defaults)!r}",
+            "",
+        ]
+        return "\n".join(lines)
+
+    @classmethod
+    def from_module(cls, module: ModuleType | str) -> Self:
+        """Rebuild a parser from a module generated by ``to_module``.
+
+        Args:
+            module: The generated module, or its name to import.
+
+        Returns:
+            A parser with the generated table and entry states.
+
+        Raises:
+            ValueError: If ``module`` was not generated by ``to_module`` of
+                a supported format version.
+        """
+        if isinstance(module, str):
+            module = importlib.import_module(module)
+        version = getattr(module, "TABLE_FORMAT", None)
+        if version is None:
+            raise ValueError(f"Not a Plare parser table module: {module.__name__}")
+        if version != TABLE_FORMAT:
+            raise ValueError(f"Unsupported parser table format {version}")
+        flat = FlatTable(
+            list(module.CLASSES),
+            list(module.NAMES),
+            module.REDUCES,
+            module.ARGS,
+            module.ROW_SIZES,
+            module.KEYS,
+            module.ACTIONS,
+            module.ENTRIES,
+            module.DEFAULTS,
+        )
+        parser = cls.__new__(cls)
+        parser.table, parser.entry_state = flat.decode()
+        return parser
+
+    def compress(self, *, default_reductions: bool = True) -> Self:
+        """Return a parser running on a ``CompressedTable`` of this table.
+
+        The compressed table keeps the table in a few shared integer arrays
+        instead of one dict per state; ``table_footprint`` measures both.
+
+        Args:
+            default_reductions: Whether states reduce by their most frequent
+                reduction on every token without an explicit action, which
+                shrinks rows but reports errors only after those reductions.
+
+        Returns:
+            A parser with the compressed table and the same entry states.
+        """
+        parser = type(self).__new__(type(self))
+        parser.table = CompressedTable(
+            self.table, default_reductions=default_reductions
+        )
+        parser.entry_state = self.entry_state
+        return parser
+
+    def compiled(self) -> CompiledTable[T]:
+        """Return the ``CompiledTable`` of ``table``, which ``parse`` runs on.
+
+        The compiled table is built on first use and rebuilt when ``table``
+        is replaced.
+        """
+        compiled = self.compiled_table
+        if compiled is None or compiled.source is not self.table:
+            compiled = self.compiled_table = CompiledTable(self.table)
+        return compiled
 
     def parse(self, var: str, lexbuf: Iterable[Token]) -> T | Token:
         """Parse ``lexbuf`` as the non-terminal ``var`` and return the root AST node.
 
         Implements the standard LR parsing algorithm (Aho-Sethi-Ullman §4.6):
         maintain a state stack and a symbol stack; on each step look up the
-        action for the current state and lookahead token class.
+        action for the current state and lookahead token class.  The state
+        stack is an ``array('i')``; reductions truncate both stacks in place,
+        so deep right-recursive inputs parse in linear time.
+
+        The driver is ``ParseSession``, fed every token of ``lexbuf``.  It
+        runs on the integer-encoded ``CompiledTable`` of ``table``: the
+        lookahead is its token id, and a positive action code shifts while
+        a negative one reduces.  After a reduction the successor state is
+        read from the goto row of the exposed state, without consuming a
+        token.
 
-        The ``key`` variable holds the current lookahead *class* (not instance).
-        After a ``Reduce`` the driver does *not* consume a new token; instead it
-        sets ``key = left`` (the reduced non-terminal) and re-enters the action
-        lookup, which will find a ``Goto`` action to push the new state.
+        In a state with a default reduction (``Table.defaults``) the driver
+        reduces without reading the next token, so a construct is reduced as
+        soon as its last token arrives.
 
         Args:
             var: The entry non-terminal to parse (must be a key in the grammar
                 passed to ``__init__``).
-            lexbuf: An iterable of ``Token`` instances produced by the lexer.
-                An ``EOS`` sentinel is appended automatically.
+            lexbuf: An iterable of ``Token`` instances produced by the lexer,
+                such as the generator of ``Lexer.lex`` or the ``TokenArray``
+                of ``Lexer.lex_columnar``.  An ``EOS`` sentinel is appended
+                automatically.
 
         Returns:
             The root value produced by the top-level semantic action.
@@ -1045,90 +2376,381 @@ class Parser[T]:
             ParsingError: On unexpected token, missing action, or wrong
                 acceptance symbol.
         """
-        lexbuf = chain(iter(lexbuf), [EOS("", lineno=0, offset=0)])
+        session = ParseSession(self, var)
+        session.feed_many(lexbuf)
+        return session.finish()
 
-        state = self.entry_state[var]
-        stack = [state]
-        symbols = list[T | Token]()
+    def parse_iter(
+        self, var: str, lexbuf: Iterable[Token], emit: str
+    ) -> Generator[T | Token, None, T | Token]:
+        """Parse ``lexbuf`` as ``var``, yielding each value reduced to ``emit``.
 
-        key: type[Token] | str | None = None
-        token: Token | None = None
-        last_token: Token | None = None
-        while True:
-            if token is None:
-                token = next(lexbuf, None)
-            if token is None:
-                raise ParsingError(
-                    "Unexpected end of input",
-                    token=None,
-                    lineno=last_token.lineno if last_token else 0,
-                    offset=last_token.offset if last_token else 0,
-                    expected=self.table.expected_tokens(state),
-                )
-            if key is None:
-                key = type(token)
+        For long sequences, such as statements or log records: each subtree
+        of the non-terminal ``emit`` is yielded as soon as it is reduced,
+        which is when the parser pulls the token after it, and is dropped
+        from the value stack.  The reductions above it receive ``None`` in
+        its place, so only the items not yet taken are kept in memory, not
+        the whole document.
+
+        Every reduction to ``emit`` is yielded, so ``emit`` should not occur
+        nested in itself; the enclosing one would get ``None`` children.
+
+        Args:
+            var: The entry non-terminal to parse.
+            lexbuf: An iterable of ``Token`` instances, as for ``parse``.
+            emit: The non-terminal whose values to yield.
 
+        Yields:
+            The values reduced to ``emit``, in the order they are reduced.
+
+        Returns:
+            The root value, built with ``None`` for the emitted subtrees.
+
+        Raises:
+            ParsingError: As ``parse``, after the values reduced before the
+                error have been yielded.
+            ValueError: If ``emit`` is not a non-terminal of the grammar.
+        """
+        session = ParseSession(self, var, emit)
+        emitted = session.emitted
+        tokens = iter(lexbuf)
+        exhausted = False
+
+        def until_emitted() -> Generator[Token]:
+            # Stop feeding once a value is waiting, so it is yielded before
+            # the parser reads further.
+            nonlocal exhausted
+            for token in tokens:
+                yield token
+                if emitted:
+                    return
+            exhausted = True
+
+        while not exhausted:
             try:
-                action = self.table[state, key]
-            except KeyError:
-                raise ParsingError(
-                    f"Unexpected token: {type(token).__name__}",
-                    token=token,
-                    lineno=token.lineno,
-                    offset=token.offset,
-                    expected=self.table.expected_tokens(state),
-                ) from None
-            logger.debug("State: %d, Symbol: %s, Action: %s", state, key, action)
-            key = None
-            match action:
-                case Shift(next=n):
-                    state = n
-                    stack.append(state)
-                    symbols.append(token)
-                    last_token = token
-                    token = None
-
-                case Reduce(left, n, maker):
-                    if n > 0:
-                        # Pop stack
-                        stack = stack[:-n]
-
-                        # Pop symbols
-                        poped_symbols = symbols[-n:]
-                        symbols = symbols[:-n]
-
-                        # Make new symbol
-                        symbols.append(maker(*poped_symbols))
+                session.feed_many(until_emitted())
+            finally:
+                yield from emitted
+                emitted.clear()
+        try:
+            return session.finish()
+        finally:
+            yield from emitted
+
+    async def aparse(
+        self,
+        var: str,
+        tokens: AsyncIterable[Token],
+        *,
+        yield_every: int = YIELD_EVERY,
+    ) -> T | Token:
+        """Parse an asynchronous token source, such as ``Lexer.alex``.
+
+        Tokens are collected and fed to a ``ParseSession`` in batches of
+        ``yield_every``, and the parser gives control back to the event loop
+        after each batch, so a large input cannot starve the other tasks.
+        Results and errors are the same as ``parse``: when the source raises,
+        the tokens it produced before are parsed first, so a ``ParsingError``
+        on one of them wins over a ``LexingError`` further on.
 
-                    else:
-                        symbols.append(maker())
+        Args:
+            var: The entry non-terminal to parse.
+            tokens: An asynchronous iterable of ``Token`` instances.  An
+                ``EOS`` sentinel is appended automatically.
+            yield_every: Number of tokens parsed between two yields to the
+                event loop.
 
-                    # Prepare next
-                    state = stack[-1]
-                    key = left
+        Returns:
+            The root value produced by the top-level semantic action.
 
-                case Goto(next=n):
-                    state = n
-                    stack.append(state)
+        Raises:
+            ParsingError: On unexpected token, missing action, or wrong
+                acceptance symbol.
+            ValueError: If ``yield_every`` is less than 1.
+        """
+        if yield_every < 1:
+            raise ValueError("yield_every must be at least 1")
+        session = ParseSession(self, var)
+        source = aiter(tokens)
+        batch: list[Token] = []
+        failure: Exception | None = None
+        while True:
+            try:
+                token = await anext(source)
+            except StopAsyncIteration:
+                break
+            except Exception as e:
+                failure = e
+                break
+            batch.append(token)
+            if len(batch) == yield_every:
+                session.feed_many(batch)
+                batch.clear()
+                await asyncio.sleep(0)
+        session.feed_many(batch)
+        if failure is not None:
+            raise failure
+        return session.finish()
+
+
+class ParseSession[T]:
+    """Push-style parse of one input, fed tokens as they arrive.
+
+    ``Parser.parse`` pulls tokens from an iterable until the input ends.  A
+    session instead keeps its stacks between calls: ``feed`` and
+    ``feed_many`` advance the parse by the given tokens and return, and
+    ``finish`` ends the input and returns the result.  Sessions share
+    nothing but the parser's table, so any number of them can be
+    interleaved on one thread.
+
+    Every token is processed as soon as it is fed, including the default
+    reductions that follow its shift, and a ``ParsingError`` is raised by
+    the call that feeds the offending token.  Results and errors are those
+    of ``Parser.parse``, which runs on a session itself.  A session that
+    raised, or has finished, accepts no more tokens.
+
+    With ``emit``, every value reduced to that non-terminal is moved to
+    ``emitted`` as soon as it is built, and ``None`` takes its place on the
+    value stack, so the reductions above it receive ``None``.  The caller
+    takes the values from ``emitted`` and clears it; this is how
+    ``Parser.parse_iter`` streams the items of a long sequence.
+
+    Args:
+        parser: The parser whose table to run.
+        var: The entry non-terminal to parse.
+        emit: The non-terminal whose values to move to ``emitted``, if any.
+
+    Raises:
+        ValueError: If ``emit`` is not a non-terminal of the grammar.
+
+    Attributes:
+        parser: The parser whose table the session runs.
+        var: The entry non-terminal being parsed.
+        emitted: Values reduced to ``emit`` and not yet taken, in order.
+        rules: The rules of the compiled table, with the reductions to
+            ``emit`` diverted to ``emitted``; ``None`` without ``emit``.
+        stack: The state stack; its top is the current state.
+        symbols: The value stack.
+        last_token: The last shifted token, or ``None``.
+        reduced: States whose default reduction was applied since the last
+            shift, in order.
+        accepted: Whether the input has been accepted.
+        finished: Whether the session accepts no more tokens.
+    """
+
+    parser: Parser[T]
+    var: str
+    emitted: list[T | Token]
+    rules: list[tuple[int, int, Callable[..., Any] | None, slice, int]] | None
+    stack: array[int]
+    symbols: list[T | Token]
+    last_token: Token | None
+    reduced: list[int]
+    accepted: bool
+    finished: bool
+
+    def __init__(self, parser: Parser[T], var: str, emit: str | None = None) -> None:
+        self.parser = parser
+        self.var = var
+        self.emitted = []
+        self.rules = None
+        if emit is not None:
+            self.rules = self.divert(emit)
+        self.stack = array("i", [parser.entry_state[var]])
+        self.symbols = []
+        self.last_token = None
+        self.reduced = []
+        self.accepted = False
+        self.finished = False
+        # Apply the default reductions of the entry state, if any.
+        self.feed_many(())
+
+    def divert(
+        self, emit: str
+    ) -> list[tuple[int, int, Callable[..., Any] | None, slice, int]]:
+        """Return the compiled rules with the reductions to ``emit`` diverted.
+
+        A diverted rule calls its maker as before, appends the value to
+        ``emitted`` and pushes ``None`` instead.
+        """
+        compiled = self.parser.compiled()
+        target = compiled.nonterminal_ids.get(emit)
+        if target is None:
+            raise ValueError(f"Unknown non-terminal: {emit}")
+        emitted = self.emitted
+
+        def diverted(call: Callable[..., Any]) -> Callable[..., None]:
+            def reduce(*xs: Any) -> None:
+                emitted.append(call(*xs))
 
-                case Accept(symbol):
-                    if symbol != var:
+            return reduce
+
+        def first(x: Any) -> Any:
+            return x
+
+        rules: list[tuple[int, int, Callable[..., Any] | None, slice, int]] = list(
+            compiled.rules
+        )
+        for i, (left, n, call, pick, index) in enumerate(rules):
+            if left == target:
+                if call is None:
+                    # A pass-through rule; pick the value it keeps.
+                    call, pick = first, slice(index, index + 1 or None)
+                rules[i] = (left, n, diverted(call), pick, index)
+        return rules
+
+    def feed(self, token: Token) -> None:
+        """Advance the parse by ``token``.
+
+        Raises:
+            ParsingError: If ``token`` is not valid at this point.
+            ValueError: If the session has finished.
+        """
+        self.feed_many((token,))
+
+    def feed_many(self, tokens: Iterable[Token]) -> None:
+        """Advance the parse by each of ``tokens`` in turn.
+
+        Args:
+            tokens: Tokens of the input, such as a burst received from the
+                network; they are consumed lazily.
+
+        Raises:
+            ParsingError: If a token is not valid at its point.
+            ValueError: If the session has finished.
+        """
+        if self.finished:
+            raise ValueError("Parse session is finished")
+        compiled = self.parser.compiled()
+        actions = compiled.actions
+        gotos = compiled.gotos
+        defaults = compiled.defaults
+        rules = compiled.rules if self.rules is None else self.rules
+        token_ids = compiled.token_ids
+        unknown = compiled.unknown
+
+        lexbuf = iter(tokens)
+        stack = self.stack
+        symbols = self.symbols
+        reduced = self.reduced
+        state = stack[-1]
+        token: Token | None = None
+        last_token = self.last_token
+        column = unknown
+        try:
+            while True:
+                code = defaults[state]
+                if code:
+                    reduced.append(state)
+                else:
+                    if token is None:
+                        token = next(lexbuf, None)
+                        if token is None:
+                            break
+                        column = token_ids.get(type(token), unknown)
+                    code = actions[state][column]
+                    if code > 0:
+                        if code >= ACTION_NONE:
+                            self.accept(code, token)
+                            break
+                        state = code - 1
+                        stack.append(state)
+                        symbols.append(token)
+                        last_token = token
+                        token = None
+                        if reduced:
+                            reduced.clear()
+                        continue
+                    if not code:
                         raise ParsingError(
-                            f"Unexpected symbol parsed: {symbol}",
+                            f"Unexpected token: {type(token).__name__}",
                             token=token,
                             lineno=token.lineno,
                             offset=token.offset,
-                            expected=self.table.expected_tokens(state),
+                            expected=self.expected(state, token),
                         )
-                    break
 
-                case _:
-                    raise ParsingError(
-                        f"No action for state {state} and symbol {key}",
-                        token=token,
-                        lineno=token.lineno,
-                        offset=token.offset,
-                        expected=self.table.expected_tokens(state),
-                    )
+                # Reduce, by a looked-up action or a default reduction.  Both
+                # stacks are truncated in place, so a reduction costs O(n)
+                # however deep the stacks are; a pass-through reduction calls
+                # nothing.
+                left, n, call, pick, index = rules[-code - 1]
+                if call is None:
+                    if n != 1:
+                        value = symbols[index]
+                        del symbols[-n:]
+                        symbols.append(value)
+                elif n:
+                    value = call(*symbols[pick])
+                    del symbols[-n:]
+                    symbols.append(value)
+                else:
+                    symbols.append(call())
+                if n:
+                    del stack[-n:]
+                state = gotos[stack[-1]][left]
+                stack.append(state)
+        except BaseException:
+            self.finished = True
+            raise
+        finally:
+            self.last_token = last_token
+
+    def expected(self, state: int, token: Token) -> list[type[Token]]:
+        """Return the tokens expected where ``token`` was found unexpected.
+
+        Default reductions do not look at the lookahead, so the error may
+        surface in ``state``, after consistent states that did not expect
+        ``token`` either.  The first of those is where a parser without
+        default reductions stops, and its expected tokens are reported.
+        """
+        table = self.parser.table
+        for reduced in self.reduced:
+            expected = table.expected_tokens(reduced)
+            if type(token) not in expected:
+                return expected
+        return table.expected_tokens(state)
+
+    def accept(self, code: int, token: Token) -> None:
+        """Handle the accept or empty action ``code`` on ``token``."""
+        self.finished = True
+        state = self.stack[-1]
+        if code == ACTION_NONE:
+            message = f"No action for state {state} and symbol None"
+        else:
+            symbol = self.parser.compiled().accepts[state]
+            if symbol == self.var:
+                self.accepted = True
+                return
+            message = f"Unexpected symbol parsed: {symbol}"
+        raise ParsingError(
+            message,
+            token=token,
+            lineno=token.lineno,
+            offset=token.offset,
+            expected=self.parser.table.expected_tokens(state),
+        )
+
+    def finish(self) -> T | Token:
+        """End the input and return the root value of the parse.
+
+        Returns:
+            The root value produced by the top-level semantic action.
 
-        return symbols[-1]
+        Raises:
+            ParsingError: If the input ends too early.
+            ValueError: If the session has finished without accepting.
+        """
+        if not self.accepted:
+            self.feed(EOS("", lineno=0, offset=0))
+        if not self.accepted:
+            self.finished = True
+            last_token = self.last_token
+            raise ParsingError(
+                "Unexpected end of input",
+                token=None,
+                lineno=last_token.lineno if last_token else 0,
+                offset=last_token.offset if last_token else 0,
+                expected=self.parser.table.expected_tokens(self.stack[-1]),
+            )
+        return self.symbols[-1]
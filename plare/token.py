@@ -3,9 +3,21 @@
 Every token class used in a grammar must subclass ``Token``.  Token *classes*
 (not instances) serve as grammar symbols inside ``Parser``; the parser never
 compares token instances directly — it dispatches on ``type(token)``.
+
+Source positions are normally plain ``(lineno, offset)`` integers.  A lexer in
+lazy-position mode instead hands each token a shared ``LineIndex`` together
+with an absolute character offset; ``lineno`` and ``offset`` are then resolved
+on first access by bisecting the index (see ``Positioned``).
+
+``TokenArray`` is a columnar alternative to a list of tokens: token classes and
+offsets are kept in flat arrays and ``Token`` instances are only built when an
+element is accessed.
 """
 
-from typing import Any, Literal
+import re
+from array import array
+from bisect import bisect_right
+from typing import Any, Iterator, Literal, overload
 
 from plare.utils import logger
 
@@ -17,7 +29,92 @@ type assoc = Literal["left", "right"]
 """
 
 
-class Token:
+class LineIndex:
+    """Line-start index of one source text, built on first use.
+
+    One ``LineIndex`` is shared by every token lexed from the same source.  The
+    index itself (a sorted list of the character offsets at which each line
+    starts) is only computed the first time a position is resolved, so inputs
+    whose positions are never read pay nothing for it.
+
+    Attributes:
+        src: The source text the offsets refer to.
+    """
+
+    def __init__(self, src: str) -> None:
+        self.src = src
+        self._starts: list[int] | None = None
+
+    @property
+    def starts(self) -> list[int]:
+        """Offsets of the first character of every line (``starts[0] == 0``)."""
+        if self._starts is None:
+            self._starts = [0] + [m.end() for m in re.finditer("\n", self.src)]
+        return self._starts
+
+    def position(self, pos: int) -> tuple[int, int]:
+        """Return the 1-based line number and 0-based column of offset ``pos``."""
+        starts = self.starts
+        lineno = bisect_right(starts, pos)
+        return lineno, pos - starts[lineno - 1]
+
+
+class Positioned:
+    """Mixin for objects that carry a ``(lineno, offset)`` source position.
+
+    The position is stored either eagerly as two integers or lazily as a
+    ``LineIndex`` plus an absolute character offset.  In the lazy form,
+    ``lineno`` and ``offset`` are resolved together on first access and the
+    reference to the index is dropped.
+
+    Attributes:
+        line_index: The shared index while the position is still unresolved,
+            ``None`` otherwise.
+    """
+
+    line_index: LineIndex | None = None
+    _lineno: int = 0
+    _offset: int = 0
+
+    def set_position(self, lineno: int | LineIndex, offset: int) -> None:
+        """Store an eager ``(lineno, offset)`` or a lazy ``(LineIndex, pos)`` position."""
+        if isinstance(lineno, LineIndex):
+            self.line_index = lineno
+        else:
+            self._lineno = lineno
+        self._offset = offset
+
+    def resolve_position(self) -> None:
+        """Resolve a lazy position against its ``LineIndex``; no-op when eager."""
+        index = self.line_index
+        if index is not None:
+            self.line_index = None
+            self._lineno, self._offset = index.position(self._offset)
+
+    @property
+    def lineno(self) -> int:
+        """1-based line number of the position."""
+        self.resolve_position()
+        return self._lineno
+
+    @lineno.setter
+    def lineno(self, value: int) -> None:
+        self.resolve_position()
+        self._lineno = value
+
+    @property
+    def offset(self) -> int:
+        """0-based column offset of the position within its line."""
+        self.resolve_position()
+        return self._offset
+
+    @offset.setter
+    def offset(self, value: int) -> None:
+        self.resolve_position()
+        self._offset = value
+
+
+class Token(Positioned):
     """Base class for all tokens produced by ``Lexer`` and consumed by ``Parser``.
 
     Subclass ``Token`` to define the terminal symbols of your grammar.
@@ -39,6 +136,11 @@ class Token:
         lineno: 1-based source line number of the token's first character.
         offset: 0-based column offset of the token's first character.
 
+    ``lineno`` may also be a ``LineIndex``, in which case ``offset`` is the
+    absolute character offset of the token and both attributes are resolved
+    on first access.  Subclasses must therefore forward ``lineno`` and
+    ``offset`` to ``super().__init__`` unchanged.
+
     Hash and equality contract:
         Two ``Token`` instances are considered equal when they are of the same
         class *and* share the same ``(lineno, offset)`` position.  This is an
@@ -53,16 +155,15 @@ class Token:
     associative: assoc = "right"
     precedence: int = 0
 
-    def __init__(self, value: str, *, lineno: int, offset: int) -> None:
+    def __init__(self, value: str, *, lineno: int | LineIndex, offset: int) -> None:
         logger.debug(
-            "Token created: %s(%s) @ (%s, %s)",
+            "Token created: %s(%r) @ (%s, %s)",
             self.__class__.__name__,
-            repr(value),
+            value,
             lineno,
             offset,
         )
-        self.lineno = lineno
-        self.offset = offset
+        self.set_position(lineno, offset)
 
     def __hash__(self) -> int:
         return hash((type(self), self.lineno, self.offset))
@@ -73,3 +174,87 @@ class Token:
             and self.lineno == other.lineno
             and self.offset == other.offset
         )
+
+
+class TokenArray:
+    """Compact, columnar sequence of the tokens lexed from one source text.
+
+    Each token is stored as a class id and the start and end offsets of its
+    text, about 18 bytes per token instead of a full ``Token`` object.
+    Indexing (or iterating) builds the ``Token`` on the fly from the source
+    slice, with a lazy position resolved through the shared ``LineIndex``;
+    slicing builds a list of the selected tokens.
+    Tokens that were produced by callable handlers cannot be rebuilt from
+    their text and are kept as-is.  A ``TokenArray`` is an iterable of tokens,
+    so it can be passed directly to ``Parser.parse``.
+
+    Attributes:
+        src: The source text the offsets refer to.
+        lines: Line index of ``src`` shared by every materialised token.
+        classes: Token classes, indexed by class id.
+        class_ids: Inverse of ``classes``.
+        ids: Class id of each token (``array('H')``).
+        starts: Start offset of each token's text (``array('q')``).
+        ends: End offset of each token's text (``array('q')``).
+        built: Tokens produced by callable handlers, by index.
+    """
+
+    def __init__(self, src: str, lines: LineIndex | None = None) -> None:
+        self.src = src
+        self.lines = lines if lines is not None else LineIndex(src)
+        self.classes: list[type[Token]] = []
+        self.class_ids: dict[type[Token], int] = {}
+        self.ids = array("H")
+        self.starts = array("q")
+        self.ends = array("q")
+        self.built: dict[int, Token] = {}
+
+    def class_id(self, cls: type[Token]) -> int:
+        """Return the id of ``cls``, assigning the next free one if it is new."""
+        cid = self.class_ids.get(cls)
+        if cid is None:
+            cid = self.class_ids[cls] = len(self.classes)
+            self.classes.append(cls)
+        return cid
+
+    def append(self, cls: type[Token], start: int, end: int) -> None:
+        """Record a token of class ``cls`` spanning ``src[start:end]``."""
+        self.ids.append(self.class_id(cls))
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def append_token(self, token: Token, start: int, end: int) -> None:
+        """Record an already built ``token`` spanning ``src[start:end]``."""
+        self.built[len(self.ids)] = token
+        self.append(type(token), start, end)
+
+    def token_class(self, index: int) -> type[Token]:
+        """Return the class of the token at ``index`` without building it."""
+        return self.classes[self.ids[index]]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @overload
+    def __getitem__(self, index: int) -> Token: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Token]: ...
+
+    def __getitem__(self, index: int | slice) -> Token | list[Token]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.ids)))]
+        if index < 0:
+            index += len(self.ids)
+        if not 0 <= index < len(self.ids):
+            raise IndexError("TokenArray index out of range")
+        built = self.built.get(index)
+        if built is not None:
+            return built
+        start = self.starts[index]
+        cls = self.classes[self.ids[index]]
+        return cls(self.src[start : self.ends[index]], lineno=self.lines, offset=start)
+
+    def __iter__(self) -> Iterator[Token]:
+        for index in range(len(self.ids)):
+            yield self[index]
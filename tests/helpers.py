@@ -0,0 +1,92 @@
+"""Grammars and helpers shared by several test modules."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+from plare.token import Token
+
+type Grammar[T] = dict[
+    str,
+    list[
+        tuple[list[type[Token] | str], type[T] | None, list[int]]
+        | tuple[list[type[Token] | str], type[T] | None, list[int], type[Token]]
+    ],
+]
+
+
+class NUM(Token):
+    pass
+
+
+class LPAREN(Token):
+    pass
+
+
+class RPAREN(Token):
+    pass
+
+
+class Node:
+    def __init__(self, *children: Node | Token) -> None:
+        self.children = children
+
+
+def token_class(name: str) -> type[Token]:
+    """Return the token class ``name`` of this module, creating it on first use.
+
+    The classes are registered in this module so that they can be imported by
+    name, like token classes of a real project, and a grammar built twice
+    uses the same classes.
+    """
+    cls = globals().get(name)
+    if cls is None:
+        cls = globals()[name] = type(name, (Token,), {"__module__": __name__})
+    return cls
+
+
+def make_layered_grammar(
+    levels: int, operators: int, *, prefixes: bool = False
+) -> Grammar[Node]:
+    """Return an expression grammar with ``levels`` binary-operator layers.
+
+    Every layer has ``operators`` left-associative operators of its own and a
+    pass-through production to the next layer.  With ``prefixes`` each
+    operator is followed by an optional prefix, so the grammar also has
+    nullable symbols and long *includes* chains — the shape of real
+    programming-language grammars.
+    """
+    grammar: Grammar[Node] = {}
+    for level in range(levels):
+        current, below = f"e{level}", f"e{level + 1}"
+        prefix = f"p{level}"
+        rights: list[
+            tuple[list[type[Token] | str], type[Node] | None, list[int]]
+            | tuple[list[type[Token] | str], type[Node] | None, list[int], type[Token]]
+        ] = []
+        for op in range(operators):
+            token = token_class(f"OP{level}_{op}")
+            if prefixes:
+                rights.append(([current, token, prefix, below], Node, [0, 3]))
+            else:
+                rights.append(([current, token, below], Node, [0, 2]))
+        rights.append(([below], None, [0]))
+        grammar[current] = rights
+        if prefixes:
+            marker = token_class(f"PRE{level}")
+            grammar[prefix] = [([], Node, []), ([marker], Node, [0])]
+    grammar[f"e{levels}"] = [([NUM], Node, [0]), ([LPAREN, "e0", RPAREN], None, [1])]
+    return grammar
+
+
+def summarize(tokens: Sequence[Token]) -> list[tuple[str, int, int, object]]:
+    """Return the class name, position and value (or name) of each token."""
+    return [
+        (
+            type(t).__name__,
+            t.lineno,
+            t.offset,
+            getattr(t, "value", getattr(t, "name", None)),
+        )
+        for t in tokens
+    ]
@@ -0,0 +1,176 @@
+"""Tests for the asyncio entry points ``Lexer.alex`` and ``Parser.aparse``."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from collections.abc import AsyncIterator, Iterable
+
+import pytest
+import test_integration
+from helpers import summarize
+from test_integration import Expr, eval_expr, expr_lexer, expr_parser
+
+from plare.exception import LexingError, ParsingError
+from plare.token import Token
+
+SRC = "let xé = 3 in\n  (xé + 4) * 2 ** 3 - if 1 < 2 then 5 else 6"
+
+
+async def produce[X](items: Iterable[X]) -> AsyncIterator[X]:
+    """Yield ``items`` one at a time, letting other tasks run in between."""
+    for item in items:
+        await asyncio.sleep(0)
+        yield item
+
+
+def chunked(data: bytes, size: int) -> list[bytes]:
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+async def collect(chunks: Iterable[str | bytes], **kwargs: int) -> list[Token]:
+    return [
+        token async for token in expr_lexer.alex("start", produce(chunks), **kwargs)
+    ]
+
+
+def test_alex_matches_lex() -> None:
+    expected = summarize(list(expr_lexer.lex("start", SRC)))
+    for size in (1, 2, 5, 64):
+        chunks = [SRC[i : i + size] for i in range(0, len(SRC), size)]
+        tokens = asyncio.run(collect(chunks, lookahead=3))
+        assert summarize(tokens) == expected
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7])
+def test_alex_decodes_characters_split_between_chunks(size: int) -> None:
+    """Bytes chunks may cut a multi-byte character, such as ``é``, in two."""
+    expected = summarize(list(expr_lexer.lex("start", SRC)))
+    tokens = asyncio.run(collect(chunked(SRC.encode(), size)))
+    assert summarize(tokens) == expected
+
+
+def test_alex_rejects_truncated_input() -> None:
+    with pytest.raises(UnicodeDecodeError):
+        asyncio.run(collect(["x = ".encode(), "é".encode()[:1]]))
+
+
+def test_alex_reads_a_stream_reader() -> None:
+    async def main() -> list[Token]:
+        reader = asyncio.StreamReader()
+        reader.feed_data(SRC.encode())
+        reader.feed_eof()
+        return [token async for token in expr_lexer.alex("start", reader)]
+
+    expected = summarize(list(expr_lexer.lex("start", SRC)))
+    assert summarize(asyncio.run(main())) == expected
+
+
+def test_alex_errors_match_lex() -> None:
+    src = "1 +\n 2 @ 3"
+    with pytest.raises(LexingError) as expected:
+        list(expr_lexer.lex("start", src))
+    with pytest.raises(LexingError) as actual:
+        asyncio.run(collect(chunked(src.encode(), 2)))
+    assert str(actual.value) == str(expected.value)
+
+
+async def aparse_eval(src: str, **kwargs: int) -> int:
+    tokens = expr_lexer.alex("start", produce(chunked(src.encode(), 4)))
+    result = await expr_parser.aparse("expr", tokens, **kwargs)
+    assert isinstance(result, Expr)
+    return eval_expr(result)
+
+
+@pytest.mark.parametrize("yield_every", [1, 3, 1024])
+def test_aparse_matches_parse(yield_every: int) -> None:
+    assert asyncio.run(aparse_eval(SRC, yield_every=yield_every)) == 51
+
+
+def test_aparse_evaluates_like_parse() -> None:
+    rng = random.Random(24)
+    sources = [
+        "-2 ** 2",
+        "2 ** 3 ** 2",
+        "not 1 and 0 or 1",
+        "if 1 then if 0 then 1 else 2 else 3",
+        "let x = 2 in let y = x * 3 in y - x",
+        *(f"{rng.randrange(9)} * {rng.randrange(9)} - 1" for _ in range(20)),
+    ]
+    for src in sources:
+        assert asyncio.run(aparse_eval(src, yield_every=2)) == (
+            test_integration.parse_eval(src)
+        )
+
+
+@pytest.mark.parametrize("src", ["1 + * 2", "1 + * @", "1 +", ")"])
+def test_aparse_errors_match_parse(src: str) -> None:
+    """A parsing error before a lexing error is raised first, as with ``parse``."""
+    with pytest.raises(ParsingError) as expected:
+        expr_parser.parse("expr", expr_lexer.lex("start", src))
+    for yield_every in (1, 1024):
+        with pytest.raises(ParsingError) as actual:
+            asyncio.run(aparse_eval(src, yield_every=yield_every))
+        assert str(actual.value) == str(expected.value)
+        assert actual.value.expected == expected.value.expected
+        assert actual.value.lineno == expected.value.lineno
+
+
+def test_lexing_errors_pass_through_aparse() -> None:
+    with pytest.raises(LexingError, match="Unexpected character"):
+        asyncio.run(aparse_eval("1 + 2 @"))
+
+
+def test_other_tasks_run_during_a_large_parse() -> None:
+    src = " + ".join(str(i % 10) for i in range(500))
+    ticks: list[int] = []
+
+    async def tick() -> None:
+        while True:
+            ticks.append(len(ticks))
+            await asyncio.sleep(0)
+
+    async def main() -> int:
+        async def chunks() -> AsyncIterator[str]:
+            yield src
+
+        ticker = asyncio.create_task(tick())
+        source = expr_lexer.alex("start", chunks(), yield_every=10)
+        try:
+            result = await expr_parser.aparse("expr", source, yield_every=10)
+        finally:
+            ticker.cancel()
+        assert isinstance(result, Expr)
+        return eval_expr(result)
+
+    assert asyncio.run(main()) == sum(i % 10 for i in range(500))
+    # The whole input is one chunk, so only the lexer and the parser yield,
+    # each every 10 of the 999 tokens.
+    assert len(ticks) >= 150
+
+
+@pytest.mark.parametrize("yield_every", [0, -1])
+def test_yield_every_must_be_positive(yield_every: int) -> None:
+    with pytest.raises(ValueError, match="yield_every"):
+        asyncio.run(collect(["1"], yield_every=yield_every))
+    with pytest.raises(ValueError, match="yield_every"):
+        asyncio.run(aparse_eval("1", yield_every=yield_every))
+
+
+def test_alex_yields_tokens_before_later_chunks_arrive() -> None:
+    """A token is yielded once the text after it has arrived, not later."""
+    pulled: list[str] = []
+
+    async def source() -> AsyncIterator[str]:
+        for chunk in ["let x = 3 ", "in x ", "+ 4"]:
+            pulled.append(chunk)
+            yield chunk
+
+    async def first() -> Token:
+        tokens = expr_lexer.alex("start", source())
+        token = await anext(tokens)
+        await tokens.aclose()
+        return token
+
+    assert isinstance(asyncio.run(first()), test_integration.LET)
+    assert pulled == ["let x = 3 "]
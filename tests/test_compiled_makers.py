@@ -0,0 +1,308 @@
+"""Tests for reduce actions compiled for the driver (``compile_maker``)."""
+
+from __future__ import annotations
+
+import gc
+import random
+import time
+from collections.abc import Sequence
+
+import pytest
+
+from plare.parser import IDMaker, Parser, Reduce, TMaker, compile_maker
+from plare.token import Token
+
+
+class Record:
+    def __init__(self, *args: object) -> None:
+        self.args = args
+
+
+def apply(maker: TMaker[Record] | IDMaker[Record], values: Sequence[object]) -> object:
+    """Reduce the top ``len(values)`` of a value stack the way ``parse`` does."""
+    stack: list[object] = ["below", *values]
+    call, pick, index = compile_maker(maker, len(values))
+    if call is None:
+        return stack[index]
+    result = call(*stack[pick])
+    assert isinstance(result, Record)
+    return result.args
+
+
+@pytest.mark.parametrize(
+    "args, n",
+    [
+        ([0, 1, 2], 3),
+        ([0, 2], 3),
+        ([1], 3),
+        ([2], 3),
+        ([0, 2, 4], 5),
+        ([2, 0], 3),
+        ([0, 1, 3], 4),
+        ([1, 1], 2),
+        ([], 0),
+        ([], 2),
+        ([-1, 0], 2),
+        ([-1], 3),
+        ([-3, -1], 3),
+        ([0, -2], 3),
+    ],
+)
+def test_class_makers_get_the_selected_values(args: list[int], n: int) -> None:
+    values = [f"x{i}" for i in range(n)]
+    assert apply(TMaker(Record, args), values) == tuple(values[i] for i in args)
+
+
+@pytest.mark.parametrize(
+    "arg, n", [(0, 1), (0, 3), (1, 3), (2, 3), (-1, 1), (-1, 2), (-3, 3)]
+)
+def test_pass_through_makers_are_not_called(arg: int, n: int) -> None:
+    values = [f"x{i}" for i in range(n)]
+    call, _, _ = compile_maker(IDMaker[Record](arg), n)
+    assert call is None
+    assert apply(IDMaker(arg), values) == values[arg]
+
+
+def test_evenly_spaced_arguments_call_the_class() -> None:
+    call, pick, _ = compile_maker(TMaker(Record, [0, 2]), 3)
+    assert call is Record
+    assert pick == slice(-3, None, 2)
+
+
+@pytest.mark.parametrize(
+    "maker, n",
+    [
+        (TMaker(Record, [2]), 2),
+        (TMaker(Record, [0, -3]), 2),
+        (TMaker(Record, [0]), 0),
+        (IDMaker[Record](1), 1),
+        (IDMaker[Record](-2), 1),
+    ],
+)
+def test_out_of_range_arguments_are_rejected(
+    maker: TMaker[Record] | IDMaker[Record], n: int
+) -> None:
+    with pytest.raises(ValueError, match="out of range"):
+        compile_maker(maker, n)
+
+
+class Collect:
+    def __call__(self, *xs: Record | Token) -> Record:
+        return Record(*xs)
+
+
+def test_other_makers_get_every_value() -> None:
+    maker = Collect()
+    assert compile_maker(maker, 2) == (maker, slice(-2, None), 0)
+    assert compile_maker(maker, 0) == (maker, slice(0, 0), 0)
+
+
+# ---------------------------------------------------------------------------
+# Reductions on the calc grammar
+# ---------------------------------------------------------------------------
+
+
+class NUM(Token):
+    def __init__(self, value: str, *, lineno: int, offset: int) -> None:
+        super().__init__(value, lineno=lineno, offset=offset)
+        self.value = int(value)
+
+
+class PLUS(Token):
+    precedence = 1
+    associative = "left"
+
+
+class MINUS(Token):
+    precedence = 1
+    associative = "left"
+
+
+class STAR(Token):
+    precedence = 2
+    associative = "left"
+
+
+class SLASH(Token):
+    precedence = 2
+    associative = "left"
+
+
+class LPAREN(Token):
+    pass
+
+
+class RPAREN(Token):
+    pass
+
+
+class COMMA(Token):
+    pass
+
+
+class Exp:
+    value: int
+
+
+class Const(Exp):
+    def __init__(self, n: NUM) -> None:
+        self.value = n.value
+
+
+class Add(Exp):
+    def __init__(self, left: Exp, right: Exp) -> None:
+        self.value = left.value + right.value
+
+
+class Sub(Exp):
+    def __init__(self, left: Exp, right: Exp) -> None:
+        self.value = left.value - right.value
+
+
+class Mul(Exp):
+    def __init__(self, left: Exp, right: Exp) -> None:
+        self.value = left.value * right.value
+
+
+class Div(Exp):
+    def __init__(self, left: Exp, right: Exp) -> None:
+        self.value = left.value // right.value
+
+
+PARSER: Parser[Exp] = Parser(
+    {
+        "exp": [
+            ([NUM], Const, [0]),
+            (["exp", PLUS, "exp"], Add, [0, 2]),
+            (["exp", MINUS, "exp"], Sub, [0, 2]),
+            (["exp", STAR, "exp"], Mul, [0, 2]),
+            (["exp", SLASH, "exp"], Div, [0, 2]),
+            ([LPAREN, "exp", RPAREN], None, [1]),
+            ([LPAREN, "exp", COMMA, "exp", RPAREN], Sub, [3, 1]),
+            (["term"], None, [0]),
+        ],
+        "term": [([STAR, NUM], Const, [1])],
+    }
+)
+
+KINDS: dict[str, type[Token]] = {
+    "+": PLUS,
+    "-": MINUS,
+    "*": STAR,
+    "/": SLASH,
+    "(": LPAREN,
+    ")": RPAREN,
+    ",": COMMA,
+}
+
+
+def tokenize(src: str) -> list[Token]:
+    return [
+        KINDS.get(c, NUM)(c, lineno=1, offset=i) for i, c in enumerate(src) if c != " "
+    ]
+
+
+@pytest.mark.parametrize(
+    "src, value",
+    [("1 + 2 * 3", 7), ("(8 - 2) / 3", 2), ("(1, 5)", 4), ("*3 - (2)", 1)],
+)
+def test_calc_grammar_evaluates(src: str, value: int) -> None:
+    result = PARSER.parse("exp", tokenize(src))
+    assert isinstance(result, Exp) and result.value == value
+
+
+class A(Token):
+    pass
+
+
+class B(Token):
+    pass
+
+
+class Pair:
+    def __init__(self, first: Token, second: Token) -> None:
+        self.first = first
+        self.second = second
+
+
+def test_negative_arguments_count_from_the_end() -> None:
+    parser: Parser[Pair] = Parser(
+        {
+            "pair": [([A, B], Pair, [-1, 0])],
+            "last": [([A, B], None, [-1])],
+        }
+    )
+    a, b = A("a", lineno=1, offset=0), B("b", lineno=1, offset=1)
+    pair = parser.parse("pair", [a, b])
+    assert isinstance(pair, Pair)
+    assert (pair.first, pair.second) == (b, a)
+    assert parser.parse("last", [a, b]) is b
+
+
+@pytest.mark.parametrize("args", [[2], [-3], [0, 5]])
+def test_grammars_with_out_of_range_arguments_are_rejected(args: list[int]) -> None:
+    with pytest.raises(ValueError, match="out of range for 2 symbols"):
+        Parser({"pair": [([A, B], Pair, args)]})
+
+
+def dispatching(parser: Parser[Exp]) -> Parser[Exp]:
+    """Return a copy of ``parser`` whose reductions call their makers."""
+    copy = parser.compress(default_reductions=False)
+    compiled = copy.compiled()
+    for state, row in enumerate(parser.table.table):
+        for symbol, action in row.items():
+            if isinstance(symbol, type) and isinstance(action, Reduce):
+                code = compiled.actions[state][compiled.token_ids[symbol]]
+                left, n, *_ = compiled.rules[-code - 1]
+                pick = slice(-n, None) if n else slice(0, 0)
+                compiled.rules[-code - 1] = (left, n, action.maker, pick, 0)
+    for state, reduce in parser.table.defaults.items():
+        code = compiled.defaults[state]
+        left, n, *_ = compiled.rules[-code - 1]
+        pick = slice(-n, None) if n else slice(0, 0)
+        compiled.rules[-code - 1] = (left, n, reduce.maker, pick, 0)
+    return copy
+
+
+@pytest.mark.slow
+def test_reduction_throughput_report() -> None:
+    """Compiled reductions beat calling ``TMaker`` and ``IDMaker``."""
+    rng = random.Random(0)
+    groups = 20_000
+    src = " + ".join(
+        f"({rng.randrange(1, 10)} * {rng.randrange(1, 10)} - {rng.randrange(1, 10)})"
+        for _ in range(groups)
+    )
+    tokens = tokenize(src)
+    # Three Const, one Mul, one Sub and the parentheses per group, then one
+    # Add between groups.
+    reductions = 6 * groups + groups - 1
+    baseline = dispatching(PARSER)
+
+    # Runs alternate, each after a full collection, so that neither side
+    # pays for the garbage of the other.
+    parsers = {"maker calls": baseline, "compiled": PARSER}
+    timings = dict.fromkeys(parsers, float("inf"))
+    values: set[int] = set()
+    for _ in range(7):
+        for name, parser in parsers.items():
+            gc.collect()
+            gc.disable()
+            try:
+                t0 = time.perf_counter()
+                result = parser.parse("exp", tokens)
+                timings[name] = min(timings[name], time.perf_counter() - t0)
+            finally:
+                gc.enable()
+            assert isinstance(result, Exp)
+            values.add(result.value)
+
+    print(
+        f"\n{reductions} reductions: "
+        + ", ".join(
+            f"{name} {seconds / reductions * 1e9:.0f} ns/reduction"
+            for name, seconds in timings.items()
+        )
+    )
+    assert len(values) == 1
+    assert timings["compiled"] < timings["maker calls"]
@@ -0,0 +1,265 @@
+"""Tests for the integer-encoded table ``Parser.parse`` runs on (``CompiledTable``)."""
+
+from __future__ import annotations
+
+import random
+import time
+from itertools import chain
+from typing import Any
+
+import pytest
+
+from plare.exception import ParsingError
+from plare.parser import (
+    ACTION_ACCEPT,
+    ACTION_ERROR,
+    EOS,
+    Accept,
+    CompiledTable,
+    Goto,
+    Parser,
+    Reduce,
+    Shift,
+    compile_maker,
+)
+from plare.token import Token
+
+
+class NUM(Token):
+    def __init__(self, value: str, *, lineno: int, offset: int) -> None:
+        super().__init__(value, lineno=lineno, offset=offset)
+        self.value = int(value)
+
+
+class PLUS(Token):
+    precedence = 1
+    associative = "left"
+
+
+class STAR(Token):
+    precedence = 2
+    associative = "left"
+
+
+class LPAREN(Token):
+    pass
+
+
+class RPAREN(Token):
+    pass
+
+
+class OTHER(Token):
+    pass
+
+
+class Value:
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+
+class Num(Value):
+    def __init__(self, token: NUM, /) -> None:
+        super().__init__(token.value)
+
+
+class Add(Value):
+    def __init__(self, left: Value, right: Value, /) -> None:
+        super().__init__(left.value + right.value)
+
+
+class Mul(Value):
+    def __init__(self, left: Value, right: Value, /) -> None:
+        super().__init__(left.value * right.value)
+
+
+PARSER: Parser[Value] = Parser(
+    {
+        "expr": [
+            ([NUM], Num, [0]),
+            (["expr", PLUS, "expr"], Add, [0, 2]),
+            (["expr", STAR, "expr"], Mul, [0, 2]),
+            ([LPAREN, "expr", RPAREN], None, [1]),
+        ],
+        "exprs": [(["expr"], None, [0]), (["exprs", "expr"], Add, [0, 1])],
+    }
+)
+
+KINDS: dict[str, type[Token]] = {
+    "+": PLUS,
+    "*": STAR,
+    "(": LPAREN,
+    ")": RPAREN,
+    "?": OTHER,
+}
+
+
+def tokenize(src: str) -> list[Token]:
+    return [
+        KINDS.get(c, NUM)(c, lineno=1, offset=i) for i, c in enumerate(src) if c != " "
+    ]
+
+
+def reference_parse(parser: Parser[Any], var: str, lexbuf: list[Token]) -> Any:
+    """Parse like ``Parser.parse`` did, by matching the action classes of ``table``."""
+    tokens = chain(lexbuf, [EOS("", lineno=0, offset=0)])
+    table = parser.table
+    state = parser.entry_state[var]
+    stack = [state]
+    symbols: list[Any] = []
+    token = next(tokens)
+    while True:
+        try:
+            # A consistent state rejects the tokens its row lacks, as it
+            # would without its default reduction.
+            kind = type(token)
+            if state in table.defaults and kind not in table.expected_tokens(state):
+                raise KeyError(state, kind)
+            action = table[state, kind]
+        except KeyError:
+            raise ParsingError(
+                f"Unexpected token: {type(token).__name__}",
+                token=token,
+                lineno=token.lineno,
+                offset=token.offset,
+                expected=table.expected_tokens(state),
+            ) from None
+        match action:
+            case Shift(next=n):
+                state = n
+                stack.append(state)
+                symbols.append(token)
+                token = next(tokens)
+            case Accept(symbol):
+                if symbol != var:
+                    raise ParsingError(
+                        f"Unexpected symbol parsed: {symbol}",
+                        token=token,
+                        lineno=token.lineno,
+                        offset=token.offset,
+                        expected=table.expected_tokens(state),
+                    )
+                return symbols[-1]
+            case Reduce(left, n, maker):
+                args = symbols[len(symbols) - n :]
+                del symbols[len(symbols) - n :]
+                del stack[len(stack) - n :]
+                symbols.append(maker(*args))
+                goto = table[stack[-1], left]
+                assert isinstance(goto, Goto)
+                state = goto.next
+                stack.append(state)
+            case _:
+                raise ParsingError(
+                    f"No action for state {state} and symbol None",
+                    token=token,
+                    lineno=token.lineno,
+                    offset=token.offset,
+                    expected=table.expected_tokens(state),
+                )
+
+
+def outcome(parser: Parser[Any], var: str, src: str, *, reference: bool) -> object:
+    """Return the value of parsing ``src``, or the details of its error."""
+    try:
+        if reference:
+            result = reference_parse(parser, var, tokenize(src))
+        else:
+            result = parser.parse(var, tokenize(src))
+    except ParsingError as e:
+        return (str(e), e.token and e.token.offset, e.expected)
+    assert isinstance(result, Value)
+    return result.value
+
+
+PARSERS = [PARSER, PARSER.compress(), PARSER.compress(default_reductions=False)]
+SOURCES = ["1 + 2 * (3 + 4)", "1 2*3 (4) 5+6", "1 + * 2", "(1", "1 )", ")", "1 ? 2", ""]
+
+
+@pytest.mark.parametrize("parser", PARSERS)
+@pytest.mark.parametrize("var", ["expr", "exprs"])
+@pytest.mark.parametrize("src", SOURCES)
+def test_parse_matches_the_action_table(
+    parser: Parser[Value], var: str, src: str
+) -> None:
+    expected = outcome(parser, var, src, reference=True)
+    assert outcome(parser, var, src, reference=False) == expected
+
+
+@pytest.mark.parametrize("parser", PARSERS)
+def test_random_inputs_match_the_action_table(parser: Parser[Value]) -> None:
+    rng = random.Random(19)
+    for _ in range(500):
+        src = "".join(rng.choice("12+*()?") for _ in range(rng.randrange(12)))
+        for var in ("expr", "exprs"):
+            expected = outcome(parser, var, src, reference=True)
+            assert outcome(parser, var, src, reference=False) == expected, src
+
+
+def test_actions_are_encoded_as_ints() -> None:
+    compiled = PARSER.compiled()
+    for state, row in enumerate(PARSER.table.table):
+        for symbol, action in row.items():
+            if isinstance(symbol, str):
+                assert isinstance(action, Goto)
+                nonterminal = compiled.nonterminal_ids[symbol]
+                assert compiled.gotos[state][nonterminal] == action.next
+                continue
+            code = compiled.actions[state][compiled.token_ids[symbol]]
+            match action:
+                case Shift(next=n):
+                    assert code == n + 1
+                case Reduce():
+                    left, n, *call = compiled.rules[-code - 1]
+                    assert (left, n, tuple(call)) == (
+                        compiled.nonterminal_ids[action.left],
+                        action.n,
+                        compile_maker(action.maker, action.n),
+                    )
+                case _:
+                    assert code == ACTION_ACCEPT
+        assert compiled.actions[state][compiled.unknown] == ACTION_ERROR
+
+
+def test_equal_rows_are_stored_once() -> None:
+    compiled = CompiledTable(PARSER.table)
+    rows = {id(row) for row in compiled.actions}
+    assert len(rows) == len(set(compiled.actions)) < len(compiled.actions)
+
+
+def test_compiled_table_follows_the_table() -> None:
+    parser = PARSER.compress()
+    compiled = parser.compiled()
+    assert parser.compiled() is compiled
+    parser.table = PARSER.table
+    assert parser.compiled() is not compiled
+    assert outcome(parser, "expr", "2 * 3", reference=False) == 6
+
+
+# ---------------------------------------------------------------------------
+# Throughput on a long input
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.slow
+def test_parse_throughput_report() -> None:
+    """The compiled driver beats matching on the action classes."""
+    rng = random.Random(0)
+    src = " ".join(
+        f"({rng.randrange(10)} + {rng.randrange(10)} * {rng.randrange(10)})"
+        for _ in range(20_000)
+    )
+    tokens = tokenize(src)
+
+    t0 = time.perf_counter()
+    expected = reference_parse(PARSER, "exprs", tokens)
+    t1 = time.perf_counter()
+    result = PARSER.parse("exprs", tokens)
+    t2 = time.perf_counter()
+
+    print(
+        f"\n{len(tokens)} tokens: match-based {len(tokens) / (t1 - t0) / 1e6:.2f}M/s,"
+        f" compiled {len(tokens) / (t2 - t1) / 1e6:.2f}M/s"
+    )
+    assert isinstance(result, Value) and result.value == expected.value
+    assert t2 - t1 < t1 - t0
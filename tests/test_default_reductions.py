@@ -0,0 +1,164 @@
+"""Tests for default reductions of consistent states (``Table.defaults``)."""
+
+from __future__ import annotations
+
+import random
+from collections.abc import Callable, Iterator
+from typing import Any
+
+import pytest
+import test_integration
+
+from plare.exception import ParsingError
+from plare.parser import EOS, CompressedTable, Parser, Reduce, Table, action_key
+from plare.token import Token
+
+
+class ID(Token):
+    pass
+
+
+class SEMI(Token):
+    pass
+
+
+class COMMA(Token):
+    pass
+
+
+pulled: list[Token] = []
+"""Tokens handed to the parser so far, in order."""
+
+
+class Stmt:
+    def __init__(self, name: ID, /) -> None:
+        self.name = name
+        self.pulled_when_reduced = len(pulled)
+
+
+class Block:
+    def __init__(self, *stmts: Block | Stmt) -> None:
+        self.stmts = stmts
+
+
+PARSER: Parser[Block | Stmt] = Parser(
+    {
+        "block": [
+            (["block", "stmt"], Block, [0, 1]),
+            (["stmt"], Block, [0]),
+        ],
+        "stmt": [
+            ([ID, SEMI], Stmt, [0]),
+            ([ID, COMMA, "stmt"], None, [2]),
+        ],
+    }
+)
+
+
+def stream(src: str) -> Iterator[Token]:
+    """Yield one token per character, recording each in ``pulled``."""
+    kinds: dict[str, type[Token]] = {";": SEMI, ",": COMMA}
+    pulled.clear()
+    for i, c in enumerate(src):
+        token = kinds.get(c, ID)(c, lineno=1, offset=i)
+        pulled.append(token)
+        yield token
+
+
+def test_consistent_states_get_default_reductions() -> None:
+    """States whose only action is one reduction keep their row."""
+    table = PARSER.table
+    assert isinstance(table, Table)
+    assert table.defaults
+    for state, reduce in table.defaults.items():
+        assert isinstance(reduce, Reduce)
+        assert table.table[state]
+        for action in table.table[state].values():
+            assert action_key(action) == action_key(reduce)
+        assert table[state, COMMA] is reduce
+
+
+def test_reduce_without_reading_a_lookahead() -> None:
+    """A statement is reduced as soon as its ``;`` arrives."""
+    block = PARSER.parse("block", stream("a;b;"))
+    assert isinstance(block, Block)
+    first, second = block.stmts
+    assert isinstance(first, Block) and isinstance(second, Stmt)
+    (stmt,) = first.stmts
+    assert isinstance(stmt, Stmt)
+    assert stmt.pulled_when_reduced == 2
+    assert second.pulled_when_reduced == 4
+
+
+def test_errors_are_still_reported_on_the_offending_token() -> None:
+    with pytest.raises(ParsingError) as exc_info:
+        PARSER.parse("block", stream("a;;"))
+    assert exc_info.value.token is pulled[2]
+    assert set(exc_info.value.expected) == {ID, EOS}
+
+
+@pytest.mark.parametrize("default_reductions", [False, True])
+def test_compressed_tables_keep_default_reductions(default_reductions: bool) -> None:
+    compressed = PARSER.compress(default_reductions=default_reductions)
+    assert isinstance(compressed.table, CompressedTable)
+    assert compressed.table.defaults == PARSER.table.defaults
+    block = compressed.parse("block", stream("a,b;c;"))
+    assert isinstance(block, Block)
+    first, second = block.stmts
+    assert isinstance(first, Block) and isinstance(second, Stmt)
+    (inner,) = first.stmts
+    assert isinstance(inner, Stmt) and inner.pulled_when_reduced == 4
+    assert second.pulled_when_reduced == 6
+
+
+def without_default_reductions(parser: Parser[Any]) -> Parser[Any]:
+    """Return a copy of ``parser`` that looks up every reduction."""
+    copy = Parser[Any].from_bytes(parser.to_bytes())
+    assert copy.table.defaults
+    copy.table.defaults.clear()
+    return copy
+
+
+def errors(parser: Parser[Any], var: str, tokens: list[Token]) -> object:
+    """Return the details of the error ``parser`` raises on ``tokens``."""
+    try:
+        parser.parse(var, tokens)
+    except ParsingError as e:
+        return (str(e), e.token, e.expected)
+    return None
+
+
+def lex_block(src: str) -> list[Token]:
+    return list(stream(src))
+
+
+def lex_expr(src: str) -> list[Token]:
+    return list(test_integration.expr_lexer.lex("start", src))
+
+
+@pytest.mark.parametrize(
+    ("parser", "var", "alphabet", "lex"),
+    [
+        (PARSER, "block", ["a", ";", ","], lex_block),
+        (
+            test_integration.expr_parser,
+            "expr",
+            ["1 ", "x ", "+ ", "* ", "( ", ") ", "- ", "let ", "= ", "in "],
+            lex_expr,
+        ),
+    ],
+)
+def test_errors_expect_what_a_parser_without_them_expects(
+    parser: Parser[Any],
+    var: str,
+    alphabet: list[str],
+    lex: Callable[[str], list[Token]],
+) -> None:
+    """An error found after default reductions reports the tokens expected
+    where a parser without them stops."""
+    baseline = without_default_reductions(parser)
+    rng = random.Random(18)
+    for _ in range(1_000):
+        src = "".join(rng.choice(alphabet) for _ in range(rng.randrange(1, 8)))
+        tokens = lex(src)
+        assert errors(parser, var, tokens) == errors(baseline, var, tokens), src
@@ -2,12 +2,14 @@
 
 from __future__ import annotations
 
+import time
 from typing import Any
 
 import pytest
 
 from plare.parser import (
     EPSILON,
+    Grammar,
     Rule,
     Symbol,
     compute_first_sets,
@@ -180,3 +182,75 @@ def test_dragon_book_expression_grammar_first() -> None:
     assert first["E"] == {LParen, IdTok}
     assert first["T"] == {LParen, IdTok}
     assert first["F"] == {LParen, IdTok}
+
+
+def test_first_sets_are_bitsets_over_terminal_ids() -> None:
+    """``Grammar`` keeps FIRST sets as ints; bit ``i`` is ``terminals[i]``."""
+    rules: dict[str, Rule[Null]] = {
+        "A": make_rule("A", [["B", CTok]]),
+        "B": make_rule("B", [[BTok], []]),
+    }
+    grammar = Grammar(rules)
+    a, b = grammar.symbol_ids["A"], grammar.symbol_ids["B"]
+    assert grammar.terminals[:2] == [BTok, CTok]
+    assert grammar.first[a] == 0b11 and not grammar.nullable[a]
+    assert grammar.first[b] == 0b01 and grammar.nullable[b]
+    assert grammar.tokens(grammar.first[a]) == {BTok, CTok}
+
+
+# ---------------------------------------------------------------------------
+# Speed: bitsets against sets of token classes
+# ---------------------------------------------------------------------------
+
+
+def set_first_sets(rules: dict[str, Rule[Null]]) -> dict[str, set[type[Token]]]:
+    """FIRST sets by fixed-point iteration on sets of token classes."""
+    first: dict[str, set[type[Token]]] = {name: set() for name in rules}
+    changed = True
+    while changed:
+        changed = False
+        for name, rule in rules.items():
+            for right, _, _ in rule.rights:
+                for sym in right:
+                    if isinstance(sym, type):
+                        if sym not in first[name]:
+                            first[name].add(sym)
+                            changed = True
+                        break
+                    added = first[sym] - {EPSILON} - first[name]
+                    if added:
+                        first[name].update(added)
+                        changed = True
+                    if EPSILON not in first[sym]:
+                        break
+                else:
+                    if EPSILON not in first[name]:
+                        first[name].add(EPSILON)
+                        changed = True
+    return first
+
+
+@pytest.mark.slow
+def test_bitset_first_sets_are_faster() -> None:
+    """Bitsets compute the FIRST sets of hundreds of terminals much faster."""
+    # n_i → T_i | n_{i+1} T_i | ε: FIRST(n_i) holds every T_j with j ≥ i, and
+    # each pass of the fixed point only moves the sets one level up.
+    levels = 500
+    tokens = [type(f"T{i}", (Token,), {}) for i in range(levels)]
+    rules: dict[str, Rule[Null]] = {}
+    for i, token in enumerate(tokens):
+        rights: list[list[Symbol]] = [[token], []]
+        if i + 1 < levels:
+            rights.append([f"n{i + 1}", token])
+        rules[f"n{i}"] = make_rule(f"n{i}", rights)
+
+    t0 = time.perf_counter()
+    expected = set_first_sets(rules)
+    t1 = time.perf_counter()
+    first = compute_first_sets(rules)
+    t2 = time.perf_counter()
+
+    print(f"\n{levels} terminals: sets {t1 - t0:.2f}s, bitsets {t2 - t1:.2f}s")
+    assert first == expected
+    assert len(first["n0"]) == levels + 1
+    assert (t2 - t1) * 5 < t1 - t0
@@ -0,0 +1,232 @@
+"""Tests for direct-code parser modules (``plare.codegen.generate_parser``)."""
+
+from __future__ import annotations
+
+import gc
+import importlib
+import random
+import sys
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from types import CodeType, ModuleType
+from typing import Any
+
+import pytest
+import test_compiled_makers
+import test_compiled_table
+import test_default_reductions
+import test_integration
+
+from plare.codegen import generate_parser
+from plare.exception import ParsingError
+from plare.parser import IDMaker, Parser, Reduce, TMaker
+from plare.token import Token
+
+
+def load(
+    parser: Parser[Any], tmp_path: Path, monkeypatch: pytest.MonkeyPatch, name: str
+) -> ModuleType:
+    """Write the generated module of ``parser`` and import it as ``name``."""
+    (tmp_path / f"{name}.py").write_text(generate_parser(parser), encoding="utf-8")
+    monkeypatch.setattr(sys, "path", [str(tmp_path), *sys.path])
+    importlib.invalidate_caches()
+    return importlib.import_module(name)
+
+
+def same_tree(left: object, right: object) -> bool:
+    """Return whether two parse results have the same classes and fields."""
+    if type(left) is not type(right):
+        return False
+    if not hasattr(left, "__dict__"):
+        return left == right
+    fields, others = vars(left), vars(right)
+    return fields.keys() == others.keys() and all(
+        same_tree(fields[key], others[key]) for key in fields
+    )
+
+
+def run(parse: Callable[[str, Iterable[Token]], object], var: str, tokens: list[Token]):
+    """Return the result of ``parse``, or the details of its error."""
+    try:
+        return parse(var, tokens)
+    except ParsingError as e:
+        return (str(e), e.lineno, e.offset, e.token, e.expected)
+
+
+class Both:
+    """Stand-in for a ``Parser`` that checks a generated module against it."""
+
+    def __init__(self, parser: Parser[Any], module: ModuleType) -> None:
+        self.parser = parser
+        self.module = module
+
+    def parse(self, var: str, lexbuf: Iterable[Token]) -> object:
+        tokens = list(lexbuf)
+        expected = run(self.parser.parse, var, tokens)
+        result = run(self.module.parse, var, tokens)
+        if isinstance(expected, tuple):
+            assert result == expected
+            return self.parser.parse(var, tokens)
+        assert same_tree(result, expected)
+        return result
+
+
+INTEGRATION_TESTS = [
+    name for name in vars(test_integration) if name.startswith("test_")
+]
+
+
+@pytest.mark.parametrize("name", INTEGRATION_TESTS)
+def test_integration_grammar(
+    name: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Every integration test passes, with identical results, on generated code."""
+    parser = test_integration.expr_parser
+    module = load(parser, tmp_path, monkeypatch, f"expr_parser_{name}")
+    monkeypatch.setattr(test_integration, "expr_parser", Both(parser, module))
+    getattr(test_integration, name)()
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_random_inputs_match_the_table(
+    compressed: bool, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    parser = test_compiled_table.PARSER
+    if compressed:
+        parser = parser.compress()
+    module = load(parser, tmp_path, monkeypatch, f"calc_parser_{compressed}")
+    rng = random.Random(22)
+    for _ in range(500):
+        src = "".join(rng.choice("12+*()?") for _ in range(rng.randrange(12)))
+        tokens = test_compiled_table.tokenize(src)
+        for var in ("expr", "exprs"):
+            expected = run(parser.parse, var, tokens)
+            result = run(module.parse, var, tokens)
+            assert same_tree(result, expected), src
+
+
+def test_default_reductions_read_no_lookahead(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    module = load(test_default_reductions.PARSER, tmp_path, monkeypatch, "block_parser")
+    block = module.parse("block", test_default_reductions.stream("a;b;"))
+    first, second = block.stmts
+    assert first.stmts[0].pulled_when_reduced == 2
+    assert second.pulled_when_reduced == 4
+
+
+def test_state_functions_are_defined_once(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """``parse`` only runs the module's state functions; it defines none."""
+    module = load(test_default_reductions.PARSER, tmp_path, monkeypatch, "once_parser")
+    assert not any(isinstance(c, CodeType) for c in module.parse.__code__.co_consts)
+    states = module._STATES
+    assert states[0] is module._state0
+    module.parse("block", test_default_reductions.stream("a;b,c;"))
+    assert module._STATES is states
+
+
+class First:
+    def __call__(self, *xs: object) -> object:
+        return xs[0]
+
+
+def test_unknown_makers_are_rejected() -> None:
+    parser = test_compiled_table.PARSER.compress()
+    compiled = parser.compiled()
+    rule = compiled.reductions[0]
+    compiled.reductions[0] = Reduce[Any](rule.left, rule.n, First(), 0, 0)
+    with pytest.raises(ValueError, match="Cannot generate code"):
+        generate_parser(parser)
+
+
+def test_negative_arguments_count_from_the_end(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    A, B, Pair = (
+        test_compiled_makers.A,
+        test_compiled_makers.B,
+        test_compiled_makers.Pair,
+    )
+    parser: Parser[Any] = Parser({"pair": [([A, B, B], Pair, [0, 1])]})
+    # Makers built outside a grammar keep their indices as given.
+    compiled = parser.compiled()
+    rule = compiled.reductions[0]
+    compiled.reductions[0] = Reduce[Any](
+        rule.left, rule.n, TMaker(Pair, [-1, -3]), 0, 0
+    )
+    module = load(parser, tmp_path, monkeypatch, "pair_parser")
+    a, b, c = (
+        A("a", lineno=1, offset=0),
+        B("b", lineno=1, offset=1),
+        B("c", lineno=1, offset=2),
+    )
+    pair = module.parse("pair", [a, b, c])
+    assert (pair.first, pair.second) == (c, a)
+
+
+@pytest.mark.parametrize("maker", [TMaker[Any](object, [2]), IDMaker[Any](-3)])
+def test_out_of_range_arguments_are_rejected(maker: TMaker[Any] | IDMaker[Any]) -> None:
+    A, B = test_compiled_makers.A, test_compiled_makers.B
+    parser: Parser[Any] = Parser({"pair": [([A, B], None, [0])]})
+    compiled = parser.compiled()
+    rule = compiled.reductions[0]
+    compiled.reductions[0] = Reduce[Any](rule.left, rule.n, maker, 0, 0)
+    with pytest.raises(ValueError, match="out of range"):
+        generate_parser(parser)
+
+
+def test_classes_must_be_importable() -> None:
+    class LOCAL(Token):
+        pass
+
+    parser: Parser[Any] = Parser({"expr": [([LOCAL], None, [0])]})
+    with pytest.raises(ValueError, match="cannot be imported by name"):
+        generate_parser(parser)
+
+
+# ---------------------------------------------------------------------------
+# Throughput against the table-driven parser
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.slow
+def test_parse_throughput_report(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The generated parser beats ``Parser.parse`` on the integration grammar."""
+    parser = test_integration.expr_parser
+    module = load(parser, tmp_path, monkeypatch, "expr_parser_benchmark")
+    rng = random.Random(0)
+    src = " + ".join(
+        f"let x = {rng.randrange(10)} in (x * {rng.randrange(10)} - -x ** 2 < 3)"
+        for _ in range(5_000)
+    )
+    tokens = list(test_integration.expr_lexer.lex("start", src))
+
+    parsers: dict[str, Callable[[str, Iterable[Token]], object]] = {
+        "table": parser.parse,
+        "generated": module.parse,
+    }
+    timings = dict.fromkeys(parsers, float("inf"))
+    for _ in range(5):
+        for name, parse in parsers.items():
+            gc.collect()
+            gc.disable()
+            try:
+                t0 = time.perf_counter()
+                parse("expr", tokens)
+                timings[name] = min(timings[name], time.perf_counter() - t0)
+            finally:
+                gc.enable()
+
+    print(
+        f"\n{len(tokens)} tokens: "
+        + ", ".join(
+            f"{name} {len(tokens) / seconds / 1e6:.2f}M tokens/s"
+            for name, seconds in timings.items()
+        )
+    )
+    assert timings["generated"] < timings["table"]
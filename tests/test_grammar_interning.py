@@ -0,0 +1,287 @@
+"""Tests for the interned grammar representation used by table construction."""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+
+import pytest
+
+from plare.parser import (
+    Grammar,
+    IDMaker,
+    Item,
+    Rule,
+    StartVariable,
+    State,
+    closure,
+    goto,
+    intern_state,
+)
+from plare.token import Token
+
+
+class NUM(Token):
+    pass
+
+
+class PLUS(Token):
+    pass
+
+
+class Node:
+    def __init__(self, *children: object) -> None:
+        self.children = children
+
+
+def make_rules(
+    grammar: dict[str, list[list[type[Token] | str]]],
+) -> dict[str, Rule[Node]]:
+    rules: dict[str, Rule[Node]] = {}
+    index = 0
+    for left, rights in grammar.items():
+        rules[left] = Rule(left, [(right, Node, [], None) for right in rights], index)
+        index += len(rights)
+        start = StartVariable(left)
+        rules[start] = Rule(start, [([left], None, [0], None)], 0)
+    return rules
+
+
+RULES = make_rules({"expr": [["expr", PLUS, "term"], ["term"]], "term": [[NUM]]})
+GRAMMAR = Grammar(RULES)
+
+
+def test_symbols_are_numbered_in_sort_order() -> None:
+    """Terminals come first, then non-terminals, each ordered by name."""
+    assert GRAMMAR.symbols[:2] == [NUM, PLUS]
+    assert [str(symbol) for symbol in GRAMMAR.symbols[2:]] == [
+        "expr",
+        "expr",
+        "term",
+        "term",
+    ]
+    assert GRAMMAR.terminal == [True, True, False, False, False, False]
+    assert GRAMMAR.start_variable == [False, False, False, True, False, True]
+    assert GRAMMAR.symbol_ids[StartVariable("expr")] != GRAMMAR.symbol_ids["expr"]
+
+
+def test_items_of_a_production_are_consecutive() -> None:
+    """Advancing the dot of an item id adds one."""
+    production = 0
+    base = GRAMMAR.item_base[production]
+    assert [str(GRAMMAR.item(base + dot)) for dot in range(4)] == [
+        "expr ->  . expr PLUS term",
+        "expr -> expr . PLUS term",
+        "expr -> expr PLUS . term",
+        "expr -> expr PLUS term . ",
+    ]
+    assert GRAMMAR.item_next[base + 1] == GRAMMAR.symbol_ids[PLUS]
+    assert GRAMMAR.item_next[base + 3] == -1
+
+
+def test_closure_and_goto_on_item_ids() -> None:
+    """The closure of the start item adds the initial items it reaches."""
+    (start,) = GRAMMAR.initial_items[GRAMMAR.symbol_ids[StartVariable("expr")]]
+    state = closure([start], GRAMMAR)
+    assert {str(GRAMMAR.item(item)) for item in state} == {
+        "expr =>  . expr",
+        "expr ->  . expr PLUS term",
+        "expr ->  . term",
+        "term ->  . NUM",
+    }
+    kernels = goto(state, GRAMMAR)
+    assert sorted(kernels) == [
+        GRAMMAR.symbol_ids[NUM],
+        GRAMMAR.symbol_ids["expr"],
+        GRAMMAR.symbol_ids["term"],
+    ]
+    assert {
+        str(GRAMMAR.item(item)) for item in kernels[GRAMMAR.symbol_ids["expr"]]
+    } == {
+        "expr => expr . ",
+        "expr -> expr . PLUS term",
+    }
+
+
+def test_nonterminal_closures_follow_starts_with() -> None:
+    """``expr`` starts with ``term``, so its closure has ``term``'s items."""
+    closures = GRAMMAR.nonterminal_closures
+    expr, term = GRAMMAR.symbol_ids["expr"], GRAMMAR.symbol_ids["term"]
+    assert closures[expr] == {
+        *GRAMMAR.initial_items[expr],
+        *GRAMMAR.initial_items[term],
+    }
+    assert closures[term] == set(GRAMMAR.initial_items[term])
+    assert closures[GRAMMAR.symbol_ids[NUM]] == frozenset()
+
+
+def test_states_are_interned_by_kernel() -> None:
+    """Equal kernels share a state; the closure is not part of the key."""
+    state_index: dict[frozenset[int], int] = {}
+    state_list: list[frozenset[int]] = []
+    kernel = frozenset(goto(closure([0], GRAMMAR), GRAMMAR)[GRAMMAR.symbol_ids["expr"]])
+    assert intern_state(kernel, state_index, state_list) == (0, True)
+    assert intern_state(frozenset(kernel), state_index, state_list) == (0, False)
+    assert list(state_index) == [kernel]
+
+
+def test_item_and_state_hashes_are_cached() -> None:
+    """Hashes are computed once, on construction."""
+    item: Item[Node] = Item("expr", ["term"], IDMaker(0), 0)
+    assert hash(item) == item.hash == hash(("expr", ("term",), 0))
+    state = State(0, {item})
+    assert hash(state) == state.hash == hash(frozenset({item}))
+
+
+# ---------------------------------------------------------------------------
+# Construction speed: interned ids, kernel keys and memoized closures
+# ---------------------------------------------------------------------------
+
+
+def make_operator_rules(levels: int, operators: int) -> dict[str, Rule[Node]]:
+    """Return an expression grammar with ``levels`` binary-operator layers."""
+    grammar: dict[str, list[list[type[Token] | str]]] = {}
+    for level in range(levels):
+        current, below = f"e{level}", f"e{level + 1}"
+        rights: list[list[type[Token] | str]] = [
+            [current, type(f"OP{level}_{op}", (Token,), {}), below]
+            for op in range(operators)
+        ]
+        rights.append([below])
+        grammar[current] = rights
+    grammar[f"e{levels}"] = [[NUM], [PLUS, "e0", PLUS]]
+    return make_rules(grammar)
+
+
+def count_item_object_states(rules: dict[str, Rule[Node]]) -> int:
+    """Build the LR(0) collection on ``Item`` objects, as before interning."""
+    all_items = {left: rule.items for left, rule in rules.items()}
+
+    def close(items: set[Item[Node]]) -> frozenset[Item[Node]]:
+        result = set(items)
+        worklist = list(items)
+        while worklist:
+            next = worklist.pop().next
+            if isinstance(next, str):
+                new = all_items[next] - result
+                result |= new
+                worklist.extend(new)
+        return frozenset(result)
+
+    seen: set[frozenset[Item[Node]]] = set()
+    worklist: deque[frozenset[Item[Node]]] = deque()
+    for left, rule in rules.items():
+        if isinstance(left, StartVariable):
+            worklist.append(close(rule.items))
+            seen.add(worklist[-1])
+    while worklist:
+        items = worklist.popleft()
+        for symbol in {next for item in items if (next := item.next) is not None}:
+            moved = {m for item in items if (m := item.move(symbol)) is not None}
+            target = close(moved)
+            if target not in seen:
+                seen.add(target)
+                worklist.append(target)
+    return len(seen)
+
+
+def build_kernel_states(rules: dict[str, Rule[Node]]) -> list[frozenset[int]]:
+    """Build the LR(0) collection on interned item ids, keyed by kernel."""
+    grammar = Grammar(rules)
+    state_index: dict[frozenset[int], int] = {}
+    state_list: list[frozenset[int]] = []
+    worklist: deque[int] = deque()
+    for symbol, start in enumerate(grammar.start_variable):
+        if start:
+            sid, _ = intern_state(
+                frozenset(grammar.initial_items[symbol]), state_index, state_list
+            )
+            worklist.append(sid)
+    while worklist:
+        kernels = goto(closure(state_list[worklist.popleft()], grammar), grammar)
+        for symbol in sorted(kernels):
+            sid, is_new = intern_state(
+                frozenset(kernels[symbol]), state_index, state_list
+            )
+            if is_new:
+                worklist.append(sid)
+    return state_list
+
+
+def build_closed_states(rules: dict[str, Rule[Node]]) -> list[frozenset[int]]:
+    """Build the LR(0) collection keyed by closed item sets.
+
+    Every transition's kernel is closed with a worklist over the productions,
+    as before per-non-terminal closures.
+    """
+    grammar = Grammar(rules)
+
+    def close(items: list[int]) -> frozenset[int]:
+        result = set(items)
+        worklist = list(items)
+        while worklist:
+            symbol = grammar.item_next[worklist.pop()]
+            if symbol >= 0:
+                new = set(grammar.initial_items[symbol]) - result
+                result |= new
+                worklist.extend(new)
+        return frozenset(result)
+
+    state_index: dict[frozenset[int], int] = {}
+    state_list: list[frozenset[int]] = []
+    worklist: deque[int] = deque()
+    for symbol, start in enumerate(grammar.start_variable):
+        if start:
+            sid, _ = intern_state(
+                close(grammar.initial_items[symbol]), state_index, state_list
+            )
+            worklist.append(sid)
+    while worklist:
+        kernels = goto(state_list[worklist.popleft()], grammar)
+        for symbol in sorted(kernels):
+            sid, is_new = intern_state(close(kernels[symbol]), state_index, state_list)
+            if is_new:
+                worklist.append(sid)
+    return state_list
+
+
+@pytest.mark.slow
+def test_interned_construction_is_faster() -> None:
+    """Interned ids build the same LR(0) collection faster than Item objects."""
+    rules = make_operator_rules(levels=40, operators=8)
+
+    t0 = time.perf_counter()
+    objects = count_item_object_states(rules)
+    t1 = time.perf_counter()
+    interned = len(build_kernel_states(rules))
+    t2 = time.perf_counter()
+
+    print(
+        f"\n{objects} states: Item objects {t1 - t0:.2f}s,"
+        f" interned ids {t2 - t1:.2f}s"
+    )
+    assert interned == objects
+    assert t2 - t1 < t1 - t0
+
+
+@pytest.mark.slow
+def test_kernel_keys_are_smaller_and_faster() -> None:
+    """Kernel keys and memoized closures beat closed-set keys on a deep grammar."""
+    rules = make_operator_rules(levels=120, operators=2)
+
+    t0 = time.perf_counter()
+    closed = build_closed_states(rules)
+    t1 = time.perf_counter()
+    kernels = build_kernel_states(rules)
+    t2 = time.perf_counter()
+
+    closed_items = sum(map(len, closed))
+    kernel_items = sum(map(len, kernels))
+    print(
+        f"\n{len(kernels)} states: closed-set keys {t1 - t0:.2f}s"
+        f" holding {closed_items} items, kernel keys {t2 - t1:.2f}s"
+        f" holding {kernel_items} items"
+    )
+    assert len(kernels) == len(closed)
+    assert kernel_items * 10 < closed_items
+    assert t2 - t1 < t1 - t0
@@ -0,0 +1,176 @@
+"""Tests for lazy line/column resolution through ``LineIndex``."""
+
+from __future__ import annotations
+
+import gc
+import time
+
+import pytest
+
+from plare.exception import LexingError, ParsingError
+from plare.lexer import Handler, Lexer
+from plare.parser import Parser
+from plare.token import LineIndex, Token
+
+
+class WORD(Token):
+    def __init__(self, value: str, *, lineno: int, offset: int) -> None:
+        super().__init__(value, lineno=lineno, offset=offset)
+        self.value = value
+
+
+class NUM(Token):
+    pass
+
+
+class PLUS(Token):
+    pass
+
+
+PATTERNS: dict[str, list[tuple[str, Handler[None]]]] = {
+    "start": [
+        (r"[ \t\n]+", "start"),
+        (r"\d+", NUM),
+        (r"\+", PLUS),
+        (r"[a-z]+", WORD),
+    ]
+}
+
+eager_lexer: Lexer[None] = Lexer(PATTERNS)
+lazy_lexer: Lexer[None] = Lexer(PATTERNS, lazy_positions=True)
+
+SRC = "ab cd\n\n  ef 12\n+ 3\ngh"
+
+
+# ---------------------------------------------------------------------------
+# LineIndex
+# ---------------------------------------------------------------------------
+
+
+def test_line_index_positions() -> None:
+    """Offsets map to 1-based lines and 0-based columns, including line starts."""
+    index = LineIndex("ab\ncd\n\ne")
+    assert index.position(0) == (1, 0)
+    assert index.position(2) == (1, 2)
+    assert index.position(3) == (2, 0)
+    assert index.position(6) == (3, 0)
+    assert index.position(7) == (4, 0)
+
+
+def test_line_index_is_built_on_first_use() -> None:
+    """Creating an index does not scan the source until a position is resolved."""
+    index = LineIndex("a\nb")
+    assert index._starts is None  # pyright: ignore[reportPrivateUsage]
+    index.position(2)
+    assert index.starts == [0, 2]
+
+
+# ---------------------------------------------------------------------------
+# Tokens
+# ---------------------------------------------------------------------------
+
+
+def test_lazy_positions_match_eager_positions() -> None:
+    """Every token resolves to the same (lineno, offset) as in eager mode."""
+    eager = [(type(t), t.lineno, t.offset) for t in eager_lexer.lex("start", SRC)]
+    lazy = [(type(t), t.lineno, t.offset) for t in lazy_lexer.lex("start", SRC)]
+    assert eager == lazy
+    assert lazy[-1] == (WORD, 5, 0)
+
+
+def test_lazy_token_holds_shared_index_until_read() -> None:
+    """Unread tokens share one index; reading a position resolves and drops it."""
+    tokens = list(lazy_lexer.lex("start", SRC))
+    assert tokens[0].line_index is not None
+    assert all(t.line_index is tokens[0].line_index for t in tokens)
+    assert (tokens[3].lineno, tokens[3].offset) == (3, 5)
+    assert tokens[3].line_index is None
+
+
+def test_lazy_token_equality_uses_resolved_position() -> None:
+    """Token equality and hashing see the resolved position."""
+    tokens = list(lazy_lexer.lex("start", "ab\ncd"))
+    expected = WORD("cd", lineno=2, offset=0)
+    assert tokens[1] == expected
+    assert hash(tokens[1]) == hash(expected)
+
+
+def test_callable_handler_receives_resolved_position() -> None:
+    """Callable handlers are still called with integer line and column."""
+    seen: list[tuple[int, int]] = []
+
+    def handler(matched: str, state: None, lineno: int, offset: int) -> Token:
+        seen.append((lineno, offset))
+        return WORD(matched, lineno=lineno, offset=offset)
+
+    lexer: Lexer[None] = Lexer(
+        {"start": [(r"\n", "start"), (r"[a-z]+", handler)]}, lazy_positions=True
+    )
+    list(lexer.lex("start", "ab\ncd"))
+    assert seen == [(1, 0), (2, 0)]
+
+
+# ---------------------------------------------------------------------------
+# Errors
+# ---------------------------------------------------------------------------
+
+
+def test_lazy_lexing_error_message_is_identical() -> None:
+    """LexingError from a lazy lexer reports the same position and message."""
+    src = "ab\ncd @"
+    with pytest.raises(LexingError) as eager_info:
+        list(eager_lexer.lex("start", src))
+    with pytest.raises(LexingError) as lazy_info:
+        list(lazy_lexer.lex("start", src))
+    assert (lazy_info.value.lineno, lazy_info.value.offset) == (2, 3)
+    assert str(lazy_info.value) == str(eager_info.value)
+
+
+def test_lazy_parsing_error_message_is_identical() -> None:
+    """ParsingError built from lazily positioned tokens is unchanged."""
+    parser: Parser[object] = Parser({"sum": [([NUM, PLUS, NUM], None, [0])]})
+    src = "1 +\n  + 2"
+    with pytest.raises(ParsingError) as eager_info:
+        parser.parse("sum", eager_lexer.lex("start", src))
+    with pytest.raises(ParsingError) as lazy_info:
+        parser.parse("sum", lazy_lexer.lex("start", src))
+    assert (lazy_info.value.lineno, lazy_info.value.offset) == (2, 2)
+    assert str(lazy_info.value) == str(eager_info.value)
+
+
+# ---------------------------------------------------------------------------
+# Throughput on a long input
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.slow
+def test_lexing_throughput_report() -> None:
+    """Lazy positions lex no slower than tracking them per token."""
+    src = "ab 12 + cd\n  3 + ef\n" * 20_000
+    tokens = 140_000
+    lexers = {"eager": eager_lexer, "lazy": lazy_lexer}
+    timings = dict.fromkeys(lexers, float("inf"))
+    # Runs alternate, each after a full collection and with the collector
+    # off, and the best of each side is kept.
+    for _ in range(7):
+        for name, lexer in lexers.items():
+            gc.collect()
+            gc.disable()
+            try:
+                t0 = time.perf_counter()
+                count = sum(1 for _ in lexer.lex("start", src))
+                timings[name] = min(timings[name], time.perf_counter() - t0)
+            finally:
+                gc.enable()
+            assert count == tokens
+
+    print(
+        f"\n{tokens} tokens: "
+        + ", ".join(
+            f"{name} {tokens / seconds / 1e6:.2f}M tokens/s"
+            for name, seconds in timings.items()
+        )
+    )
+    # Lazy mode saves a newline count per token, a few percent of the time
+    # per token, which is within the run-to-run noise of a busy machine.
+    assert timings["lazy"] < timings["eager"] * 1.1
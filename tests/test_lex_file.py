@@ -0,0 +1,155 @@
+"""Tests for memory-mapped file lexing (``Lexer.lex_file``)."""
+
+from __future__ import annotations
+
+import tracemalloc
+from pathlib import Path
+
+import pytest
+from helpers import summarize
+
+from plare.exception import LexingError
+from plare.lexer import CHUNK_SIZE, Handler, Lexer
+from plare.token import Token
+
+
+class WORD(Token):
+    def __init__(self, value: str, *, lineno: int, offset: int) -> None:
+        super().__init__(value, lineno=lineno, offset=offset)
+        self.value = value
+
+
+class NUM(Token):
+    def __init__(self, value: str, *, lineno: int, offset: int) -> None:
+        super().__init__(value, lineno=lineno, offset=offset)
+        self.value = int(value)
+
+
+class ERROR(Token):
+    pass
+
+
+PATTERNS: dict[str, list[tuple[str, Handler[None]]]] = {
+    "start": [
+        (r"[ \t\n]+", "start"),
+        (r"#", "comment"),
+        (r"ERROR", ERROR),
+        (r"[0-9]+", NUM),
+        (r"[^ \t\n#0-9]+", WORD),
+    ],
+    "comment": [
+        (r"\n", "start"),
+        (r"[^\n]+", "comment"),
+    ],
+}
+
+lexer: Lexer[None] = Lexer(PATTERNS)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "ab 12\n  cd # skipped ERROR\nERROR 3",
+        "héllo wörld 42\n  ünï 7 # ç\nend",
+        "",
+        "\n\n",
+    ],
+)
+def test_lex_file_matches_lex(tmp_path: Path, text: str) -> None:
+    """Tokens, values and character positions equal those of ``lex``."""
+    path = tmp_path / "input.txt"
+    path.write_text(text, encoding="utf-8")
+    expected = summarize(list(lexer.lex("start", text)))
+    assert summarize(list(lexer.lex_file("start", path))) == expected
+
+
+def test_lex_file_callable_handler(tmp_path: Path) -> None:
+    """Callable handlers receive decoded text and integer positions."""
+    seen: list[tuple[str, int, int]] = []
+
+    def handler(matched: str, state: None, lineno: int, offset: int) -> str:
+        seen.append((matched, lineno, offset))
+        return "start"
+
+    path = tmp_path / "input.txt"
+    path.write_text("é ab\ncd", encoding="utf-8")
+    callable_lexer: Lexer[None] = Lexer(
+        {"start": [(r"[ \n]", "start"), (r"[^ \n]+", handler)]}
+    )
+    assert list(callable_lexer.lex_file("start", path)) == []
+    assert seen == [("é", 1, 0), ("ab", 1, 2), ("cd", 2, 0)]
+
+
+def test_lex_file_error_position(tmp_path: Path) -> None:
+    """Unmatched input raises the same LexingError as ``lex``."""
+    text = "ünï\n ab ~"
+    path = tmp_path / "input.txt"
+    path.write_text(text, encoding="utf-8")
+    strict: Lexer[None] = Lexer({"start": [(r"[ \n]", "start"), (r"[^ \n~]+", WORD)]})
+    with pytest.raises(LexingError) as file_info:
+        list(strict.lex_file("start", path))
+    with pytest.raises(LexingError) as str_info:
+        list(strict.lex("start", text))
+    assert (file_info.value.lineno, file_info.value.offset) == (2, 4)
+    assert str(file_info.value) == str(str_info.value)
+
+
+@pytest.mark.slow
+def test_lex_file_peak_memory_is_independent_of_file_size(tmp_path: Path) -> None:
+    """Lexing a large, mostly skipped file allocates far less than its size."""
+    path = tmp_path / "large.log"
+    line = "# " + "x" * 200 + "\n"
+    with path.open("w", encoding="utf-8") as file:
+        for i in range(100_000):
+            file.write(line if i % 1000 else f"ERROR {i}\n")
+    size = path.stat().st_size
+
+    tracemalloc.start()
+    try:
+        errors = sum(isinstance(t, ERROR) for t in lexer.lex_file("start", path))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    print(f"\nlex_file: {size / 2**20:.1f} MiB file, peak {peak / 2**10:.0f} KiB")
+    assert errors == 100
+    assert peak < size // 20
+
+
+@pytest.mark.parametrize(
+    "rules",
+    [
+        [(r"\w+", WORD), (r" ", "start")],
+        [(r".", WORD)],
+        [(r"café", WORD), (r"[ x]", "start")],
+        [(r"[à-ÿ]+", WORD), (r"[a-z ]", "start")],
+    ],
+)
+def test_lex_file_non_ascii_patterns(
+    tmp_path: Path, rules: list[tuple[str, Handler[None]]]
+) -> None:
+    """Patterns keep their ``str`` meaning on non-ASCII text."""
+    text = "café x"
+    path = tmp_path / "input.txt"
+    path.write_text(text, encoding="utf-8")
+    unicode_lexer: Lexer[None] = Lexer({"start": rules})
+    expected = summarize(list(unicode_lexer.lex("start", text)))
+    assert expected
+    assert summarize(list(unicode_lexer.lex_file("start", path))) == expected
+
+
+def test_lex_file_character_split_between_windows(tmp_path: Path) -> None:
+    """A character straddling two decoded windows is lexed whole."""
+    text = "a" * (CHUNK_SIZE - 2) + " é ü"
+    path = tmp_path / "input.txt"
+    path.write_text(text, encoding="utf-8")
+    assert summarize(list(lexer.lex_file("start", path))) == summarize(
+        list(lexer.lex("start", text))
+    )
+
+
+def test_lex_file_invalid_utf8(tmp_path: Path) -> None:
+    path = tmp_path / "input.txt"
+    path.write_bytes(b"ab \xff cd")
+    with pytest.raises(UnicodeDecodeError):
+        list(lexer.lex_file("start", path))
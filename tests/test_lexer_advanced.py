@@ -2,11 +2,13 @@
 
 Covers: multiline position tracking, column accuracy after whitespace,
 block-comment state machine, string-literal state machine, user_state threading,
-error position inside a non-start state, and various edge cases.
+error position inside a non-start state, various edge cases, and linear-time
+scanning of large single-line inputs.
 """
 
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
 from types import NoneType
 
@@ -316,3 +318,72 @@ def test_multiple_tokens_same_line() -> None:
     assert len(tokens) == 3
     assert tokens[0].offset < tokens[1].offset < tokens[2].offset
     assert tokens[0].lineno == tokens[1].lineno == tokens[2].lineno == 1
+
+
+# ---------------------------------------------------------------------------
+# Section 6: Offset-based scanning
+# ---------------------------------------------------------------------------
+
+
+def test_caret_anchors_to_start_of_input() -> None:
+    """``^`` matches only at the start of the input, not at every token start."""
+
+    class HEAD(Token):
+        pass
+
+    lexer: Lexer[None] = Lexer(
+        {"start": [(r"^[a-z]+", HEAD), (r"[a-z]+", WORD), (r" +", "start")]}
+    )
+    tokens = list(lexer.lex("start", "ab cd"))
+    assert [type(t) for t in tokens] == [HEAD, WORD]
+
+
+def test_lookbehind_sees_preceding_text() -> None:
+    """A lookbehind assertion can inspect characters consumed by earlier tokens."""
+
+    class SUFFIX(Token):
+        pass
+
+    lexer: Lexer[None] = Lexer(
+        {
+            "start": [
+                (r"(?<=\.)[a-z]+", SUFFIX),
+                (r"[a-z]+", WORD),
+                (r"\.", "start"),
+            ]
+        }
+    )
+    tokens = list(lexer.lex("start", "ab.cd"))
+    assert [type(t) for t in tokens] == [WORD, SUFFIX]
+
+
+@pytest.mark.slow
+def test_lex_time_is_linear_in_input_size() -> None:
+    """Per-character lexing time stays flat from 1 KB to 100 MB of one-line input.
+
+    Words are 1000 characters long so the 100 MB input is only ~100k tokens;
+    re-slicing the remaining input after every token would make this case
+    copy terabytes and never finish.
+    """
+    lexer: Lexer[None] = Lexer({"start": [(r"[a-z]+", WORD), (r" ", "start")]})
+    word = "a" * 999 + " "
+
+    def per_char(size: int, repeat: int) -> float:
+        src = word * (size // len(word))
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in lexer.lex("start", src):
+                pass
+            best = min(best, time.perf_counter() - start)
+        return best / len(src)
+
+    small = per_char(10**3, 1000)
+    medium = per_char(10**6, 5)
+    large = per_char(10**8, 1)
+    print(
+        f"\nLexing time per char: 1 KB {small * 1e9:.2f} ns, "
+        f"1 MB {medium * 1e9:.2f} ns, 100 MB {large * 1e9:.2f} ns"
+    )
+    assert large < 4 * medium
+    assert large < 4 * small
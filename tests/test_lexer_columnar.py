@@ -0,0 +1,171 @@
+"""Tests for columnar lexing into a ``TokenArray`` (``Lexer.lex_columnar``)."""
+
+from __future__ import annotations
+
+from array import array
+
+import pytest
+from helpers import summarize
+
+from plare.exception import LexingError
+from plare.lexer import Lexer
+from plare.parser import Parser
+from plare.token import LineIndex, Token, TokenArray
+
+
+class NUM(Token):
+    def __init__(self, value: str, *, lineno: int, offset: int) -> None:
+        super().__init__(value, lineno=lineno, offset=offset)
+        self.value = int(value)
+
+
+class ID(Token):
+    def __init__(self, value: str, *, lineno: int, offset: int) -> None:
+        super().__init__(value, lineno=lineno, offset=offset)
+        self.name = value
+
+
+class PLUS(Token):
+    precedence = 1
+    associative = "left"
+
+
+class STAR(Token):
+    precedence = 2
+    associative = "left"
+
+
+class TWICE(Token):
+    pass
+
+
+def lex_word(matched: str, state: None, lineno: int, offset: int) -> Token:
+    if matched == "twice":
+        return TWICE(matched, lineno=lineno, offset=offset)
+    return ID(matched, lineno=lineno, offset=offset)
+
+
+expr_lexer: Lexer[None] = Lexer(
+    {
+        "start": [
+            (r"[ \t\n]+", "start"),
+            (r"\d+", NUM),
+            (r"\+", PLUS),
+            (r"\*", STAR),
+            (r"[a-z]+", lex_word),
+        ]
+    }
+)
+
+ENV = {"x": 5}
+
+
+class Value:
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+
+class Num(Value):
+    def __init__(self, token: NUM, /) -> None:
+        super().__init__(token.value)
+
+
+class Var(Value):
+    def __init__(self, token: ID, /) -> None:
+        super().__init__(ENV[token.name])
+
+
+class Double(Value):
+    def __init__(self, operand: Value, /) -> None:
+        super().__init__(2 * operand.value)
+
+
+class Add(Value):
+    def __init__(self, left: Value, right: Value, /) -> None:
+        super().__init__(left.value + right.value)
+
+
+class Mul(Value):
+    def __init__(self, left: Value, right: Value, /) -> None:
+        super().__init__(left.value * right.value)
+
+
+expr_parser: Parser[Value] = Parser(
+    {
+        "expr": [
+            ([NUM], Num, [0]),
+            ([ID], Var, [0]),
+            ([TWICE, "expr"], Double, [1], STAR),
+            (["expr", PLUS, "expr"], Add, [0, 2]),
+            (["expr", STAR, "expr"], Mul, [0, 2]),
+        ]
+    }
+)
+
+SRC = "1 + 2 * x\n  + twice 30 + x * x"
+
+
+def test_columnar_tokens_match_lex() -> None:
+    """Materialised tokens equal the tokens of ``lex``, values and positions."""
+    tokens = expr_lexer.lex_columnar("start", SRC)
+    assert len(tokens) == 12
+    assert summarize(list(tokens)) == summarize(list(expr_lexer.lex("start", SRC)))
+
+
+def test_columnar_storage() -> None:
+    """Classes and offsets live in flat arrays; only callables' tokens are kept."""
+    tokens = expr_lexer.lex_columnar("start", "12 + ab")
+    assert isinstance(tokens.ids, array) and tokens.ids.typecode == "H"
+    assert tokens.starts.typecode == "q" and tokens.ends.typecode == "q"
+    assert [tokens.token_class(i) for i in range(3)] == [NUM, PLUS, ID]
+    assert list(tokens.starts) == [0, 3, 5]
+    assert list(tokens.ends) == [2, 4, 7]
+    assert list(tokens.built) == [2]
+
+
+def test_columnar_indexing_builds_fresh_tokens() -> None:
+    """Indexing builds a new token each time, with a lazily resolved position."""
+    tokens = expr_lexer.lex_columnar("start", "1 +\n 22")
+    last = tokens[-1]
+    assert isinstance(last, NUM) and last.value == 22
+    assert last.line_index is tokens.lines
+    assert (last.lineno, last.offset) == (2, 1)
+    assert tokens[2] is not last and tokens[2] == last
+
+
+@pytest.mark.parametrize("index", [3, 4, -4, -10])
+def test_columnar_indexing_out_of_range(index: int) -> None:
+    tokens = expr_lexer.lex_columnar("start", "1 + x")
+    with pytest.raises(IndexError, match="out of range"):
+        tokens[index]
+
+
+def test_columnar_slicing_builds_a_list() -> None:
+    tokens = expr_lexer.lex_columnar("start", SRC)
+    everything = list(tokens)
+    for key in (slice(None), slice(2, 5), slice(-3, None), slice(None, None, -2)):
+        assert summarize(tokens[key]) == summarize(everything[key])
+
+
+def test_parser_accepts_token_array() -> None:
+    """``Parser.parse`` consumes a ``TokenArray`` directly."""
+    result = expr_parser.parse("expr", expr_lexer.lex_columnar("start", SRC))
+    assert isinstance(result, Value)
+    assert result.value == 1 + 2 * 5 + 2 * 30 + 5 * 5
+
+
+def test_columnar_error_position() -> None:
+    """Unmatched input raises LexingError at the same position as ``lex``."""
+    with pytest.raises(LexingError) as exc_info:
+        expr_lexer.lex_columnar("start", "1 +\n  2 $")
+    assert (exc_info.value.lineno, exc_info.value.offset) == (2, 4)
+
+
+def test_token_array_class_ids_are_shared() -> None:
+    """Each token class is assigned one id, in order of first appearance."""
+    tokens = TokenArray("1 1 +", LineIndex("1 1 +"))
+    tokens.append(NUM, 0, 1)
+    tokens.append(NUM, 2, 3)
+    tokens.append(PLUS, 4, 5)
+    assert list(tokens.ids) == [0, 0, 1]
+    assert tokens.classes == [NUM, PLUS]
@@ -0,0 +1,169 @@
+"""Tests for combined (single-alternation) scanning in ``Lexer``.
+
+Every test lexes the same input with ``combine=False`` and ``combine=True`` and
+checks that both modes agree, so the combined mode is held to the exact
+first-match-wins semantics of sequential scanning.
+"""
+
+from __future__ import annotations
+
+import re
+
+import pytest
+from helpers import summarize
+
+from plare.exception import LexingError
+from plare.lexer import Handler, Lexer, combine_patterns
+from plare.token import Token
+
+
+class WORD(Token):
+    def __init__(self, value: str, *, lineno: int, offset: int) -> None:
+        super().__init__(value, lineno=lineno, offset=offset)
+        self.value = value
+
+
+class NUM(Token):
+    def __init__(self, value: str, *, lineno: int, offset: int) -> None:
+        super().__init__(value, lineno=lineno, offset=offset)
+        self.value = int(value)
+
+
+class STAR(Token):
+    pass
+
+
+class POW(Token):
+    pass
+
+
+class QUOTED(Token):
+    def __init__(self, value: str, *, lineno: int, offset: int) -> None:
+        super().__init__(value, lineno=lineno, offset=offset)
+        self.value = value
+
+
+def lex_both(
+    patterns: dict[str, list[tuple[str, Handler[None]]]], var: str, src: str
+) -> list[tuple[str, int, int, object]]:
+    sequential = summarize(list(Lexer(patterns).lex(var, src)))
+    combined = summarize(list(Lexer(patterns, combine=True).lex(var, src)))
+    assert sequential == combined
+    return combined
+
+
+def test_combined_matches_sequential_on_words_and_numbers() -> None:
+    """Mixed words, numbers and newlines produce identical tokens in both modes."""
+    patterns: dict[str, list[tuple[str, Handler[None]]]] = {
+        "start": [
+            (r"[ \t\n]+", "start"),
+            (r"-?(0|[1-9][0-9]*)", NUM),
+            (r"[a-z]+", WORD),
+        ]
+    }
+    result = lex_both(patterns, "start", "ab 12\n  cd -3")
+    assert [name for name, *_ in result] == ["WORD", "NUM", "WORD", "NUM"]
+    assert result[2][1:3] == (2, 2)
+
+
+def test_combined_keeps_first_match_wins() -> None:
+    """An earlier, shorter pattern still beats a later, longer one."""
+    patterns: dict[str, list[tuple[str, Handler[None]]]] = {
+        "start": [
+            (r"\*", STAR),
+            (r"\*\*", POW),
+        ]
+    }
+    result = lex_both(patterns, "start", "**")
+    assert [name for name, *_ in result] == ["STAR", "STAR"]
+
+
+def test_combined_follows_state_transitions() -> None:
+    """Per-state alternations are used across state switches."""
+    patterns: dict[str, list[tuple[str, Handler[None]]]] = {
+        "start": [
+            (r"/\*", "comment"),
+            (r" +", "start"),
+            (r"\d+", NUM),
+        ],
+        "comment": [
+            (r"\*/", "start"),
+            (r"[^*]+", "comment"),
+            (r"\*(?!/)", "comment"),
+        ],
+    }
+    result = lex_both(patterns, "start", "1 /* a * b\n */ 2")
+    assert [value for *_, value in result] == [1, 2]
+
+
+def test_combined_end_of_input_pattern() -> None:
+    """A ``$`` pattern still fires once at end of input."""
+
+    class EOF(Token):
+        pass
+
+    patterns: dict[str, list[tuple[str, Handler[None]]]] = {
+        "start": [(r"\d+", NUM), (r"$", EOF)]
+    }
+    result = lex_both(patterns, "start", "42")
+    assert [name for name, *_ in result] == ["NUM", "EOF"]
+
+
+def test_combined_error_position() -> None:
+    """Unmatched input raises LexingError at the same position in both modes."""
+    patterns: dict[str, list[tuple[str, Handler[None]]]] = {
+        "start": [(r"[a-z]+", WORD), (r"\n", "start")]
+    }
+    for combine in (False, True):
+        with pytest.raises(LexingError) as exc_info:
+            list(Lexer(patterns, combine=combine).lex("start", "ab\ncd@"))
+        assert (exc_info.value.lineno, exc_info.value.offset) == (2, 2)
+
+
+def test_backreference_state_falls_back() -> None:
+    """A state using a numbered backreference is not combined but still lexes."""
+    patterns: dict[str, list[tuple[str, Handler[None]]]] = {
+        "start": [
+            (r"(['\"]).*?\1", QUOTED),
+            (r" +", "start"),
+        ]
+    }
+    lexer = Lexer(patterns, combine=True)
+    assert "start" not in lexer.combined
+    tokens = list(lexer.lex("start", '\'a"b\' "c"'))
+    assert [t.value for t in tokens if isinstance(t, QUOTED)] == ["'a\"b'", '"c"']
+
+
+def test_global_flag_state_falls_back() -> None:
+    """A global inline flag cannot be embedded, so that state stays sequential."""
+    patterns: dict[str, list[tuple[str, Handler[None]]]] = {
+        "start": [(r"(?i)[a-z]+", WORD), (r" +", "start")],
+        "digits": [(r"\d+", NUM)],
+    }
+    lexer = Lexer(patterns, combine=True)
+    assert "start" not in lexer.combined
+    assert "digits" in lexer.combined
+    assert [t.value for t in lexer.lex("start", "Ab cD") if isinstance(t, WORD)] == [
+        "Ab",
+        "cD",
+    ]
+
+
+def test_combine_patterns_group_names() -> None:
+    """Each wrapper group name maps back to its rule index."""
+    combined = combine_patterns([re.compile(r"a"), re.compile(r"(b)c")])
+    assert combined is not None
+    regex, groups = combined
+    match = regex.match("bc")
+    assert match is not None and match.lastgroup is not None
+    assert groups[match.lastgroup] == 1
+
+
+def test_empty_state_is_not_combined() -> None:
+    """A state without patterns matches nothing, as in sequential mode."""
+    assert combine_patterns([]) is None
+    lexer: Lexer[None] = Lexer({"start": []}, combine=True)
+    assert "start" not in lexer.combined
+    assert list(lexer.lex("start", "")) == []
+    with pytest.raises(LexingError, match="Unexpected character"):
+        list(lexer.lex("start", "x"))
@@ -0,0 +1,255 @@
+"""Tests for the table-driven DFA lexer engine (``engine="dfa"``)."""
+
+from __future__ import annotations
+
+import re
+
+import pytest
+from helpers import summarize
+
+from plare.dfa import CATEGORIES, DFA, UnsupportedPattern
+from plare.exception import LexingError
+from plare.lexer import Handler, Lexer
+from plare.token import Token
+
+
+class NUM(Token):
+    def __init__(self, value: str, *, lineno: int, offset: int) -> None:
+        super().__init__(value, lineno=lineno, offset=offset)
+        self.value = value
+
+
+class ID(Token):
+    def __init__(self, value: str, *, lineno: int, offset: int) -> None:
+        super().__init__(value, lineno=lineno, offset=offset)
+        self.value = value
+
+
+class IF(Token):
+    pass
+
+
+class STAR(Token):
+    pass
+
+
+class POW(Token):
+    pass
+
+
+class EQ(Token):
+    pass
+
+
+class EQEQ(Token):
+    pass
+
+
+class KW(Token):
+    def __init__(self, value: str, *, lineno: int, offset: int) -> None:
+        super().__init__(value, lineno=lineno, offset=offset)
+        self.value = value
+
+
+class STR(Token):
+    def __init__(self, value: str, *, lineno: int, offset: int) -> None:
+        super().__init__(value, lineno=lineno, offset=offset)
+        self.value = value
+
+
+EXPR_PATTERNS: dict[str, list[tuple[str, Handler[None]]]] = {
+    "start": [
+        (r"[ \t\n]+", "start"),
+        (r"/\*", "comment"),
+        (r"#", "directive"),
+        (r"-?(0|[1-9][0-9]*)", NUM),
+        (r"\*\*", POW),
+        (r"\*", STAR),
+        (r"==", EQ),
+        (r"=", EQEQ),
+        (r'"([^"\\]|\\.)*"', STR),
+        (r"[a-zA-Z_]\w*", ID),
+    ],
+    "comment": [
+        (r"\*/", "start"),
+        (r"[^*]+", "comment"),
+        (r"\*", "comment"),
+    ],
+    "directive": [
+        (r"if|ifdef", KW),
+        (r"[a-z]+", ID),
+        (r"[ \t]+", "directive"),
+        (r"\n", "start"),
+    ],
+}
+
+SAMPLES = [
+    "x = 12 ** -3 * y_1",
+    'name == "a \\" quoted\\n string"',
+    "a /* multi\nline ** comment */ b\n\tc",
+    "0 00 010 -0",
+    "xünï = y١٢ * _é",
+    "#ifdef x\nifdef",
+]
+
+
+@pytest.mark.parametrize("src", SAMPLES)
+def test_dfa_engine_matches_re_engine(src: str) -> None:
+    """The DFA engine produces exactly the tokens of the re engine.
+
+    ``directive`` keeps the re engine: ``if|ifdef`` matches only ``if`` of
+    ``ifdef`` there, but all of it in a DFA.
+    """
+    dfa_lexer: Lexer[None] = Lexer(EXPR_PATTERNS, engine="dfa")
+    assert set(dfa_lexer.dfas) == {"start", "comment"}
+    expected = summarize(list(Lexer(EXPR_PATTERNS).lex("start", src)))
+    assert summarize(list(dfa_lexer.lex("start", src))) == expected
+
+
+def test_dfa_engine_error_position() -> None:
+    """Unmatched input raises LexingError at the same position as the re engine."""
+    lexer: Lexer[None] = Lexer(EXPR_PATTERNS, engine="dfa")
+    with pytest.raises(LexingError) as exc_info:
+        list(lexer.lex("start", "a\n  b ?"))
+    assert (exc_info.value.lineno, exc_info.value.offset) == (2, 4)
+
+
+@pytest.mark.parametrize("category", ["d", "w", "s"])
+def test_category_predicates_agree_with_re(category: str) -> None:
+    """``\\d``, ``\\w`` and ``\\s`` classify every BMP character like ``re``."""
+    regex = re.compile(rf"\{category}")
+    predicate = CATEGORIES[category]
+    mismatches = [
+        code
+        for code in range(0x10000)
+        if not 0xD800 <= code <= 0xDFFF
+        and predicate(chr(code)) != bool(regex.match(chr(code)))
+    ]
+    assert mismatches == []
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [
+        r"^a",
+        r"a$",
+        r"\bword",
+        r"a(?=b)",
+        r"(?<!x)a",
+        r"(a)\1",
+        r"(?i)abc",
+        r"a*?",
+        r"a++",
+    ],
+)
+def test_unsupported_constructs_are_rejected(pattern: str) -> None:
+    """Constructs outside the DFA subset raise UnsupportedPattern."""
+    with pytest.raises(UnsupportedPattern):
+        DFA([pattern])
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [
+        r"if|ifdef",
+        r"a|ab",
+        r"\d+|\d+\.\d+",
+        r"(|a)b?",
+        r"a*(ab)?",
+        r"(a|b)*a?",
+        r"(a?)*",
+        r"[^x]*y?",
+        r"\w+(é)?",
+    ],
+)
+def test_patterns_matched_shorter_by_re_are_rejected(pattern: str) -> None:
+    """Patterns where ``re`` may stop before the longest extent are rejected."""
+    with pytest.raises(UnsupportedPattern):
+        DFA([pattern])
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [
+        r"-?(0|[1-9][0-9]*)",
+        r'"([^"\\]|\\.)*"',
+        r"\d+(\.\d+)?([eE][+-]?\d+)?",
+        r"[a-zA-Z_]\w*",
+        r"(a|)b",
+        r"#[^\n]*",
+    ],
+)
+def test_patterns_matched_longest_by_re_are_accepted(pattern: str) -> None:
+    DFA([pattern])
+
+
+def test_unsupported_state_falls_back_to_re() -> None:
+    """A state with an unsupported pattern is lexed by the re engine."""
+    lexer: Lexer[None] = Lexer(
+        {
+            "start": [(r"\bif\b", IF), (r"[a-z]+", ID), (r" ", "start")],
+            "other": [(r"\d+", NUM)],
+        },
+        engine="dfa",
+    )
+    assert set(lexer.dfas) == {"other"}
+    assert [type(t) for t in lexer.lex("start", "if iffy")] == [IF, ID]
+
+
+@pytest.mark.parametrize(
+    ("pattern", "text", "end"),
+    [
+        (r"a{2,3}", "aaaa", 3),
+        (r"a{2}", "aaaa", 2),
+        (r"a{2,}", "aaaaa", 5),
+        (r"a{,2}", "aaa", 2),
+        (r"x{}", "x{}", 3),
+        (r"[^\]a-c]+", "xyz]", 3),
+        (r"[\w.-]+", "a.b-c d", 5),
+        (r"\x41é", "Aé", 2),
+        (r".+", "ab\ncd", 2),
+        (r"(?P<n>ab)+", "ababa", 4),
+        (r"", "abc", 0),
+    ],
+)
+def test_dfa_supported_constructs(pattern: str, text: str, end: int) -> None:
+    """Each supported construct matches the same extent as ``re``."""
+    regex_match = re.compile(pattern).match(text)
+    assert regex_match is not None and regex_match.end() == end
+    assert DFA([pattern]).scan(text, 0) == (0, end)
+
+
+# ---------------------------------------------------------------------------
+# Longest match (maximal munch)
+# ---------------------------------------------------------------------------
+
+MUNCH_PATTERNS: dict[str, list[tuple[str, Handler[None]]]] = {
+    "start": [
+        (r" +", "start"),
+        (r"if", IF),
+        (r"[a-z]+", ID),
+        (r"\*", STAR),
+        (r"\*\*", POW),
+    ]
+}
+
+
+@pytest.mark.parametrize("engine", ["re", "dfa"])
+def test_first_match_wins_by_default(engine: str) -> None:
+    """Without longest_match, pattern order decides as before."""
+    lexer: Lexer[None] = Lexer(
+        MUNCH_PATTERNS, engine="dfa" if engine == "dfa" else "re"
+    )
+    assert [type(t) for t in lexer.lex("start", "iffy **")] == [IF, ID, STAR, STAR]
+
+
+@pytest.mark.parametrize("engine", ["re", "dfa"])
+def test_longest_match_across_patterns(engine: str) -> None:
+    """With longest_match, the longest match wins and ties go to the earlier rule."""
+    lexer: Lexer[None] = Lexer(
+        MUNCH_PATTERNS,
+        engine="dfa" if engine == "dfa" else "re",
+        longest_match=True,
+    )
+    tokens = list(lexer.lex("start", "iffy if ** *"))
+    assert [type(t) for t in tokens] == [ID, IF, POW, STAR]
@@ -0,0 +1,115 @@
+"""Tests for keyword-table handlers (``Keywords``)."""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import pytest
+from helpers import summarize
+
+from plare.lexer import Handler, Keywords, Lexer
+from plare.token import Token
+
+
+class ID(Token):
+    def __init__(self, value: str, *, lineno: int, offset: int) -> None:
+        super().__init__(value, lineno=lineno, offset=offset)
+        self.name = value
+
+
+class IF(Token):
+    pass
+
+
+class THEN(Token):
+    pass
+
+
+class ELSE(Token):
+    pass
+
+
+KEYWORDS = Keywords({"if": IF, "then": THEN, "else": ELSE}, ID)
+
+PATTERNS: dict[str, list[tuple[str, Handler[None]]]] = {
+    "start": [
+        (r"[ \n]+", "start"),
+        (r"[a-zA-Z_]\w*", KEYWORDS),
+    ]
+}
+
+SRC = "if iffy then\n  x else _else"
+EXPECTED = [
+    ("IF", 1, 0, None),
+    ("ID", 1, 3, "iffy"),
+    ("THEN", 1, 8, None),
+    ("ID", 2, 2, "x"),
+    ("ELSE", 2, 4, None),
+    ("ID", 2, 9, "_else"),
+]
+
+
+def test_keywords_and_identifiers() -> None:
+    """Keyword text maps to its class, everything else to the default class."""
+    lexer: Lexer[None] = Lexer(PATTERNS)
+    assert summarize(list(lexer.lex("start", SRC))) == EXPECTED
+
+
+def test_keywords_lookup() -> None:
+    """``lookup`` returns the class that would be emitted."""
+    assert KEYWORDS.lookup("then") is THEN
+    assert KEYWORDS.lookup("Then") is ID
+
+
+@pytest.mark.parametrize(
+    "lexer",
+    [
+        Lexer(PATTERNS, combine=True),
+        Lexer(PATTERNS, engine="dfa"),
+        Lexer(PATTERNS, lazy_positions=True),
+        Lexer(PATTERNS, longest_match=True),
+    ],
+    ids=["combine", "dfa", "lazy", "longest"],
+)
+def test_keywords_in_all_matching_modes(lexer: Lexer[None]) -> None:
+    """Keyword tables work with every matching mode."""
+    assert summarize(list(lexer.lex("start", SRC))) == EXPECTED
+
+
+def test_keywords_in_all_entry_points(tmp_path: Path) -> None:
+    """Keyword tables work when streaming, lexing files and lexing columnar."""
+    lexer: Lexer[None] = Lexer(PATTERNS)
+    path = tmp_path / "input.txt"
+    path.write_text(SRC, encoding="utf-8")
+    assert summarize(list(lexer.lex("start", [SRC[:4], SRC[4:]]))) == EXPECTED
+    assert summarize(list(lexer.lex_file("start", path))) == EXPECTED
+    assert summarize(list(lexer.lex_columnar("start", SRC))) == EXPECTED
+
+
+@pytest.mark.slow
+def test_keyword_table_cost_is_independent_of_keyword_count() -> None:
+    """A keyword table beats one pattern per keyword ahead of the identifier."""
+    classes = {f"kw{i}": type(f"KW{i}", (Token,), {}) for i in range(80)}
+    rules: list[tuple[str, Handler[None]]] = [(r" +", "start")]
+    rules += [(rf"{word}(?!\w)", cls) for word, cls in classes.items()]
+    rules.append((r"[a-zA-Z_]\w*", ID))
+    per_pattern: Lexer[None] = Lexer({"start": rules})
+    table: Lexer[None] = Lexer(
+        {"start": [(r" +", "start"), (r"[a-zA-Z_]\w*", Keywords(classes, ID))]}
+    )
+    src = " ".join(["kw79", "name", "kw3", "other"] * 20_000)
+
+    timings: dict[str, float] = {}
+    results: dict[str, list[type[Token]]] = {}
+    for name, lexer in (("per-pattern", per_pattern), ("table", table)):
+        t0 = time.perf_counter()
+        results[name] = [type(t) for t in lexer.lex("start", src)]
+        timings[name] = time.perf_counter() - t0
+
+    print(
+        f"\n80 keywords: per-pattern {timings['per-pattern']:.2f}s,"
+        f" table {timings['table']:.2f}s"
+    )
+    assert results["table"] == results["per-pattern"]
+    assert timings["table"] < timings["per-pattern"]
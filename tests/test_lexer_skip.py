@@ -0,0 +1,169 @@
+"""Tests for region-skipping handlers (``SkipUntil`` and ``SkipNested``)."""
+
+from __future__ import annotations
+
+import time
+import tracemalloc
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from helpers import summarize
+
+from plare.exception import LexingError
+from plare.lexer import Handler, Lexer, Skip, SkipNested, SkipUntil
+from plare.token import Token
+
+
+class WORD(Token):
+    def __init__(self, value: str, *, lineno: int, offset: int) -> None:
+        super().__init__(value, lineno=lineno, offset=offset)
+        self.value = value
+
+
+PATTERNS: dict[str, list[tuple[str, Handler[None]]]] = {
+    "start": [
+        (r"[ \n]+", "start"),
+        (r"/\*", SkipUntil("*/")),
+        (r"\(\*", SkipNested("(*", "*)")),
+        (r'"', SkipUntil('"', "separated")),
+        (r"[a-zé]+", WORD),
+    ],
+    "separated": [(r"[ \n]+", "start")],
+}
+
+lexer: Lexer[None] = Lexer(PATTERNS)
+
+
+def test_skip_until_updates_position_in_bulk() -> None:
+    """Lines and columns after a skipped multi-line region are exact."""
+    tokens = list(lexer.lex("start", "a /* x\n yy * / */ b\nc /**/d"))
+    assert summarize(tokens) == [
+        ("WORD", 1, 0, "a"),
+        ("WORD", 2, 11, "b"),
+        ("WORD", 3, 0, "c"),
+        ("WORD", 3, 6, "d"),
+    ]
+
+
+def test_skip_nested_balances_delimiters() -> None:
+    """Nested openers need their own closers before the region ends."""
+    tokens = list(lexer.lex("start", "a (* b (* c *) d *) e (**) f"))
+    assert [t.value for t in tokens if isinstance(t, WORD)] == ["a", "e", "f"]
+
+
+def test_skip_switches_state() -> None:
+    """``next`` selects the state entered after the region."""
+    tokens = list(lexer.lex("start", 'a "b c" d'))
+    assert summarize(tokens) == [("WORD", 1, 0, "a"), ("WORD", 1, 8, "d")]
+    with pytest.raises(LexingError) as exc_info:
+        list(lexer.lex("start", 'a "b c"d'))
+    assert (exc_info.value.lineno, exc_info.value.offset) == (1, 7)
+
+
+@pytest.mark.parametrize("src", ["a /* never closed", "a (* (* *) never closed"])
+def test_unclosed_region_extends_to_end(src: str) -> None:
+    """A region still open at end of input swallows the rest silently."""
+    assert [type(t) for t in lexer.lex("start", src)] == [WORD]
+
+
+SRC = 'x /* one\n two */ é (* a (* b\n *) *) "s\ntr" y'
+EXPECTED = summarize(list(lexer.lex("start", SRC)))
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7])
+def test_skip_across_stream_chunks(size: int) -> None:
+    """Delimiters split across chunks are still found when streaming."""
+    chunks = [SRC[i : i + size] for i in range(0, len(SRC), size)]
+    assert summarize(list(lexer.lex_stream("start", chunks, lookahead=2))) == EXPECTED
+
+
+LONG = "a /* " + "x\n yz " * 300 + "*/ b (* (* " + "w\n" * 300 + "*) *) c\n d"
+
+
+@pytest.mark.parametrize("size", [1, 5, 64])
+def test_long_region_across_stream_chunks(size: int) -> None:
+    """Positions after a region longer than the buffer are exact."""
+    chunks = [LONG[i : i + size] for i in range(0, len(LONG), size)]
+    tokens = lexer.lex_stream("start", chunks, lookahead=4)
+    assert summarize(list(tokens)) == summarize(list(lexer.lex("start", LONG)))
+
+
+def test_skip_in_file_and_columnar_modes(tmp_path: Path) -> None:
+    """Skips work on memory-mapped files and in columnar mode."""
+    path = tmp_path / "input.txt"
+    path.write_text(SRC, encoding="utf-8")
+    assert summarize(list(lexer.lex_file("start", path))) == EXPECTED
+    assert summarize(list(lexer.lex_columnar("start", SRC))) == EXPECTED
+
+
+def test_scan_reports_resume_position() -> None:
+    """An incomplete scan resumes where a split delimiter may start."""
+    assert SkipUntil("*/").scan("abc*", 0) == (3, 1)
+    assert SkipUntil("*/").scan("abc*/", 0) == (5, 0)
+    assert SkipNested("(*", "*)").scan("(* *) (", 0, 1) == (6, 1)
+
+
+def test_skip_subclasses_must_implement_scan() -> None:
+    class Incomplete(Skip):
+        pass
+
+    with pytest.raises(TypeError, match="abstract"):
+        Incomplete()  # type: ignore[abstract]
+
+
+@pytest.mark.slow
+def test_streaming_a_long_region_keeps_a_bounded_buffer() -> None:
+    """An unterminated-so-far comment does not accumulate in the buffer."""
+    chunk = "x * y\n" * 10_000
+    chunks = 200
+    size = chunks * len(chunk)
+
+    def source() -> Iterator[str]:
+        yield "a /*"
+        for _ in range(chunks):
+            yield chunk
+        yield "*/ b"
+
+    tracemalloc.start()
+    try:
+        tokens = list(lexer.lex_stream("start", source(), lookahead=1024))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    print(f"\nlong region: {size / 2**20:.1f} MiB comment, peak {peak / 2**10:.0f} KiB")
+    assert summarize(tokens) == [
+        ("WORD", 1, 0, "a"),
+        ("WORD", chunks * 10_000 + 1, 3, "b"),
+    ]
+    assert peak < size // 20
+
+
+@pytest.mark.slow
+def test_skip_is_faster_than_per_character_state() -> None:
+    """Skipping a long comment beats consuming it one character at a time."""
+    per_char: Lexer[None] = Lexer(
+        {
+            "start": [(r"[ \n]+", "start"), (r"//", "comment"), (r"[a-z]+", WORD)],
+            "comment": [(r"//", "start"), (r"(?s:.)", "comment")],
+        }
+    )
+    bulk: Lexer[None] = Lexer(
+        {"start": [(r"[ \n]+", "start"), (r"//", SkipUntil("//")), (r"[a-z]+", WORD)]}
+    )
+    src = ("word // " + "comment text\n" * 50 + "// ") * 200
+
+    timings: dict[str, float] = {}
+    results: dict[str, list[tuple[str, int, int, object]]] = {}
+    for name, each in (("per-char", per_char), ("bulk", bulk)):
+        t0 = time.perf_counter()
+        results[name] = summarize(list(each.lex("start", src)))
+        timings[name] = time.perf_counter() - t0
+
+    print(
+        f"\n{len(src) / 1e3:.0f} kB of comments: per-char {timings['per-char']:.3f}s,"
+        f" bulk {timings['bulk']:.3f}s"
+    )
+    assert results["bulk"] == results["per-char"]
+    assert timings["bulk"] * 10 < timings["per-char"]
@@ -0,0 +1,197 @@
+"""Tests for streaming ``Lexer.lex`` over text streams and chunk iterables."""
+
+from __future__ import annotations
+
+import io
+import os
+import threading
+import time
+import tracemalloc
+from typing import Iterator
+
+import pytest
+from helpers import summarize
+
+from plare.exception import LexingError
+from plare.lexer import Handler, Lexer
+from plare.token import Token
+
+
+class WORD(Token):
+    def __init__(self, value: str, *, lineno: int, offset: int) -> None:
+        super().__init__(value, lineno=lineno, offset=offset)
+        self.value = value
+
+
+class NUM(Token):
+    def __init__(self, value: str, *, lineno: int, offset: int) -> None:
+        super().__init__(value, lineno=lineno, offset=offset)
+        self.value = int(value)
+
+
+class STAR(Token):
+    pass
+
+
+class POW(Token):
+    pass
+
+
+class EOF(Token):
+    pass
+
+
+PATTERNS: dict[str, list[tuple[str, Handler[None]]]] = {
+    "start": [
+        (r"[ \t\n]+", "start"),
+        (r"/\*", "comment"),
+        (r"\*\*", POW),
+        (r"\*", STAR),
+        (r"[0-9]+", NUM),
+        (r"[a-z]+", WORD),
+        (r"$", EOF),
+    ],
+    "comment": [
+        (r"\*/", "start"),
+        (r"[^*]+", "comment"),
+        (r"\*", "comment"),
+    ],
+}
+
+lexer: Lexer[None] = Lexer(PATTERNS)
+
+SRC = "abc 12 ** 3\n/* a * b\n c */ de*f\n  4567 ghij"
+
+
+def chunked(text: str, size: int) -> list[str]:
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+EXPECTED = summarize(list(lexer.lex("start", SRC)))
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 8, 64])
+@pytest.mark.parametrize("lookahead", [2, 3, 16])
+def test_chunked_input_matches_whole_input(size: int, lookahead: int) -> None:
+    """Tokens spanning chunk boundaries are lexed exactly as in one string."""
+    tokens = lexer.lex_stream("start", chunked(SRC, size), lookahead=lookahead)
+    assert summarize(list(tokens)) == EXPECTED
+
+
+def test_text_stream_input() -> None:
+    """``lex`` accepts a text stream directly."""
+    assert summarize(list(lexer.lex("start", io.StringIO(SRC)))) == EXPECTED
+
+
+def test_generator_input_with_empty_chunks() -> None:
+    """Any iterable of chunks works, and empty chunks are harmless."""
+
+    def source() -> Iterator[str]:
+        for chunk in chunked(SRC, 4):
+            yield ""
+            yield chunk
+
+    assert summarize(list(lexer.lex("start", source()))) == EXPECTED
+
+
+@pytest.mark.parametrize("engine", ["re", "dfa"])
+def test_streaming_with_other_matching_modes(engine: str) -> None:
+    """Combined and DFA matching work through the streaming buffer."""
+    other: Lexer[None] = Lexer(
+        PATTERNS, combine=True, engine="dfa" if engine == "dfa" else "re"
+    )
+    assert summarize(list(other.lex("start", chunked(SRC, 3)))) == EXPECTED
+
+
+def test_streaming_error_position() -> None:
+    """Unmatched input raises LexingError at the same position as ``lex``."""
+    src = "ab\n/* x */ cd ?"
+    with pytest.raises(LexingError) as exc_info:
+        list(lexer.lex_stream("start", chunked(src, 2), lookahead=2))
+    assert (exc_info.value.lineno, exc_info.value.offset) == (2, 11)
+
+
+def test_lookahead_must_be_positive() -> None:
+    """A lookahead of zero is rejected."""
+    with pytest.raises(ValueError):
+        list(lexer.lex_stream("start", ["a"], lookahead=0))
+
+
+@pytest.mark.slow
+def test_streaming_memory_is_bounded() -> None:
+    """Lexing a long stream keeps a bounded buffer, not the whole input."""
+    line = "/* " + "x" * 200 + " */\n"
+    chunks = 1000
+    size = chunks * len(line) * 50
+
+    def source() -> Iterator[str]:
+        for _ in range(chunks):
+            yield line * 50
+        yield "end"
+
+    tracemalloc.start()
+    try:
+        tokens = list(lexer.lex("start", source()))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    print(f"\nstreaming: {size / 2**20:.1f} MiB input, peak {peak / 2**10:.0f} KiB")
+    assert [type(t) for t in tokens] == [WORD, EOF]
+    assert peak < size // 20
+
+
+def test_tokens_are_yielded_before_later_chunks_are_read() -> None:
+    """A token is yielded once the text after it is buffered, not later."""
+    pulled: list[str] = []
+
+    def source() -> Iterator[str]:
+        for chunk in ["abc 12 ", "de ", "fg ", "hi ", "jk"]:
+            pulled.append(chunk)
+            yield chunk
+
+    tokens = lexer.lex_stream("start", source())
+    first = next(tokens)
+    assert isinstance(first, WORD) and first.value == "abc"
+    assert pulled == ["abc 12 "]
+    assert isinstance(next(tokens), NUM)
+    assert pulled == ["abc 12 "]
+    assert isinstance(next(tokens), WORD)
+    assert pulled == ["abc 12 ", "de "]
+
+
+def test_a_pipe_is_lexed_before_it_is_closed() -> None:
+    """A text stream over a pipe yields the tokens of each line as it arrives."""
+    read_fd, write_fd = os.pipe()
+    seen: list[Token] = []
+    with (
+        open(read_fd, encoding="utf-8") as reader,
+        open(write_fd, "w", encoding="utf-8") as writer,
+    ):
+        thread = threading.Thread(
+            target=lambda: seen.extend(lexer.lex("start", reader)), daemon=True
+        )
+        thread.start()
+        writer.write("ab 12\n")
+        writer.flush()
+        deadline = time.monotonic() + 10
+        while len(seen) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert [type(t) for t in seen] == [WORD, NUM]
+    thread.join(10)
+    assert [type(t) for t in seen] == [WORD, NUM, EOF]
+
+
+@pytest.mark.parametrize(
+    "chunks, expected",
+    [
+        # ``**`` wins over ``*`` because the lone ``*`` reaches the buffer end.
+        (["a *", "* b"], [WORD, POW, WORD, EOF]),
+        # ``/*`` is not missed when ``/`` alone matches nothing.
+        (["a /", "* b */ c"], [WORD, WORD, EOF]),
+    ],
+)
+def test_tokens_split_between_chunks_wait_for_more_input(
+    chunks: list[str], expected: list[type[Token]]
+) -> None:
+    assert [type(t) for t in lexer.lex_stream("start", chunks)] == expected
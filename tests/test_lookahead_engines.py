@@ -0,0 +1,155 @@
+"""Tests for the DeRemer–Pennello lookahead engine.
+
+The grammars of the other test modules are built with both engines and their
+tables compared; the grammars here target the relations that only
+DeRemer–Pennello has (nullable *reads* chains, *includes* cycles).
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+import pytest
+import test_error_reporting
+import test_grammar_logic
+import test_table_cache
+import test_table_compression
+import test_table_serialization
+from helpers import Grammar, Node, make_layered_grammar
+
+from plare.parser import Parser, digraph
+from plare.token import Token
+
+
+class A(Token):
+    pass
+
+
+class B(Token):
+    pass
+
+
+class C(Token):
+    pass
+
+
+def table_cells(parser: Parser[object]) -> list[dict[object, str]]:
+    return [
+        {symbol: str(action) for symbol, action in row.items()}
+        for row in parser.table.table
+    ]
+
+
+def default_cells(parser: Parser[object]) -> dict[int, str]:
+    return {state: str(action) for state, action in parser.table.defaults.items()}
+
+
+def assert_same_tables(grammar: Mapping[str, Sequence[Any]]) -> Parser[object]:
+    propagation: Parser[object] = Parser(grammar, lookaheads="propagation")
+    deremer_pennello: Parser[object] = Parser(grammar, lookaheads="deremer-pennello")
+    assert deremer_pennello.entry_state == propagation.entry_state
+    assert table_cells(deremer_pennello) == table_cells(propagation)
+    assert default_cells(deremer_pennello) == default_cells(propagation)
+    return deremer_pennello
+
+
+@pytest.mark.parametrize(
+    "grammar",
+    [
+        test_error_reporting.GRAMMAR,
+        test_grammar_logic.CALC_GRAMMAR,
+        test_grammar_logic.LIST_GRAMMAR,
+        test_grammar_logic.CALL_GRAMMAR,
+        test_grammar_logic.PROGRAM_GRAMMAR,
+        test_table_cache.GRAMMAR,
+        test_table_compression.GRAMMAR,
+        test_table_serialization.GRAMMAR,
+    ],
+    ids=[
+        "error_reporting",
+        "calc",
+        "list",
+        "call",
+        "program",
+        "table_cache",
+        "table_compression",
+        "table_serialization",
+    ],
+)
+def test_engines_agree_on_test_grammars(grammar: Mapping[str, Sequence[Any]]) -> None:
+    """Both engines build the same table for the grammars of the other tests."""
+    assert_same_tables(grammar)
+
+
+def test_nullable_reads_chain() -> None:
+    """Lookaheads read through a chain of nullable non-terminals."""
+    grammar: Grammar[Node] = {
+        "s": [(["x", "opt1", "opt2", C], Node, [0])],
+        "x": [([A], Node, [0])],
+        "opt1": [([], Node, []), ([A], Node, [0])],
+        "opt2": [([], Node, []), ([B], Node, [0])],
+    }
+    parser = assert_same_tables(grammar)
+    tokens: list[Token] = [A("a", lineno=1, offset=0), A("a", lineno=1, offset=1)]
+    tokens.append(C("c", lineno=1, offset=2))
+    assert isinstance(parser.parse("s", tokens), Node)
+
+
+def test_includes_cycle() -> None:
+    """Mutually right-recursive non-terminals form an *includes* cycle."""
+    grammar: Grammar[Node] = {
+        "s": [(["p", C], Node, [0])],
+        "p": [([A, "q"], Node, [1]), ([A], Node, [0])],
+        "q": [([B, "p"], Node, [1]), ([B, "q", "tail"], Node, [1])],
+        "tail": [([], Node, [])],
+    }
+    assert_same_tables(grammar)
+
+
+def test_multiple_entries_share_states() -> None:
+    """Each entry point contributes EOS to the states it shares with others."""
+    grammar: Grammar[Node] = {
+        "list": [(["list", "item"], Node, [0, 1]), (["item"], Node, [0])],
+        "item": [([A], Node, [0]), ([B, "list", C], Node, [1])],
+    }
+    parser = assert_same_tables(grammar)
+    tokens: list[Token] = [B("b", lineno=1, offset=0), A("a", lineno=1, offset=1)]
+    tokens.append(C("c", lineno=1, offset=2))
+    assert isinstance(parser.parse("item", tokens), Node)
+    assert isinstance(parser.parse("list", tokens), Node)
+
+
+def test_digraph_collapses_cycles() -> None:
+    """Every node of a strongly connected component gets the same set."""
+    relation = {1: [2], 2: [3], 3: [1, 4], 4: []}
+    initial: dict[int, set[type[Token]]] = {1: {A}, 2: set(), 3: set(), 4: {B}}
+    result = digraph([1, 2, 3, 4], relation, initial)
+    assert result[1] == result[2] == result[3] == {A, B}
+    assert result[4] == {B}
+
+
+# ---------------------------------------------------------------------------
+# Build-time comparison on a large grammar
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.slow
+def test_deremer_pennello_build_time() -> None:
+    """DeRemer–Pennello builds the same table faster on a large grammar."""
+    grammar = make_layered_grammar(levels=20, operators=5, prefixes=True)
+
+    t0 = time.perf_counter()
+    propagation: Parser[object] = Parser(grammar, lookaheads="propagation")
+    t1 = time.perf_counter()
+    deremer_pennello: Parser[object] = Parser(grammar, lookaheads="deremer-pennello")
+    t2 = time.perf_counter()
+
+    productions = sum(len(rights) for rights in grammar.values())
+    print(
+        f"\n{productions} productions, {len(propagation.table.table)} states:"
+        f" propagation {t1 - t0:.2f}s, deremer-pennello {t2 - t1:.2f}s"
+    )
+    assert table_cells(deremer_pennello) == table_cells(propagation)
+    assert t2 - t1 < t1 - t0
@@ -0,0 +1,201 @@
+"""Tests for streaming the items of a long input (``Parser.parse_iter``)."""
+
+from __future__ import annotations
+
+import gc
+import tracemalloc
+import weakref
+from collections.abc import Generator, Iterator
+
+import pytest
+
+from plare.exception import ParsingError
+from plare.parser import Parser
+from plare.token import Token
+
+
+class NUM(Token):
+    def __init__(self, value: str, *, lineno: int, offset: int) -> None:
+        super().__init__(value, lineno=lineno, offset=offset)
+        self.value = int(value)
+
+
+class PLUS(Token):
+    precedence = 1
+    associative = "left"
+
+
+class STAR(Token):
+    precedence = 2
+    associative = "left"
+
+
+class SEMI(Token):
+    pass
+
+
+live: weakref.WeakSet[Value] = weakref.WeakSet()
+"""Every AST node still referenced from somewhere."""
+
+
+class Value:
+    def __init__(self, value: int) -> None:
+        self.value = value
+        live.add(self)
+
+
+class Num(Value):
+    def __init__(self, token: NUM, /) -> None:
+        super().__init__(token.value)
+
+
+class Add(Value):
+    def __init__(self, left: Value, right: Value, /) -> None:
+        super().__init__(left.value + right.value)
+
+
+class Mul(Value):
+    def __init__(self, left: Value, right: Value, /) -> None:
+        super().__init__(left.value * right.value)
+
+
+class Stmt(Value):
+    def __init__(self, expr: Value, /) -> None:
+        super().__init__(expr.value)
+
+
+class Stmts(Value):
+    def __init__(self, *stmts: Value | None) -> None:
+        super().__init__(len(stmts))
+        self.stmts = stmts
+
+
+PARSER: Parser[Value] = Parser(
+    {
+        "expr": [
+            ([NUM], Num, [0]),
+            (["expr", PLUS, "expr"], Add, [0, 2]),
+            (["expr", STAR, "expr"], Mul, [0, 2]),
+        ],
+        "stmt": [(["expr", SEMI], Stmt, [0])],
+        "item": [(["stmt"], None, [0])],
+        "items": [(["item"], None, [0]), (["items", "item"], None, [0])],
+        "doc": [(["items"], Stmts, [0])],
+    }
+)
+
+
+def tokens(src: str) -> Iterator[Token]:
+    kinds: dict[str, type[Token]] = {"+": PLUS, "*": STAR, ";": SEMI}
+    for i, c in enumerate(src):
+        if c != " ":
+            yield kinds.get(c, NUM)(c, lineno=1, offset=i)
+
+
+def drain(
+    items: Generator[Value | Token, None, Value | Token],
+) -> tuple[list[int], Value | Token]:
+    """Return the values of the yielded items and the root value."""
+    values: list[int] = []
+    while True:
+        try:
+            item = next(items)
+        except StopIteration as stop:
+            return values, stop.value
+        assert isinstance(item, Stmt)
+        values.append(item.value)
+
+
+@pytest.mark.parametrize("emit", ["stmt", "item"])
+def test_items_are_yielded_in_order(emit: str) -> None:
+    values, root = drain(PARSER.parse_iter("doc", tokens("1 + 2; 3 * 4; 5;"), emit))
+    assert values == [3, 12, 5]
+    assert isinstance(root, Stmts) and root.stmts == (None,)
+
+
+def test_items_are_yielded_before_the_next_token_is_read() -> None:
+    pulled: list[Token] = []
+
+    def recorded() -> Iterator[Token]:
+        for token in tokens("1; 2 + 3; 4;"):
+            pulled.append(token)
+            yield token
+
+    seen: list[tuple[int, int]] = []
+    for item in PARSER.parse_iter("doc", recorded(), "stmt"):
+        assert isinstance(item, Stmt)
+        seen.append((item.value, len(pulled)))
+    # Each statement arrives right after its ``;`` is read.
+    assert seen == [(1, 2), (5, 6), (4, 8)]
+
+
+def test_yielded_items_are_dropped() -> None:
+    """Only the item being consumed is alive, however long the input."""
+    src = " ".join(f"{i % 10} + {i % 7};" for i in range(1_000))
+    most = 0
+    for item in PARSER.parse_iter("doc", tokens(src), "stmt"):
+        assert isinstance(item, Stmt)
+        del item
+        gc.collect()
+        most = max(most, len(live))
+    assert most <= 3
+
+
+def test_items_before_an_error_are_yielded() -> None:
+    src = "1; 2 * 3; 4 + ; 5;"
+    with pytest.raises(ParsingError) as expected:
+        PARSER.parse("doc", list(tokens(src)))
+    values: list[int] = []
+    with pytest.raises(ParsingError) as actual:
+        for item in PARSER.parse_iter("doc", tokens(src), "stmt"):
+            assert isinstance(item, Stmt)
+            values.append(item.value)
+    assert values == [1, 6]
+    assert str(actual.value) == str(expected.value)
+    assert actual.value.offset == expected.value.offset
+
+
+def test_end_of_input_errors_match_parse() -> None:
+    with pytest.raises(ParsingError) as expected:
+        PARSER.parse("doc", list(tokens("1; 2")))
+    with pytest.raises(ParsingError) as actual:
+        drain(PARSER.parse_iter("doc", tokens("1; 2"), "stmt"))
+    assert str(actual.value) == str(expected.value)
+    assert actual.value.expected == expected.value.expected
+
+
+def test_unknown_non_terminals_are_rejected() -> None:
+    with pytest.raises(ValueError, match="Unknown non-terminal: stmtz"):
+        next(PARSER.parse_iter("doc", tokens("1;"), "stmtz"))
+
+
+# ---------------------------------------------------------------------------
+# Memory on a long input
+# ---------------------------------------------------------------------------
+
+
+def streaming_peak(n: int) -> int:
+    """Return the peak memory of streaming ``n`` statements, in bytes."""
+    src = " ".join(f"{i % 10} + {i % 7} * {i % 5};" for i in range(n))
+    tracemalloc.start()
+    try:
+        total = 0
+        for item in PARSER.parse_iter("doc", tokens(src), "stmt"):
+            assert isinstance(item, Stmt)
+            total += item.value
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert total == sum(i % 10 + i % 7 * (i % 5) for i in range(n))
+    return peak
+
+
+@pytest.mark.slow
+def test_memory_report() -> None:
+    """Peak memory does not grow with the number of statements."""
+    small, large = streaming_peak(5_000), streaming_peak(100_000)
+    print(
+        f"\nparse_iter peak: 5000 statements {small / 1e3:.1f} kB,"
+        f" 100000 statements {large / 1e3:.1f} kB"
+    )
+    assert large < 2 * small
@@ -0,0 +1,191 @@
+"""Tests for push-style parsing (``ParseSession``)."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from plare.exception import ParsingError
+from plare.parser import EOS, Parser, ParseSession
+from plare.token import Token
+
+
+class NUM(Token):
+    def __init__(self, value: str, *, lineno: int, offset: int) -> None:
+        super().__init__(value, lineno=lineno, offset=offset)
+        self.value = int(value)
+
+
+class PLUS(Token):
+    precedence = 1
+    associative = "left"
+
+
+class STAR(Token):
+    precedence = 2
+    associative = "left"
+
+
+class LPAREN(Token):
+    pass
+
+
+class RPAREN(Token):
+    pass
+
+
+class SEMI(Token):
+    pass
+
+
+made: list[str] = []
+"""Names of the AST classes constructed so far, in order."""
+
+
+class Value:
+    def __init__(self, value: int) -> None:
+        self.value = value
+        made.append(type(self).__name__)
+
+
+class Num(Value):
+    def __init__(self, token: NUM, /) -> None:
+        super().__init__(token.value)
+
+
+class Add(Value):
+    def __init__(self, left: Value, right: Value, /) -> None:
+        super().__init__(left.value + right.value)
+
+
+class Mul(Value):
+    def __init__(self, left: Value, right: Value, /) -> None:
+        super().__init__(left.value * right.value)
+
+
+class Stmt(Value):
+    def __init__(self, expr: Value, /) -> None:
+        super().__init__(expr.value)
+
+
+PARSER: Parser[Value] = Parser(
+    {
+        "expr": [
+            ([NUM], Num, [0]),
+            (["expr", PLUS, "expr"], Add, [0, 2]),
+            (["expr", STAR, "expr"], Mul, [0, 2]),
+            ([LPAREN, "expr", RPAREN], None, [1]),
+        ],
+        "stmts": [
+            (["stmt"], None, [0]),
+            (["stmts", "stmt"], Add, [0, 1]),
+        ],
+        "stmt": [(["expr", SEMI], Stmt, [0])],
+    }
+)
+
+
+def tokenize(src: str) -> list[Token]:
+    kinds: dict[str, type[Token]] = {
+        "+": PLUS,
+        "*": STAR,
+        "(": LPAREN,
+        ")": RPAREN,
+        ";": SEMI,
+    }
+    return [
+        kinds.get(c, NUM)(c, lineno=1, offset=i) for i, c in enumerate(src) if c != " "
+    ]
+
+
+def value(result: Value | Token) -> int:
+    assert isinstance(result, Value)
+    return result.value
+
+
+def test_feeding_one_token_at_a_time() -> None:
+    session = ParseSession(PARSER, "expr")
+    for token in tokenize("1 + 2 * (3 + 4)"):
+        session.feed(token)
+    assert value(session.finish()) == 15
+    assert session.accepted and session.finished
+
+
+def test_feeding_bursts() -> None:
+    tokens = tokenize("1 + 2 * (3 + 4)")
+    session = ParseSession(PARSER, "expr")
+    session.feed_many(tokens[:3])
+    session.feed_many([])
+    session.feed_many(iter(tokens[3:]))
+    assert value(session.finish()) == 15
+
+
+def test_interleaved_sessions() -> None:
+    """Thousands of parses advance on one thread, one token at a time each."""
+    rng = random.Random(23)
+    sources = [
+        " + ".join(f"{rng.randrange(10)} * {rng.randrange(10)}" for _ in range(5))
+        for _ in range(2_000)
+    ]
+    pending = [(ParseSession(PARSER, "expr"), tokenize(src)) for src in sources]
+    for i in range(max(len(tokens) for _, tokens in pending)):
+        for session, tokens in pending:
+            if i < len(tokens):
+                session.feed(tokens[i])
+    results = [value(session.finish()) for session, _ in pending]
+    assert results == [value(PARSER.parse("expr", tokenize(src))) for src in sources]
+
+
+def test_tokens_are_processed_as_they_are_fed() -> None:
+    """A statement is reduced by the call that feeds its ``;``."""
+    session = ParseSession(PARSER, "stmts")
+    session.feed_many(tokenize("1 + 2"))
+    made.clear()
+    session.feed(SEMI(";", lineno=1, offset=5))
+    assert made == ["Add", "Stmt"]
+
+
+@pytest.mark.parametrize("src", ["1 + * 2", "(1", "1 )", ")", ""])
+def test_errors_match_parse(src: str) -> None:
+    with pytest.raises(ParsingError) as expected:
+        PARSER.parse("expr", tokenize(src))
+
+    session = ParseSession(PARSER, "expr")
+    with pytest.raises(ParsingError) as raised:
+        session.feed_many(tokenize(src))
+        session.finish()
+    assert str(raised.value) == str(expected.value)
+    assert raised.value.expected == expected.value.expected
+    assert session.finished and not session.accepted
+
+
+def test_error_is_raised_by_the_offending_feed() -> None:
+    session = ParseSession(PARSER, "expr")
+    session.feed_many(tokenize("1 +"))
+    star = STAR("*", lineno=1, offset=4)
+    with pytest.raises(ParsingError) as exc_info:
+        session.feed(star)
+    assert exc_info.value.token is star
+
+
+def test_finished_sessions_reject_tokens() -> None:
+    session = ParseSession(PARSER, "expr")
+    session.feed(NUM("1", lineno=1, offset=0))
+    assert value(session.finish()) == 1
+    assert value(session.finish()) == 1
+    with pytest.raises(ValueError, match="finished"):
+        session.feed(NUM("2", lineno=1, offset=2))
+
+    failed = ParseSession(PARSER, "expr")
+    with pytest.raises(ParsingError):
+        failed.feed(PLUS("+", lineno=1, offset=0))
+    with pytest.raises(ValueError, match="finished"):
+        failed.finish()
+
+
+def test_feeding_the_end_of_input_accepts() -> None:
+    session = ParseSession(PARSER, "expr")
+    session.feed_many([NUM("7", lineno=1, offset=0), EOS("", lineno=0, offset=0)])
+    assert session.accepted
+    assert value(session.finish()) == 7
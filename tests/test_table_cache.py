@@ -0,0 +1,229 @@
+"""Tests for the persistent parse-table cache (``TableCache``)."""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import pytest
+from helpers import Grammar, Node, make_layered_grammar
+
+import plare.parser
+from plare.cache import TableCache, grammar_fingerprint
+from plare.parser import Parser
+from plare.token import Token
+
+
+class NUM(Token):
+    def __init__(self, value: str, *, lineno: int, offset: int) -> None:
+        super().__init__(value, lineno=lineno, offset=offset)
+        self.value = int(value)
+
+
+class PLUS(Token):
+    precedence = 1
+    associative = "left"
+
+
+class STAR(Token):
+    precedence = 2
+    associative = "left"
+
+
+class Value:
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+
+class Num(Value):
+    def __init__(self, token: NUM, /) -> None:
+        super().__init__(token.value)
+
+
+class Add(Value):
+    def __init__(self, left: Value, right: Value, /) -> None:
+        super().__init__(left.value + right.value)
+
+
+class Mul(Value):
+    def __init__(self, left: Value, right: Value, /) -> None:
+        super().__init__(left.value * right.value)
+
+
+GRAMMAR: Grammar[Value] = {
+    "expr": [
+        ([NUM], Num, [0]),
+        (["expr", PLUS, "expr"], Add, [0, 2]),
+        (["expr", STAR, "expr"], Mul, [0, 2]),
+    ]
+}
+
+
+def tokens() -> list[Token]:
+    return [
+        NUM("1", lineno=1, offset=0),
+        PLUS("+", lineno=1, offset=2),
+        NUM("2", lineno=1, offset=4),
+        STAR("*", lineno=1, offset=6),
+        NUM("3", lineno=1, offset=8),
+    ]
+
+
+def evaluate(parser: Parser[Value]) -> int:
+    result = parser.parse("expr", tokens())
+    assert isinstance(result, Value)
+    return result.value
+
+
+def test_disk_cache_survives_a_new_process(tmp_path: Path) -> None:
+    """A table written by one cache is loaded by a fresh one on the same directory."""
+    built: Parser[Value] = Parser(GRAMMAR, cache=TableCache(tmp_path))
+    assert [p.suffix for p in tmp_path.iterdir()] == [".plrt"]
+
+    fresh = TableCache(tmp_path)
+    assert fresh.load(GRAMMAR) is not None
+    loaded: Parser[Value] = Parser(GRAMMAR, cache=fresh)
+    assert loaded.entry_state == built.entry_state
+    assert evaluate(loaded) == evaluate(built) == 7
+
+
+def test_cache_hit_skips_construction(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A cached table is reused without running any construction phase."""
+    Parser(GRAMMAR, cache=TableCache(tmp_path))
+
+    def fail(*args: object) -> None:
+        raise AssertionError("table was rebuilt")
+
+    monkeypatch.setattr(plare.parser, "Grammar", fail)
+    parser: Parser[Value] = Parser(GRAMMAR, cache=TableCache(tmp_path))
+    assert evaluate(parser) == 7
+    with pytest.raises(AssertionError, match="rebuilt"):
+        Parser(GRAMMAR)
+
+
+def test_memory_cache_returns_the_same_table() -> None:
+    cache = TableCache()
+    first: Parser[Value] = Parser(GRAMMAR, cache=cache)
+    second: Parser[Value] = Parser(GRAMMAR, cache=cache)
+    assert second.table is first.table
+    assert evaluate(second) == 7
+
+
+def test_memory_cache_evicts_least_recently_used() -> None:
+    cache = TableCache(maxsize=2)
+    grammars: list[Grammar[Value]] = [
+        {name: [([NUM], Num, [0])]} for name in ("a", "b", "c")
+    ]
+    for grammar in grammars[:2]:
+        Parser(grammar, cache=cache)
+    cache.load(grammars[0])
+    Parser(grammars[2], cache=cache)
+    assert cache.load(grammars[0]) is not None
+    assert cache.load(grammars[1]) is None
+    assert cache.load(grammars[2]) is not None
+
+
+def test_fingerprint_covers_precedence_and_makers() -> None:
+    """Changing associativity, an AST class or a production changes the key."""
+
+    class RightPLUS(PLUS):
+        associative = "right"
+
+    RightPLUS.__qualname__ = PLUS.__qualname__
+    variants: list[Grammar[Value]] = [
+        {"expr": [([NUM], Num, [0]), (["expr", RightPLUS, "expr"], Add, [0, 2])]},
+        {"expr": [([NUM], Num, [0]), (["expr", PLUS, "expr"], Mul, [0, 2])]},
+        {"expr": [([NUM], Num, [0]), (["expr", PLUS, "expr"], None, [0])]},
+        {"expr": [([NUM], Num, [0]), (["expr", PLUS, "expr"], Add, [0, 2], STAR)]},
+    ]
+    base: Grammar[Value] = {
+        "expr": [([NUM], Num, [0]), (["expr", PLUS, "expr"], Add, [0, 2])]
+    }
+    fingerprints = {grammar_fingerprint(g) for g in [base, *variants]}
+    assert len(fingerprints) == 5
+    assert grammar_fingerprint(base) == grammar_fingerprint(dict(base))
+
+
+def test_local_classes_are_cached_on_disk(tmp_path: Path) -> None:
+    """Classes local to a function are resolved against the grammar on load."""
+
+    class LOCAL(Token):
+        pass
+
+    grammar: Grammar[Value] = {"expr": [([LOCAL], None, [0])]}
+    Parser(grammar, cache=TableCache(tmp_path))
+    loaded = TableCache(tmp_path).load(grammar)
+    assert loaded is not None
+    assert LOCAL in loaded[0].table[loaded[1]["expr"]]
+
+
+def test_ambiguous_class_names_stay_in_memory(tmp_path: Path) -> None:
+    """Distinct classes sharing a qualified name cannot be written to disk."""
+
+    def make_token() -> type[Token]:
+        class LOCAL(Token):
+            pass
+
+        return LOCAL
+
+    grammar: Grammar[Value] = {"expr": [([make_token(), make_token()], None, [0])]}
+    cache = TableCache(tmp_path)
+    first: Parser[Value] = Parser(grammar, cache=cache)
+    assert list(tmp_path.iterdir()) == []
+    second: Parser[Value] = Parser(grammar, cache=cache)
+    assert second.table is first.table
+
+
+def test_same_fingerprint_other_classes_is_a_miss() -> None:
+    """A table is never reused for equally named but distinct classes."""
+
+    def make_grammar() -> Grammar[Value]:
+        class LOCAL(Token):
+            pass
+
+        return {"expr": [([LOCAL], None, [0])]}
+
+    cache = TableCache()
+    first, second = make_grammar(), make_grammar()
+    assert grammar_fingerprint(first) == grammar_fingerprint(second)
+    Parser(first, cache=cache)
+    assert cache.load(second) is None
+
+
+def test_corrupt_cache_file_is_rebuilt(tmp_path: Path) -> None:
+    cache = TableCache(tmp_path)
+    path = cache.path(grammar_fingerprint(GRAMMAR))
+    assert path is not None
+    path.write_bytes(b"not a parser table")
+    parser: Parser[Value] = Parser(GRAMMAR, cache=cache)
+    assert evaluate(parser) == 7
+    assert TableCache(tmp_path).load(GRAMMAR) is not None
+
+
+# ---------------------------------------------------------------------------
+# Startup time on a large grammar
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.slow
+def test_cached_startup_is_fast(tmp_path: Path) -> None:
+    """Loading a cached table from disk beats building it."""
+    grammar = make_layered_grammar(levels=30, operators=6)
+
+    t0 = time.perf_counter()
+    built: Parser[Node] = Parser(grammar, cache=TableCache(tmp_path))
+    t1 = time.perf_counter()
+    loaded: Parser[Node] = Parser(grammar, cache=TableCache(tmp_path))
+    t2 = time.perf_counter()
+    Parser(grammar, cache=TableCache(tmp_path))
+    t3 = time.perf_counter()
+
+    print(
+        f"\n{len(built.table.table)} states: build {t1 - t0:.2f}s,"
+        f" disk {t2 - t1:.3f}s, disk again {t3 - t2:.3f}s"
+    )
+    assert loaded.entry_state == built.entry_state
+    assert len(loaded.table.table) == len(built.table.table)
+    assert (t2 - t1) * 10 < t1 - t0
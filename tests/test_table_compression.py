@@ -0,0 +1,205 @@
+"""Tests for comb-vector compressed tables (``CompressedTable``)."""
+
+from __future__ import annotations
+
+from collections.abc import Hashable
+from typing import Any
+
+import pytest
+from helpers import Grammar, Node, make_layered_grammar
+
+from plare.exception import ParsingError
+from plare.parser import (
+    CompressedTable,
+    Parser,
+    Reduce,
+    Symbol,
+    Table,
+    action_key,
+    table_footprint,
+)
+from plare.token import Token
+
+
+class NUM(Token):
+    def __init__(self, value: str, *, lineno: int, offset: int) -> None:
+        super().__init__(value, lineno=lineno, offset=offset)
+        self.value = int(value)
+
+
+class PLUS(Token):
+    precedence = 1
+    associative = "left"
+
+
+class STAR(Token):
+    precedence = 2
+    associative = "left"
+
+
+class LPAREN(Token):
+    pass
+
+
+class RPAREN(Token):
+    pass
+
+
+class Value:
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+
+class Num(Value):
+    def __init__(self, token: NUM, /) -> None:
+        super().__init__(token.value)
+
+
+class Add(Value):
+    def __init__(self, left: Value, right: Value, /) -> None:
+        super().__init__(left.value + right.value)
+
+
+class Mul(Value):
+    def __init__(self, left: Value, right: Value, /) -> None:
+        super().__init__(left.value * right.value)
+
+
+GRAMMAR: Grammar[Value] = {
+    "expr": [
+        ([NUM], Num, [0]),
+        (["expr", PLUS, "expr"], Add, [0, 2]),
+        (["expr", STAR, "expr"], Mul, [0, 2]),
+        ([LPAREN, "expr", RPAREN], None, [1]),
+    ],
+    "exprs": [(["expr"], None, [0]), (["exprs", "expr"], Add, [0, 1])],
+}
+
+PARSER: Parser[Value] = Parser(GRAMMAR)
+
+
+def tokenize(src: str) -> list[Token]:
+    kinds: dict[str, type[Token]] = {"+": PLUS, "*": STAR, "(": LPAREN, ")": RPAREN}
+    return [
+        kinds.get(c, NUM)(c, lineno=1, offset=i) for i, c in enumerate(src) if c != " "
+    ]
+
+
+def table_cells(parser: Parser[Any]) -> list[dict[object, str]]:
+    return [
+        {symbol: str(action) for symbol, action in row.items()}
+        for row in parser.table.table
+    ]
+
+
+def lookup(
+    table: Table[Value] | CompressedTable[Value], state: int, symbol: Symbol
+) -> Hashable:
+    try:
+        return action_key(table[state, symbol])
+    except KeyError:
+        return "error"
+
+
+def assert_same_lookups(parser: Parser[Any]) -> None:
+    compressed = CompressedTable(parser.table, default_reductions=False)
+    for state in range(len(parser.table.table)):
+        assert compressed.expected_tokens(state) == parser.table.expected_tokens(state)
+        for symbol in compressed.symbols:
+            assert lookup(compressed, state, symbol) == lookup(
+                parser.table, state, symbol
+            )
+
+
+def test_lookups_match_without_default_reductions() -> None:
+    assert_same_lookups(PARSER)
+
+
+@pytest.mark.parametrize("default_reductions", [False, True])
+def test_rows_decompress_to_the_original(default_reductions: bool) -> None:
+    compressed = PARSER.compress(default_reductions=default_reductions)
+    assert isinstance(compressed.table, CompressedTable)
+    assert table_cells(compressed) == table_cells(PARSER)
+    assert compressed.entry_state == PARSER.entry_state
+
+
+@pytest.mark.parametrize("default_reductions", [False, True])
+@pytest.mark.parametrize(
+    "var, src", [("expr", "1 + 2 * (3 + 4)"), ("exprs", "1 2*3 (4) 5+6")]
+)
+def test_parse_runs_on_compressed_tables(
+    var: str, src: str, default_reductions: bool
+) -> None:
+    compressed = PARSER.compress(default_reductions=default_reductions)
+    result = compressed.parse(var, tokenize(src))
+    expected = PARSER.parse(var, tokenize(src))
+    assert isinstance(result, Value) and isinstance(expected, Value)
+    assert result.value == expected.value
+
+
+@pytest.mark.parametrize("src", ["1 + * 2", "1 2", "(1", "1 )", ")"])
+def test_errors_are_reported_on_the_same_token(src: str) -> None:
+    """Default reductions may move the error state, but never the token."""
+    errors: list[tuple[int | None, str]] = []
+    for parser in (
+        PARSER,
+        PARSER.compress(),
+        PARSER.compress(default_reductions=False),
+    ):
+        with pytest.raises(ParsingError) as exc_info:
+            parser.parse("expr", tokenize(src))
+        token = exc_info.value.token
+        errors.append((token and token.offset, str(exc_info.value)))
+    assert errors[0][0] == errors[1][0] == errors[2][0]
+    assert errors[2][1] == errors[0][1]
+
+
+def test_default_reductions_shrink_rows() -> None:
+    """A state whose only actions reduce keeps no explicit cells."""
+    with_defaults = CompressedTable(PARSER.table)
+    without = CompressedTable(PARSER.table, default_reductions=False)
+    assert len(with_defaults.check) < len(without.check)
+    for state, row in enumerate(PARSER.table.table):
+        if row and all(isinstance(action, Reduce) for action in row.values()):
+            assert with_defaults.base[state] == -1
+            assert with_defaults.default[state] >= 0
+
+
+def test_equal_rows_share_a_displacement() -> None:
+    table: Table[Value] = Table(3)
+    for state in range(3):
+        table.table[state] = {NUM: None, "expr": None} if state < 2 else {PLUS: None}
+    compressed = CompressedTable(table)
+    assert compressed.base[0] == compressed.base[1] != compressed.base[2]
+    assert compressed.values == [None]
+
+
+def test_compressed_parsers_serialize() -> None:
+    loaded = Parser[Value].from_bytes(PARSER.compress().to_bytes())
+    assert table_cells(loaded) == table_cells(PARSER)
+
+
+# ---------------------------------------------------------------------------
+# Memory footprint on a large grammar
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.slow
+def test_memory_footprint_report() -> None:
+    """The compressed table is a small fraction of the dict table."""
+    parser: Parser[Node] = Parser(
+        make_layered_grammar(levels=40, operators=8), lookaheads="deremer-pennello"
+    )
+    assert_same_lookups(parser)
+    footprints = {"dict": table_footprint(parser.table)}
+    for name, default_reductions in (("comb", False), ("comb+defaults", True)):
+        compressed = parser.compress(default_reductions=default_reductions)
+        assert table_cells(compressed) == table_cells(parser)
+        footprints[name] = table_footprint(compressed.table)
+
+    print(
+        f"\n{len(parser.table.table)} states: "
+        + ", ".join(f"{name} {size / 1e3:.0f} kB" for name, size in footprints.items())
+    )
+    assert footprints["comb"] * 5 < footprints["dict"]
+    assert footprints["comb+defaults"] * 20 < footprints["dict"]
@@ -0,0 +1,286 @@
+"""Tests for serialized parse tables.
+
+Covers the binary format (``Parser.to_bytes`` / ``from_bytes``) and the
+generated table module (``Parser.to_module`` / ``from_module``).
+"""
+
+from __future__ import annotations
+
+import ast
+import importlib
+import py_compile
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+from helpers import Grammar, Node, make_layered_grammar
+
+from plare.exception import ParsingError
+from plare.parser import TABLE_HEADER, Parser, Reduce, qualified_name
+from plare.token import Token
+
+
+class NUM(Token):
+    def __init__(self, value: str, *, lineno: int, offset: int) -> None:
+        super().__init__(value, lineno=lineno, offset=offset)
+        self.value = int(value)
+
+
+class PLUS(Token):
+    precedence = 1
+    associative = "left"
+
+
+class STAR(Token):
+    precedence = 2
+    associative = "left"
+
+
+class LPAREN(Token):
+    pass
+
+
+class RPAREN(Token):
+    pass
+
+
+class Value:
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+
+class Num(Value):
+    def __init__(self, token: NUM, /) -> None:
+        super().__init__(token.value)
+
+
+class Add(Value):
+    def __init__(self, left: Value, right: Value, /) -> None:
+        super().__init__(left.value + right.value)
+
+
+class Mul(Value):
+    def __init__(self, left: Value, right: Value, /) -> None:
+        super().__init__(left.value * right.value)
+
+
+GRAMMAR: Grammar[Value] = {
+    "expr": [
+        ([NUM], Num, [0]),
+        (["expr", PLUS, "expr"], Add, [0, 2]),
+        (["expr", STAR, "expr"], Mul, [0, 2]),
+        ([LPAREN, "expr", RPAREN], None, [1]),
+    ],
+    "exprs": [(["expr"], None, [0]), (["exprs", "expr"], Add, [0, 1])],
+}
+
+PARSER: Parser[Value] = Parser(GRAMMAR)
+
+
+def tokenize(src: str) -> list[Token]:
+    kinds: dict[str, type[Token]] = {"+": PLUS, "*": STAR, "(": LPAREN, ")": RPAREN}
+    return [
+        kinds.get(c, NUM)(c, lineno=1, offset=i) for i, c in enumerate(src) if c != " "
+    ]
+
+
+def table_cells(parser: Parser[Any]) -> list[dict[object, str]]:
+    """Return the rows of ``parser``, with each default reduction under ``None``."""
+    rows: list[dict[object, str]] = []
+    for state, row in enumerate(parser.table.table):
+        rows.append({symbol: str(action) for symbol, action in row.items()})
+        if state in parser.table.defaults:
+            rows[-1][None] = str(parser.table.defaults[state])
+    return rows
+
+
+def test_round_trip_keeps_table_and_results() -> None:
+    loaded = Parser[Value].from_bytes(PARSER.to_bytes())
+    assert table_cells(loaded) == table_cells(PARSER)
+    assert loaded.entry_state == PARSER.entry_state
+    for var, src in [("expr", "1 + 2 * (3 + 4)"), ("exprs", "1 2*3 (4)")]:
+        result = loaded.parse(var, tokenize(src))
+        expected = PARSER.parse(var, tokenize(src))
+        assert isinstance(result, Value) and isinstance(expected, Value)
+        assert result.value == expected.value
+
+
+def test_round_trip_keeps_errors() -> None:
+    loaded = Parser[Value].from_bytes(PARSER.to_bytes())
+    errors: list[tuple[str, list[type[Token]]]] = []
+    for parser in (PARSER, loaded):
+        with pytest.raises(ParsingError) as exc_info:
+            parser.parse("expr", tokenize("1 + * 2"))
+        errors.append((str(exc_info.value), exc_info.value.expected))
+    assert errors[0] == errors[1]
+
+
+def test_equal_reductions_are_stored_once() -> None:
+    """Reductions are deduplicated and shared between cells on load."""
+    loaded = Parser[Value].from_bytes(PARSER.to_bytes())
+    reduces = {
+        id(action)
+        for row in loaded.table.table
+        for action in row.values()
+        if isinstance(action, Reduce)
+    }
+    reduces |= {id(action) for action in loaded.table.defaults.values()}
+    assert len(reduces) == sum(len(rights) for rights in GRAMMAR.values())
+
+
+def test_classes_are_stored_by_name() -> None:
+    data = PARSER.to_bytes()
+    assert qualified_name(Mul).encode() in data
+    assert b"pickle" not in data
+
+
+def test_local_classes_need_symbols() -> None:
+    class LOCAL(Token):
+        pass
+
+    parser: Parser[Value] = Parser({"expr": [([LOCAL], None, [0])]})
+    data = parser.to_bytes()
+    with pytest.raises(ValueError, match="pass it in symbols"):
+        Parser[Value].from_bytes(data)
+    loaded = Parser[Value].from_bytes(data, symbols=[LOCAL])
+    token = LOCAL("x", lineno=1, offset=0)
+    assert loaded.parse("expr", [token]) is token
+
+
+DATA = PARSER.to_bytes()
+
+
+@pytest.mark.parametrize(
+    "data, message",
+    [
+        (b"XXXX" + DATA[4:], "Not a Plare parser table"),
+        (DATA[:4] + struct.pack("<H", 99) + DATA[6:], "format 99"),
+        (DATA[: TABLE_HEADER.size + 8], "Truncated"),
+        (DATA[:3], "Not a Plare parser table"),
+    ],
+)
+def test_invalid_data_is_rejected(data: bytes, message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        Parser[Value].from_bytes(data)
+
+
+class First:
+    def __call__(self, *xs: Value | Token) -> Value | Token:
+        return xs[0]
+
+
+def test_unknown_makers_are_rejected() -> None:
+    parser: Parser[Value] = Parser(GRAMMAR)
+    for row in parser.table.table:
+        for symbol, action in row.items():
+            if isinstance(action, Reduce):
+                row[symbol] = Reduce(action.left, action.n, First(), 0, 0)
+    with pytest.raises(ValueError, match="Cannot serialize"):
+        parser.to_bytes()
+
+
+def write_module(
+    parser: Parser[Any], tmp_path: Path, monkeypatch: pytest.MonkeyPatch, name: str
+) -> str:
+    """Write the table module of ``parser`` where it can be imported as ``name``."""
+    path = tmp_path / f"{name}.py"
+    path.write_text(parser.to_module(), encoding="utf-8")
+    py_compile.compile(str(path), doraise=True)
+    monkeypatch.setattr(sys, "path", [str(tmp_path), *sys.path])
+    importlib.invalidate_caches()
+    return name
+
+
+def test_module_round_trip(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    name = write_module(PARSER, tmp_path, monkeypatch, "calc_parsetab")
+    for source in (name, importlib.import_module(name)):
+        loaded = Parser[Value].from_module(source)
+        assert table_cells(loaded) == table_cells(PARSER)
+        assert loaded.entry_state == PARSER.entry_state
+        result = loaded.parse("expr", tokenize("2 * (3 + 4)"))
+        assert isinstance(result, Value) and result.value == 14
+
+
+def test_module_holds_only_literals_and_class_references() -> None:
+    """The generated module runs no code beyond imports when loaded."""
+    tree = ast.parse(PARSER.to_module())
+    assert not any(isinstance(node, ast.Call) for node in ast.walk(tree))
+    assignments = [node for node in tree.body if isinstance(node, ast.Assign)]
+    assert all(
+        isinstance(node.value, (ast.Constant, ast.Tuple)) for node in assignments
+    )
+
+
+def test_module_needs_importable_classes() -> None:
+    class LOCAL(Token):
+        pass
+
+    parser: Parser[Value] = Parser({"expr": [([LOCAL], None, [0])]})
+    with pytest.raises(ValueError, match="cannot be imported by name"):
+        parser.to_module()
+
+
+def test_other_modules_are_rejected(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    with pytest.raises(ValueError, match="Not a Plare parser table module"):
+        Parser[Value].from_module("struct")
+    path = tmp_path / "old_parsetab.py"
+    path.write_text("TABLE_FORMAT = 0\n", encoding="utf-8")
+    monkeypatch.setattr(sys, "path", [str(tmp_path), *sys.path])
+    with pytest.raises(ValueError, match="format 0"):
+        Parser[Value].from_module("old_parsetab")
+
+
+# ---------------------------------------------------------------------------
+# Load time on a large grammar
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.slow
+def test_loading_takes_milliseconds() -> None:
+    """Decoding a large table is a small fraction of building it."""
+    grammar = make_layered_grammar(levels=30, operators=6)
+
+    t0 = time.perf_counter()
+    built: Parser[Node] = Parser(grammar)
+    t1 = time.perf_counter()
+    data = built.to_bytes()
+    t2 = time.perf_counter()
+    loaded = Parser[Node].from_bytes(data)
+    t3 = time.perf_counter()
+
+    print(
+        f"\n{len(built.table.table)} states, {len(data) / 1e3:.0f} kB:"
+        f" build {t1 - t0:.3f}s, to_bytes {t2 - t1:.3f}s, from_bytes {t3 - t2:.3f}s"
+    )
+    assert table_cells(loaded) == table_cells(built)
+    assert (t3 - t2) * 10 < t1 - t0
+    assert t3 - t2 < 0.1
+
+
+@pytest.mark.slow
+def test_module_import_takes_milliseconds(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Importing a byte-compiled table module is a small fraction of building."""
+    grammar = make_layered_grammar(levels=30, operators=6)
+
+    t0 = time.perf_counter()
+    built: Parser[Node] = Parser(grammar)
+    t1 = time.perf_counter()
+    name = write_module(built, tmp_path, monkeypatch, "layered_parsetab")
+    t2 = time.perf_counter()
+    loaded = Parser[Node].from_module(name)
+    t3 = time.perf_counter()
+
+    print(
+        f"\n{len(built.table.table)} states: build {t1 - t0:.3f}s,"
+        f" generate and compile {t2 - t1:.3f}s, import {t3 - t2:.3f}s"
+    )
+    assert table_cells(loaded) == table_cells(built)
+    assert (t3 - t2) * 10 < t1 - t0
+    assert t3 - t2 < 0.1